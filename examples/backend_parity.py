@@ -0,0 +1,130 @@
+#!/usr/bin/env python -u
+
+"""
+Decodes random Native format data for every registered TimeplusType with both the pure Python and the compiled C
+backends, verifies that both backends return identical results, and reports the decoding speed of each.  No
+Timeplus server is required.
+
+Usage:  python examples/backend_parity.py [-r ROWS] [-t TRIES] [--numpy]
+"""
+
+import argparse
+import time
+from typing import Dict
+
+import timeplus_connect  # pylint: disable=unused-import
+from timeplus_connect.datatypes.base import type_map
+from timeplus_connect.datatypes.registry import get_from_name
+from timeplus_connect.driver import ctypes
+from timeplus_connect.driver.insert import InsertContext
+from timeplus_connect.driver.query import QueryContext
+from timeplus_connect.driver.transform import NativeTransform
+from timeplus_connect.tools.datagen import random_col_data, RandomValueDef
+
+# Representative full type names for registered base types that require arguments
+type_args: Dict[str, str] = {
+    'decimal': 'decimal(18, 4)',
+    'Decimal': 'Decimal(38, 10)',
+    'decimal32': 'decimal32(3)',
+    'Decimal32': 'Decimal32(3)',
+    'decimal64': 'decimal64(6)',
+    'Decimal64': 'Decimal64(6)',
+    'decimal128': 'decimal128(12)',
+    'Decimal128': 'Decimal128(12)',
+    'decimal256': 'decimal256(20)',
+    'Decimal256': 'Decimal256(20)',
+    'DateTime64': 'DateTime64(6)',
+    'datetime64': "datetime64(3, 'America/Denver')",
+    'enum': "enum('one' = 1, 'two' = 2)",
+    'enum8': "enum8('one' = 1, 'two' = 2, 'three' = -3)",
+    'enum16': "enum16('first' = 1000, 'second' = -2000)",
+    'fixed_string': 'fixed_string(16)',
+    'array': 'array(nullable(string))',
+    'tuple': 'tuple(int32, string, float64)',
+    'map': 'map(string, array(int64))',
+    'nested': 'nested(key string, value uint64)',
+    'simple_aggregate_function': 'simple_aggregate_function(sum, uint64)',
+}
+
+transform = NativeTransform()
+
+
+class ChunkedSource:
+    def __init__(self, data: bytes, chunk_size: int = 64 * 1024):
+        self.gen = (data[ix: ix + chunk_size] for ix in range(0, len(data), chunk_size))
+
+    def close(self):
+        pass
+
+
+def encode(type_name: str, rows: int) -> bytes:
+    ch_type = get_from_name(type_name)
+    data = random_col_data(ch_type, rows, RandomValueDef(ascii_only=True))
+    context = InsertContext('bench', ['col'], [ch_type], [data], column_oriented=True, block_size=rows)
+    context.current_block = 1
+    output = bytearray()
+    for chunk in transform.build_insert(context):
+        output += chunk
+    insert_exception = context.insert_exception
+    if insert_exception is not None:
+        raise insert_exception
+    return bytes(output)
+
+
+def decode(native: bytes, use_numpy: bool):
+    source = ctypes.RespBuffCls(ChunkedSource(native))  # pylint: disable=not-callable
+    result = transform.parse_response(source, QueryContext(use_numpy=use_numpy))
+    if use_numpy:
+        return [list(block) for block in result.np_result]
+    return result.result_columns
+
+
+def measure(native: bytes, rows: int, tries: int, use_numpy: bool):
+    """
+    Decode the Native data with each available backend
+    :return: The formatted rows/sec of each backend, and whether all backends returned the same result
+    """
+    results = []
+    speeds = []
+    for backend in ctypes.available_backends():
+        ctypes.set_backend(backend)
+        start = time.perf_counter()
+        for _ in range(tries):
+            decoded = decode(native, use_numpy)
+        elapsed = time.perf_counter() - start
+        results.append(decoded)
+        speeds.append(f'{int(rows * tries / elapsed):,}')
+    return speeds, all(r == results[0] for r in results[1:])
+
+
+def run(rows: int, tries: int, use_numpy: bool):
+    backends = ctypes.available_backends()
+    if ctypes.C_BACKEND not in backends:
+        print('C extensions are not available, only the Python backend can be measured')
+    original = ctypes.active_backend()
+    print(f"{'type':<45}{'rows/sec (' + ', '.join(backends) + ')':>40}  parity")
+    try:
+        for base_name in sorted(type_map.keys()):
+            type_name = type_args.get(base_name, base_name)
+            try:
+                native = encode(type_name, rows)
+            except Exception as ex:  # pylint: disable=broad-except
+                print(f'{type_name:<45}{"skipped":>40}  {type(ex).__name__}')
+                continue
+            speeds, parity = measure(native, rows, tries, use_numpy)
+            print(f"{type_name:<45}{' / '.join(speeds):>40}  {'ok' if parity else 'MISMATCH'}")
+    finally:
+        ctypes.set_backend(original)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-r', '--rows', help='Rows per column', type=int, default=10000)
+    parser.add_argument('-t', '--tries', help='Decoding runs per backend', type=int, default=5)
+    parser.add_argument('--numpy', help='Decode using the numpy code paths', action='store_true')
+    args = parser.parse_args()
+    run(args.rows, args.tries, args.numpy)
+
+
+if __name__ == '__main__':
+    main()
@@ -68,6 +68,7 @@ def run_setup(try_c: bool = True):
             'numpy': ['numpy'],
             'pandas': ['pandas'],
             'arrow': ['pyarrow'],
+            'polars': ['polars', 'pyarrow'],
             'orjson': ['orjson'],
             'tzlocal': ['tzlocal>=4.0'],
         },
@@ -0,0 +1,102 @@
+import datetime
+import decimal
+import uuid
+
+import pytest
+
+from timeplus_connect.datatypes.registry import get_from_name
+from timeplus_connect.driver import ctypes
+from timeplus_connect.driver.insert import InsertContext
+from timeplus_connect.driver.query import QueryContext
+from tests.helpers import native_transform, native_insert_block, bytes_source
+
+arrow = pytest.importorskip('pyarrow')
+
+UUIDS = [uuid.uuid4() for _ in range(3)]
+
+COLUMNS = {
+    'uint64': ([1, 2 ** 63 + 5, 0], 'uint64', None),
+    'nullable(int16)': ([None, -5, 7], 'int16', None),
+    'nullable(bool)': ([None, False, True], 'bool', None),
+    'nullable(string)': (['x', None, 'béé'], 'string', None),
+    'low_cardinality(nullable(string))': (['a', None, 'a'], 'dictionary<values=string, indices=int32, ordered=0>',
+                                          None),
+    'fixed_string(3)': ([b'abc', b'def', b'\x00\x00\x00'], 'fixed_size_binary[3]', None),
+    'date': ([datetime.date(2020, 1, 2), datetime.date(1970, 1, 1), datetime.date(2100, 5, 5)], 'date32[day]', None),
+    "datetime('America/Denver')": ([datetime.datetime(2020, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)] * 3,
+                                   'timestamp[s, tz=America/Denver]', None),
+    'datetime64(2)': ([datetime.datetime(2020, 1, 2, 3, 4, 5, 120000)] * 3, 'timestamp[ms, tz=UTC]',
+                      [datetime.datetime(2020, 1, 2, 3, 4, 5, 120000, tzinfo=datetime.timezone.utc)] * 3),
+    "enum8('a' = -1, 'b' = 5)": (['a', 'b', 'a'], 'dictionary<values=string, indices=int32, ordered=0>', None),
+    'decimal(10, 3)': ([decimal.Decimal('-1.234'), decimal.Decimal('5.000'), decimal.Decimal('1234567.891')],
+                       'decimal128(10, 3)', None),
+    'decimal(60, 4)': ([decimal.Decimal('-1.2345'), decimal.Decimal('12345678901234567890.1234'), decimal.Decimal(0)],
+                       'decimal256(60, 4)', None),
+    'uuid': (UUIDS, 'fixed_size_binary[16]', [x.bytes for x in UUIDS]),
+    'array(array(int32))': ([[[1, 2], [3]], [], [[]]], 'list<item: list<item: int32>>', None),
+    'map(string, array(int8))': ([{'a': [1]}, {}, {'b': [], 'c': [2, 3]}], 'map<string, list<item: int8>>',
+                                 [[('a', [1])], [], [('b', []), ('c', [2, 3])]]),
+    'tuple(x int8, y string)': ([(1, 'a'), (2, 'b'), (3, 'c')], 'struct<x: int8, y: string>',
+                                [{'x': 1, 'y': 'a'}, {'x': 2, 'y': 'b'}, {'x': 3, 'y': 'c'}]),
+}
+
+
+def test_native_arrow_types():
+    names = tuple(f'col_{ix}' for ix in range(len(COLUMNS)))
+    col_types = tuple(get_from_name(type_name) for type_name in COLUMNS)
+    data = list(zip(*(values for values, _, _ in COLUMNS.values())))
+    output = native_insert_block(data, column_names=names, column_types=col_types)
+    active = ctypes.active_backend()
+    tables = []
+    try:
+        for backend in ctypes.available_backends():
+            ctypes.set_backend(backend)
+            result = native_transform.parse_response(bytes_source(output, cls=ctypes.RespBuffCls),
+                                                     QueryContext(as_arrow=True))
+            tables.append(result.arrow_result)
+    finally:
+        ctypes.set_backend(active)
+    table = tables[0]
+    assert all(table.equals(other) for other in tables[1:])
+    for name, (values, arrow_type, expected) in zip(names, COLUMNS.values()):
+        column = table.column(name)
+        assert str(column.type) == arrow_type
+        assert column.to_pylist() == (values if expected is None else expected)
+
+
+def test_native_arrow_stream():
+    names = ('key', 'value')
+    col_types = (get_from_name('int32'), get_from_name('string'))
+    output = b''.join(native_insert_block([(x, str(x))], column_names=names, column_types=col_types)
+                      for x in range(3))
+    result = native_transform.parse_response(bytes_source(output), QueryContext(as_arrow=True))
+    with result.arrow_stream as stream:
+        batches = list(stream)
+    assert [batch.num_rows for batch in batches] == [1, 1, 1]
+    assert batches[2].column(1).to_pylist() == ['2']
+
+    # An empty block still provides the schema of the result
+    output = b'\x02\x00\x03key\x05int32\x05value\x06string'
+    table = native_transform.parse_response(bytes_source(output), QueryContext(as_arrow=True)).arrow_result
+    assert table.num_rows == 0
+    assert table.schema.names == list(names)
+
+
+def test_native_polars():
+    pl = pytest.importorskip('polars')
+    names = ('key', 'value', 'score', 'day', 'ts', 'tags')
+    col_types = tuple(get_from_name(type_name) for type_name in
+                      ('int32', 'nullable(string)', 'float64', 'date', 'datetime64(3)', 'array(string)'))
+    df = pl.DataFrame({'key': [1, 2, 3],
+                       'value': ['a', None, 'c'],
+                       'score': [0.5, 1.5, -2.0],
+                       'day': [datetime.date(2020, 1, 2), datetime.date(1999, 12, 31), datetime.date(2024, 2, 29)],
+                       'ts': [datetime.datetime(2020, 1, 2, 3, 4, 5, 6000)] * 3,
+                       'tags': [['x'], [], ['y', 'z']]})
+    context = InsertContext('table', names, col_types, df)
+    context.current_block = 1
+    output = b''.join(native_transform.build_insert(context))
+    result = native_transform.parse_response(bytes_source(output), QueryContext(as_arrow=True)).pl_result
+    assert result.columns == list(names)
+    assert result.drop('ts').equals(df.drop('ts'))
+    assert result['ts'].dt.replace_time_zone(None).to_list() == df['ts'].to_list()
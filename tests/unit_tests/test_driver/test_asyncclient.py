@@ -0,0 +1,55 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from timeplus_connect import common
+from timeplus_connect.driver.asyncclient import ExecutorStreamContext
+from timeplus_connect.driver.common import StreamContext
+
+
+class FakeSource:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def row_blocks(count: int):
+    for ix in range(count):
+        yield [(ix, 'a'), (ix, 'b')]
+
+
+@pytest.mark.parametrize('read_ahead', [0, 2])
+def test_executor_stream(read_ahead: int):
+    executor = ThreadPoolExecutor(max_workers=2)
+
+    async def consume(flatten: bool, limit: int = 0):
+        source = FakeSource()
+        stream = ExecutorStreamContext(StreamContext(source, row_blocks(10)), executor, flatten)
+        items = []
+        async with stream:
+            async for item in stream:
+                items.append(item)
+                if len(items) == limit:
+                    break
+        assert source.closed
+        return items
+
+    common.set_setting('async_read_ahead', read_ahead)
+    try:
+        assert asyncio.run(consume(False)) == list(row_blocks(10))
+        assert asyncio.run(consume(True)) == [row for block in row_blocks(10) for row in block]
+        assert len(asyncio.run(consume(True, 3))) == 3
+        source = FakeSource()
+        with ExecutorStreamContext(StreamContext(source, row_blocks(3)), executor) as stream:
+            assert list(stream) == list(row_blocks(3))
+        assert source.closed
+        source = FakeSource()
+        with ExecutorStreamContext(StreamContext(source, row_blocks(3)), executor, flatten=True) as stream:
+            assert list(stream) == [row for block in row_blocks(3) for row in block]
+        assert source.closed
+    finally:
+        common.set_setting('async_read_ahead', 0)
+        executor.shutdown()
@@ -0,0 +1,91 @@
+import asyncio
+
+import lz4.frame
+
+from timeplus_connect.driver.asynchttp import AsyncConnectionPool
+
+BODY = bytes(range(256)) * 1024
+
+
+async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    while True:
+        request_line = await reader.readline()
+        if not request_line:
+            break
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line == b'\r\n':
+                break
+            key, _, value = line.decode().partition(':')
+            headers[key.strip().lower()] = value.strip()
+        received = bytearray()
+        if headers.get('transfer-encoding') == 'chunked':
+            while True:
+                size = int(await reader.readline(), 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                received += await reader.readexactly(size)
+                await reader.readline()
+        elif 'content-length' in headers:
+            received += await reader.readexactly(int(headers['content-length']))
+        if request_line.startswith(b'POST /lz4'):
+            data = lz4.frame.compress(bytes(received))
+            writer.write(b'HTTP/1.1 200 OK\r\nContent-Encoding: lz4\r\nTransfer-Encoding: chunked\r\n\r\n')
+            for ix in range(0, len(data), 10000):
+                chunk = data[ix: ix + 10000]
+                writer.write(f'{len(chunk):x}\r\n'.encode() + chunk + b'\r\n')
+            writer.write(b'0\r\n\r\n')
+        else:
+            writer.write(f'HTTP/1.1 200 OK\r\nContent-Length: {len(received)}\r\n\r\n'.encode() + received)
+        await writer.drain()
+    writer.close()
+
+
+def test_pool_requests():
+    connections = []
+
+    async def counting_handle(reader, writer):
+        connections.append(writer)
+        try:
+            await handle(reader, writer)
+        except (asyncio.CancelledError, ConnectionError):
+            writer.close()
+
+    async def run():
+        server = await asyncio.start_server(counting_handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        pool = AsyncConnectionPool('127.0.0.1', port, connect_timeout=5, read_timeout=5)
+        try:
+            response = await pool.request('POST', '/echo', {}, BODY)
+            assert response.status == 200
+            assert await response.read() == BODY
+
+            async def body_gen():
+                for ix in range(0, len(BODY), 7777):
+                    yield BODY[ix: ix + 7777]
+
+            response = await pool.request('POST', '/lz4', {}, body_gen())
+            assert response.headers['content-encoding'] == 'lz4'
+            assert await response.read() == BODY
+
+            response = await pool.request('POST', '/echo', {}, [b'abc', b'', b'def'])
+            assert await response.read() == b'abcdef'
+            # All requests should have reused the same keep-alive connection
+            assert len(connections) == 1
+
+            # A response that is not completely read closes its connection
+            response = await pool.request('POST', '/echo', {}, BODY)
+            await response.close()
+            response = await pool.request('POST', '/echo', {}, b'xyz')
+            assert await response.read() == b'xyz'
+            assert len(connections) == 2
+        finally:
+            await pool.close()
+            server.close()
+            for writer in connections:
+                writer.close()
+            await server.wait_closed()
+
+    asyncio.run(run())
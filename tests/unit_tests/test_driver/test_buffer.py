@@ -1,3 +1,6 @@
+import pytest
+
+from timeplus_connect.driver import npconv
 from timeplus_connect.driver.buffer import ResponseBuffer as PyResponseBuffer
 from timeplus_connect.driver.exceptions import StreamCompleteException
 from timeplus_connect.driverc.buffer import ResponseBuffer as CResponseBuffer  # pylint: disable=no-name-in-module
@@ -37,3 +40,34 @@ def test_read_bytes():
             buff.read_bytes(10)
         except StreamCompleteException:
             pass
+
+
+def test_read_view():
+    for cls in CResponseBuffer, PyResponseBuffer:
+        buff = bytes_source('01 02 03 04 05 06 07 08 09 0a', chunk_size=4, cls=cls)
+        assert buff.read_byte() == 1
+        view = buff.read_view(3)
+        assert isinstance(view, memoryview)
+        assert bytes(view) == to_bytes('02 03 04')
+        assert bytes(buff.read_view(3)) == to_bytes('05 06 07')
+        assert bytes(buff.read_view(2)) == to_bytes('08 09')
+        assert buff.read_byte() == 10
+
+
+def test_read_view_copies():
+    np = pytest.importorskip('numpy')
+    from timeplus_connect.driverc import npconv as c_npconv  # pylint: disable=import-outside-toplevel,no-name-in-module
+    data = bytes(range(1, 9)) + np.arange(10, dtype='<i8').tobytes() + bytes(range(23))
+    for cls, conv in (CResponseBuffer, c_npconv), (PyResponseBuffer, npconv):
+        # Small reads are copied so that they do not keep the whole chunk alive
+        buff = bytes_source(data, chunk_size=len(data), cls=cls)
+        assert buff.read_byte() == 1
+        small = buff.read_view(7)
+        assert not isinstance(small, memoryview) and bytes(small) == bytes(range(2, 9))
+        column = conv.read_numpy_array(buff, '<i8', 10)
+        assert column.tolist() == list(range(10))
+        # Unaligned views are copied into aligned arrays
+        buff = bytes_source(data, chunk_size=len(data), cls=cls)
+        buff.read_bytes(3)
+        column = conv.read_numpy_array(buff, '<u8', 10)
+        assert column.flags.aligned
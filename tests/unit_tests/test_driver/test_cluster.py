@@ -0,0 +1,99 @@
+from collections import Counter
+
+import pytest
+
+from timeplus_connect.driver import create_client
+from timeplus_connect.driver.cluster import ClusterClient
+from timeplus_connect.driver.exceptions import OperationalError, DatabaseError, ProgrammingError
+from timeplus_connect.driver.httpclient import HttpClient
+
+# pylint: disable=protected-access
+
+DOWN = 'http://node2:3218'
+
+
+class FakeResponse:
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(name='requests')
+def fake_requests(monkeypatch):
+    sent = []
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments,unused-argument
+    def raw_request(self, data, params, headers=None, method='POST', retries=0, stream=False, server_wait=True,
+                    fields=None, error_handler=None, endpoint=None):
+        sent.append(endpoint)
+        if endpoint == DOWN:
+            raise OperationalError('connection refused')
+        if data == 'bad':
+            raise DatabaseError('syntax error')
+        return FakeResponse(endpoint) if stream else endpoint
+
+    monkeypatch.setattr(HttpClient, '__init__', lambda self, *args, **kwargs: None)
+    monkeypatch.setattr(HttpClient, '_raw_request', raw_request)
+    return sent
+
+
+def cluster(policy: str) -> ClusterClient:
+    return ClusterClient('http', 'localhost', 3218, 'default', '', 'default', endpoints='node1, node2:3218,node3:9000',
+                         policy=policy, health_interval=0, cooldown=60)
+
+
+@pytest.mark.parametrize('policy', ['round_robin', 'least_in_flight', 'latency'])
+def test_cluster_routing(requests, policy):
+    client = cluster(policy)
+    assert [ep.url for ep in client.endpoints] == ['http://node1:3218', DOWN, 'http://node3:9000']
+    # Queries fail over to another endpoint, and the failed endpoint is ejected
+    for _ in range(20):
+        assert client._raw_request('SELECT 1', {}, retries=2) != DOWN
+    assert requests.count(DOWN) == 1
+    assert Counter(requests)['http://node3:9000'] > 0
+    # Server errors do not eject or fail over
+    with pytest.raises(DatabaseError):
+        client._raw_request('bad', {}, retries=2)
+    assert len(requests) == 22
+    # Inserts are not retried on another endpoint
+    client.endpoints[0].ejected_until = client.endpoints[2].ejected_until = client.endpoints[1].ejected_until
+    client.endpoints[1].ejected_until = 0
+    requests.clear()
+    with pytest.raises(OperationalError):
+        client._raw_request(b'data', {})
+    assert requests == [DOWN]
+    client.probe()
+    assert [ep.ejected_until > 0 for ep in client.endpoints] == [False, True, False]
+    assert all(ep.in_flight == 0 for ep in client.endpoints)
+
+
+def test_cluster_query_endpoints(requests):
+    client = cluster('latency')
+    client.endpoints[1].ejected_until = float('inf')
+    response = client._raw_request('SELECT 1', {'query_id': 'q1'}, retries=2, stream=True)
+    # A streaming query keeps its endpoint (for KILL QUERY and hedging) until the response is closed
+    assert client._query_endpoint('q1') == response.endpoint != DOWN
+    assert sum(ep.in_flight for ep in client.endpoints) == 1
+    response.close()
+    response.close()
+    assert response.closed and client._query_endpoint('q1') is None
+    assert all(ep.in_flight == 0 for ep in client.endpoints)
+    client._raw_request('SELECT 1', {'query_id': 'q2'}, retries=2)
+    assert client._query_endpoint('q2') is None
+
+    # Latency weights come from the health probe round trip times
+    assert all(ep.latency == 0 for ep in client.endpoints)
+    client.probe()
+    assert client.endpoints[0].latency > 0 and client.endpoints[1].latency == 0
+    assert len(requests) == 5
+
+
+def test_cluster_endpoints_required(requests):
+    with pytest.raises(ProgrammingError):
+        ClusterClient('http', 'localhost', 3218, 'default', '', 'default', endpoints=' , ', health_interval=0)
+    with pytest.raises(ProgrammingError):
+        create_client(host='localhost', endpoints=[], health_interval=0)
+    assert not requests
@@ -0,0 +1,27 @@
+import gzip
+import os
+
+import lz4.frame
+import pytest
+import zstandard
+
+from timeplus_connect.driver.compression import get_compressor
+
+decompressors = {'lz4': lz4.frame.decompress,
+                 'zstd': lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data),
+                 'gzip': gzip.decompress}
+
+
+@pytest.mark.parametrize('method, level, threads', [('lz4', None, 0), ('lz4', 9, 0), ('zstd', None, 0),
+                                                    ('zstd', 10, 2), ('gzip', 1, 0)])
+def test_streaming_compressors(method: str, level: int, threads: int):
+    blocks = [os.urandom(1000) + bytes(50000) + str(ix).encode() for ix in range(20)]
+    for _ in range(2):  # The second insert reuses pooled compression contexts
+        compressor = get_compressor(method, level, threads)
+        chunks = [compressor.compress_block(block) for block in blocks]
+        chunks.append(compressor.flush())
+        compressed = b''.join(chunk for chunk in chunks if chunk)
+        assert decompressors[method](compressed) == b''.join(blocks)
+        if method == 'lz4':
+            # All blocks are written to a single frame
+            assert compressed.count(b'\x04\x22\x4d\x18') == 1
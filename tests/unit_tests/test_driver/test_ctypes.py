@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+from timeplus_connect.datatypes.registry import get_from_name
+from timeplus_connect.driver import ctypes
+from timeplus_connect.driver.exceptions import ProgrammingError
+from timeplus_connect.driver.query import QueryContext
+from timeplus_connect.driver.transform import NativeTransform
+from timeplus_connect.driver.common import coerce_bool
+from tests.helpers import bytes_source, native_insert_block
+
+parse_response = NativeTransform().parse_response
+requires_c = pytest.mark.skipif(ctypes.C_BACKEND not in ctypes.available_backends(),
+                                reason='C extensions are not built')
+
+
+@pytest.fixture(autouse=True)
+def restore_backend():
+    original = ctypes.active_backend()
+    yield
+    ctypes.set_backend(original)
+
+
+@requires_c
+@pytest.mark.skipif(not coerce_bool(os.environ.get('CLICKHOUSE_CONNECT_USE_C', True)),
+                    reason='C backend disabled by CLICKHOUSE_CONNECT_USE_C')
+def test_c_backend_active():
+    assert ctypes.available_backends() == ('python', 'c')
+    assert ctypes.active_backend() == 'c'
+
+
+@requires_c
+def test_switch_backend():
+    ctypes.set_backend('python')
+    assert ctypes.active_backend() == 'python'
+    assert ctypes.data_conv.__name__ == 'timeplus_connect.driver.dataconv'
+    assert ctypes.RespBuffCls.__module__ == 'timeplus_connect.driver.buffer'
+    ctypes.set_backend('C')
+    assert ctypes.active_backend() == 'c'
+    assert ctypes.data_conv.__name__ == 'timeplus_connect.driverc.dataconv'
+    with pytest.raises(ProgrammingError):
+        ctypes.set_backend('rust')
+
+
+@requires_c
+def test_backend_parity():
+    col_types = [get_from_name(name) for name in ('string', 'nullable(int32)', 'low_cardinality(string)',
+                                                  'datetime', 'array(fixed_string(4))', 'uuid')]
+    data = [['abc', 5, 'lc1', 1700000000, [b'abcd'], '9f7b3b4e-2f2a-4c7b-8d3f-3c1a6f0e9b21'],
+            ['xyzw', None, 'lc2', 1700003600, [], '00000000-0000-0000-0000-000000000000']]
+    native = bytes(native_insert_block(data, [f'col_{ix}' for ix in range(len(col_types))], col_types))
+    results = []
+    for backend in ctypes.available_backends():
+        ctypes.set_backend(backend)
+        source = bytes_source(native, cls=ctypes.RespBuffCls)
+        results.append(parse_response(source, QueryContext()).result_set)
+    assert results[0] == results[1]
+    assert results[0][1][1] is None
@@ -0,0 +1,60 @@
+import threading
+import time
+
+import pytest
+
+from timeplus_connect.driver.exceptions import DatabaseError
+from timeplus_connect.driver.hedge import HedgePolicy, HEDGE_SUFFIX
+
+
+class FakeResponse:
+    def __init__(self, query_id: str):
+        self.query_id = query_id
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_hedged_requests():
+    policy = HedgePolicy(initial_delay=0.02)
+    killed = []
+    released = []
+    slow = threading.Event()
+
+    def request(query_id: str):
+        if not query_id.endswith(HEDGE_SUFFIX):
+            slow.wait(5)
+        return FakeResponse(query_id)
+
+    def release(response):
+        released.append(response)
+
+    try:
+        response = policy.execute(request, 'q1', killed.append, release)
+        assert response.query_id == 'q1' + HEDGE_SUFFIX
+        slow.set()
+        deadline = time.monotonic() + 5
+        while not (killed and released) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert killed == ['q1']
+        assert released[0].query_id == 'q1'
+        assert policy.hedged == 1 and policy.hedge_wins == 1
+
+        # Fast responses are never hedged
+        assert policy.execute(FakeResponse, 'q2', killed.append, release).query_id == 'q2'
+        assert policy.hedged == 1
+
+        # Server errors that occur before the hedge delay are raised
+        def failing(query_id: str):
+            raise DatabaseError(query_id)
+
+        with pytest.raises(DatabaseError, match='q3'):
+            policy.execute(failing, 'q3', killed.append, release)
+        assert len(killed) == 1
+
+        for _ in range(20):
+            policy.record(0.5, False, False)
+        assert policy.delay() == 0.5
+    finally:
+        policy.close()
@@ -0,0 +1,97 @@
+import threading
+
+import lz4.frame
+import pytest
+
+from timeplus_connect import common
+from timeplus_connect.driver.httputil import ResponseSource
+
+
+class FakeResponse:
+    def __init__(self, data: bytes, chunk_size: int, encoding=None):
+        self.headers = {'content-encoding': encoding} if encoding else {}
+        self.chunks = [data[ix: ix + chunk_size] for ix in range(0, len(data), chunk_size)]
+        self.closed = False
+        self.drained = False
+
+    def stream(self, _amt, _decode_content):
+        yield from self.chunks
+
+    def drain_conn(self):
+        self.drained = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.parametrize('read_ahead', [0, 1, 4])
+def test_read_ahead(read_ahead: int):
+    data = bytes(range(256)) * 4096
+    common.set_setting('http_read_ahead', read_ahead)
+    try:
+        source = ResponseSource(FakeResponse(data, 7001))
+        assert b''.join(source.gen) == data
+        source.close()
+        compressed = lz4.frame.compress(data)
+        source = ResponseSource(FakeResponse(compressed, 5003, 'lz4'))
+        assert b''.join(source.gen) == data
+        source.close()
+    finally:
+        common.set_setting('http_read_ahead', 0)
+
+
+def test_read_ahead_early_close():
+    common.set_setting('http_read_ahead', 2)
+    try:
+        response = FakeResponse(bytes(1000000), 1000)
+        source = ResponseSource(response)
+        assert len(next(source.gen)) == 1000
+        source.close()
+        assert response.closed
+        assert not source._reader.is_alive()  # pylint: disable=protected-access
+    finally:
+        common.set_setting('http_read_ahead', 0)
+
+
+class UnboundedResponse(FakeResponse):
+    """Streaming query response that blocks waiting for more data until the connection is shut down"""
+
+    def __init__(self):
+        super().__init__(b'', 1)
+        self.shut_down = threading.Event()
+
+    def stream(self, _amt, _decode_content):
+        yield bytes(100)
+        self.shut_down.wait()
+
+    def shutdown(self):
+        self.shut_down.set()
+
+
+def test_close_unbounded_stream():
+    common.set_setting('http_read_ahead', 2)
+    buffer_size = common.get_setting('http_buffer_size')
+    common.set_setting('http_buffer_size', 50)
+    try:
+        response = UnboundedResponse()
+        source = ResponseSource(response)
+        assert len(next(source.gen)) == 100
+        source.close()
+        assert response.closed and not response.drained
+        assert response.shut_down.is_set()
+        assert not source._reader.is_alive()  # pylint: disable=protected-access
+    finally:
+        common.set_setting('http_read_ahead', 0)
+        common.set_setting('http_buffer_size', buffer_size)
+
+
+def test_close_complete_response():
+    common.set_setting('http_read_ahead', 2)
+    try:
+        response = FakeResponse(bytes(10000), 1000)
+        source = ResponseSource(response)
+        assert len(b''.join(source.gen)) == 10000
+        source.close()
+        assert response.drained and response.closed
+    finally:
+        common.set_setting('http_read_ahead', 0)
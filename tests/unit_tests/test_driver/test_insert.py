@@ -1,9 +1,15 @@
 import datetime
+import math
 
-from timeplus_connect.datatypes.registry import get_from_name
+import lz4.frame
+import pytest
 
+from timeplus_connect import common
+from timeplus_connect.datatypes.registry import get_from_name
 from timeplus_connect.driver.insert import InsertContext
+from timeplus_connect.driver.transform import NativeTransform
 from timeplus_connect.tools.datagen import fixed_len_ascii_str
+from tests.helpers import bytes_source
 
 
 def test_block_size():
@@ -20,3 +26,162 @@ def test_block_size():
                         [get_from_name('int32'), get_from_name('string')],
                         data)
     assert ctx.block_row_count == 8192
+
+
+def test_pipelined_insert():
+    def build(threads: int, bad_row: int = -1):
+        common.set_setting('insert_threads', threads)
+        try:
+            data = [('bad' if x == bad_row else x, f'{x:0400}') for x in range(50000)]
+            ctx = InsertContext('fake_table',
+                                ['key', 'big_str'],
+                                [get_from_name('int32'), get_from_name('string')],
+                                data,
+                                compression='lz4')
+            ctx.data = data
+            return b''.join(NativeTransform.build_insert(ctx)), ctx
+        finally:
+            common.set_setting('insert_threads', 0)
+
+    serial, _ = build(0)
+    pipelined, _ = build(3)
+    assert lz4.frame.decompress(pipelined) == lz4.frame.decompress(serial)
+
+    # Serialization errors in a later block fail the insert the same way as a serial insert
+    body, ctx = build(3, 30000)
+    assert isinstance(ctx.insert_exception, Exception)
+    assert body.endswith(b'INTERNAL EXCEPTION WHILE SERIALIZING')
+
+
+def test_insert_threads_change():
+    def context():
+        data = [(x, f'{x:040}') for x in range(50000)]
+        return InsertContext('fake_table', ['key', 'big_str'], [get_from_name('int32'), get_from_name('string')],
+                             data, compression='lz4', block_size=1000)
+
+    common.set_setting('insert_threads', 2)
+    try:
+        ctx = context()
+        chunks = NativeTransform.build_insert(ctx)
+        first = next(chunks)
+        # Replacing the encode pool does not stop the insert that is still using the old pool
+        common.set_setting('insert_threads', 3)
+        b''.join(NativeTransform.build_insert(context()))
+        body = first + b''.join(chunks)
+    finally:
+        common.set_setting('insert_threads', 0)
+    assert ctx.insert_exception is None
+    assert not body.endswith(b'INTERNAL EXCEPTION WHILE SERIALIZING')
+
+
+def test_numpy_insert():
+    np = pytest.importorskip('numpy')
+    names = ['i32', 'i16', 'f64', 'flag', 'day', 'ts']
+    types = [get_from_name(name) for name in
+             ('int32', 'int16', 'float64', 'bool', 'date', 'nullable(datetime64(3))')]
+    ts = [datetime.datetime(2020, 5, 2, 10, 5, 2, 123000), None, datetime.datetime(1999, 1, 1)]
+    python_data = [[1, -2, 3], [0, 7, 0], [0.5, 2.0, -1.0], [True, False, True],
+                   [datetime.date(2020, 5, 2), datetime.date(1970, 1, 1), datetime.date(2149, 1, 1)],
+                   [None if x is None else int(x.replace(tzinfo=datetime.timezone.utc).timestamp() * 1000)
+                    for x in ts]]
+    np_data = [np.array([1, -2, 3], dtype='int64'),
+               np.array([0.4, 7.9, -0.2]),
+               np.array([0.5, 2.0, -1.0], dtype='float32'),
+               np.array([2, 0, 1], dtype='uint8'),
+               np.array(['2020-05-02', '1970-01-01', '2149-01-01'], dtype='datetime64[D]'),
+               np.array([None if x is None else x.isoformat() for x in ts], dtype='datetime64[us]')]
+
+    def build(data, formats=None):
+        ctx = InsertContext('fake_table', names, types, data, column_oriented=True, column_formats=formats)
+        return b''.join(NativeTransform.build_insert(ctx))
+
+    assert build(np_data) == build(python_data, {'ts': 'int'})
+
+    # Numpy casts that do not fit the column type fail the insert
+    ctx = InsertContext('fake_table', ['i16'], [get_from_name('int16')], [np.array([1, 70000])],
+                        column_oriented=True)
+    assert b''.join(NativeTransform.build_insert(ctx)).endswith(b'INTERNAL EXCEPTION WHILE SERIALIZING')
+    assert 'out of range' in str(ctx.insert_exception)
+
+    # NaN is only written as NULL for Nullable integer and decimal columns, and infinite values are never valid
+    for type_name in ('int32', 'decimal(10, 2)', 'decimal(40, 2)'):
+        for column, error in (([1.5, np.nan], 'NaN'), ([1.5, np.inf], 'infinite')):
+            ctx = InsertContext('fake_table', ['x'], [get_from_name(type_name)], [np.array(column)],
+                                column_oriented=True)
+            assert b''.join(NativeTransform.build_insert(ctx)).endswith(b'INTERNAL EXCEPTION WHILE SERIALIZING')
+            assert error in str(ctx.insert_exception)
+        ctx = InsertContext('fake_table', ['x'], [get_from_name(f'nullable({type_name})')],
+                            [np.array([1.0, np.nan])], column_oriented=True)
+        ctx.current_block = 1
+        output = b''.join(NativeTransform.build_insert(ctx))
+        assert NativeTransform.parse_response(bytes_source(output)).result_columns[0] == [1, None]
+
+    # NaT is only written as NULL for Nullable columns
+    nat_column = np.array(['2020-05-02', 'NaT'], dtype='datetime64[s]')
+    for type_name in ('date', 'datetime', 'datetime64(3)'):
+        ctx = InsertContext('fake_table', ['ts'], [get_from_name(type_name)], [nat_column], column_oriented=True)
+        assert b''.join(NativeTransform.build_insert(ctx)).endswith(b'INTERNAL EXCEPTION WHILE SERIALIZING')
+        assert 'NaT' in str(ctx.insert_exception)
+    ctx = InsertContext('fake_table', ['ts'], [get_from_name('nullable(datetime)')], [nat_column],
+                        column_oriented=True)
+    ctx.current_block = 1
+    output = b''.join(NativeTransform.build_insert(ctx))
+    assert ctx.insert_exception is None
+    assert NativeTransform.parse_response(bytes_source(output)).result_columns[0] == \
+        [datetime.datetime(2020, 5, 2), None]
+
+
+def test_low_card_insert():
+    pd = pytest.importorskip('pandas')
+    arrow = pytest.importorskip('pyarrow')
+    names = ['label', 'tag']
+    types = [get_from_name('low_cardinality(string)'), get_from_name('low_cardinality(nullable(string))')]
+    labels = ['x', 'y', 'x', 'z']
+    tags = [None, 'a', 'b', 'a']
+
+    def read(data):
+        ctx = InsertContext('fake_table', names, types, data, column_oriented=True)
+        ctx.current_block = 1
+        output = b''.join(NativeTransform.build_insert(ctx))
+        return [list(column) for column in NativeTransform.parse_response(bytes_source(output)).result_columns]
+
+    expected = [labels, tags]
+    assert read([labels, tags]) == expected
+    assert read([pd.Categorical(labels), pd.Categorical(tags)]) == expected
+    assert read([arrow.array(labels).dictionary_encode(), arrow.array(tags)]) == expected
+    assert read(pd.DataFrame({'label': pd.Categorical(labels), 'tag': pd.Series(tags, dtype='category')})) == expected
+
+
+def test_columnar_container_insert():
+    np = pytest.importorskip('numpy')
+    arrow = pytest.importorskip('pyarrow')
+    names = ['vec', 'attrs']
+    types = [get_from_name('array(float32)'), get_from_name('map(string, int64)')]
+    vectors = [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]]
+    attrs = [{'a': 1}, {}, {'b': 2, 'c': 3}]
+
+    def read(data):
+        ctx = InsertContext('fake_table', names, types, data, column_oriented=True)
+        ctx.current_block = 1
+        output = b''.join(NativeTransform.build_insert(ctx))
+        return NativeTransform.parse_response(bytes_source(output)).result_columns
+
+    arrow_attrs = arrow.array([list(x.items()) for x in attrs], arrow.map_(arrow.string(), arrow.int64()))
+    expected = [vectors, attrs]
+    assert read([vectors, attrs]) == expected
+    assert read([np.array(vectors, dtype='float32'), arrow_attrs]) == expected
+    assert read([list(np.array(vectors)), arrow_attrs]) == expected
+    assert read([arrow.array(vectors, arrow.list_(arrow.float32())), arrow_attrs]) == expected
+    assert read([arrow.array(vectors).slice(1), arrow_attrs.slice(1)]) == [vectors[1:], attrs[1:]]
+
+
+def test_low_card_float_nan_insert():
+    names = ['value']
+    types = [get_from_name('low_cardinality(nullable(float64))')]
+    ctx = InsertContext('fake_table', names, types, [[1.5, float('nan'), None, 1.5]], column_oriented=True)
+    ctx.current_block = 1
+    output = b''.join(NativeTransform.build_insert(ctx))
+    column = list(NativeTransform.parse_response(bytes_source(output)).result_columns[0])
+    assert column[0] == column[3] == 1.5
+    assert math.isnan(column[1])
+    assert column[2] is None
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+from timeplus_connect.datatypes.registry import get_from_name
+from timeplus_connect.driver.exceptions import DatabaseError
+from timeplus_connect.driver.insert import InsertContext
+from timeplus_connect.driver.inserter import BufferedInserter
+from timeplus_connect.driver.summary import QuerySummary
+
+
+class FakeClient:
+    def __init__(self, fail: bool = False):
+        self.inserted = []
+        self.fail = fail
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments,unused-argument,no-self-use
+    def create_insert_context(self, table, column_names, database, column_types, column_type_names,
+                              column_oriented=False, settings=None, transport_settings=None):
+        return InsertContext(table, ['id', 'name'], [get_from_name('uint64'), get_from_name('string')],
+                             column_oriented=column_oriented)
+
+    def data_insert(self, context: InsertContext):
+        if self.fail:
+            context.data = None
+            raise DatabaseError('insert failed')
+        self.inserted.append([list(col) for col in context.data])
+        rows = context.row_count
+        context.data = None
+        return QuerySummary({'written_rows': str(rows)})
+
+
+def test_buffered_inserter():
+    client = FakeClient()
+    inserter = BufferedInserter(client, max_rows=1000, max_latency=60)
+
+    def produce(start: int):
+        for ix in range(start, start + 2500):
+            inserter.insert_row('events', (ix, f'n{ix}'))
+
+    threads = [threading.Thread(target=produce, args=(ix * 2500,)) for ix in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    inserter.insert_columns('events', [[10000, 10001], ['a', 'b']])
+    inserter.flush()
+    ids = sorted(x for batch in client.inserted for x in batch[0])
+    assert ids == list(range(10002))
+    assert inserter.total_rows == 10002
+    assert all(stats.summary.written_rows == stats.rows for stats in inserter.recent_flushes)
+    inserter.insert_rows('events', [(1, 'x')])
+    inserter.close()
+    assert client.inserted[-1] == [[1], ['x']]
+
+
+def test_buffered_inserter_latency_and_errors():
+    client = FakeClient(fail=True)
+    flushed = []
+    inserter = BufferedInserter(client, max_latency=0.05, on_flush=flushed.append)
+    inserter.insert_row('events', (1, 'a'))
+    deadline = time.monotonic() + 5
+    while not flushed and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert flushed and isinstance(flushed[0].error, DatabaseError)
+    assert inserter.failed_rows == 1
+    with pytest.raises(DatabaseError):
+        inserter.flush()
+    inserter.close()
+
+
+def test_buffered_inserter_backpressure():
+    client = FakeClient()
+    # A tiny buffer forces producers to wait for the flush thread
+    inserter = BufferedInserter(client, max_latency=60, max_buffer_bytes=64)
+    for ix in range(200):
+        inserter.insert_row('events', (ix, 'abc'))
+    inserter.close()
+    assert sorted(x for batch in client.inserted for x in batch[0]) == list(range(200))
+    assert len(client.inserted) > 1
+
+
+# pylint: disable=protected-access
+def test_buffered_inserter_blocked_idle():
+    inserter = BufferedInserter(FakeClient(), max_latency=60)
+    calls = []
+    ready = inserter._ready
+    inserter._ready = lambda now, flush_all: calls.append(now) or ready(now, flush_all)
+    with inserter._lock:
+        inserter._blocked = 1
+        inserter._wake.notify()
+    time.sleep(0.2)
+    with inserter._lock:
+        inserter._blocked = 0
+    # The flush thread waits instead of spinning while a producer is blocked and nothing is buffered
+    assert len(calls) < 5
+    inserter.close()
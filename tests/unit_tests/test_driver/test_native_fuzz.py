@@ -1,9 +1,19 @@
+import asyncio
 import os
 import random
+import uuid
+from concurrent.futures import Future
 
+import pytest
+
+from timeplus_connect import common
 from timeplus_connect.datatypes.registry import get_from_name
 from timeplus_connect.driver.common import coerce_bool
 from timeplus_connect.driver.buffer import ResponseBuffer as PyBuff
+from timeplus_connect.driver.options import np, pd
+from timeplus_connect.driver.procdecode import SharedColumn, decode_column, discard_column
+from timeplus_connect.driver.query import QueryContext
+from timeplus_connect.driver.transform import AsyncBlockReader
 from timeplus_connect.driverc.buffer import ResponseBuffer as CBuff  # pylint: disable=no-name-in-module
 from tests.helpers import random_columns, random_data, native_transform, native_insert_block, bytes_source
 
@@ -47,3 +57,136 @@ def test_native_small():
         assert data_result.column_names == col_names
         assert data_result.column_types == col_types
         assert data_result.result_set == data
+
+
+def test_native_parallel_decode():
+    test_runs = int(os.environ.get('CLICKHOUSE_CONNECT_TEST_FUZZ', '200')) // 4
+    common.set_setting('decode_threads', 4)
+    try:
+        for _ in range(test_runs):
+            data_rows = random.randint(1, MAX_DATA_ROWS)
+            col_names, col_types = random_columns(TEST_COLUMNS)
+            data = random_data(col_types, data_rows)
+            col_names = ('row_id',) + col_names
+            col_types = (get_from_name('uint32'),) + col_types
+            output = native_insert_block(data, column_names=col_names, column_types=col_types)
+            for cls in CBuff, PyBuff:
+                data_result = native_transform.parse_response(bytes_source(output, cls=cls))
+                assert data_result.column_types == col_types
+                assert data_result.result_set == data
+    finally:
+        common.set_setting('decode_threads', 0)
+
+
+def test_native_process_decode():
+    test_runs = int(os.environ.get('CLICKHOUSE_CONNECT_TEST_FUZZ', '200')) // 20
+    common.set_setting('decode_processes', 2)
+    try:
+        for _ in range(test_runs):
+            data_rows = random.randint(1, MAX_DATA_ROWS)
+            col_names, col_types = random_columns(TEST_COLUMNS)
+            data = random_data(col_types, data_rows)
+            col_names = ('row_id',) + col_names
+            col_types = (get_from_name('uint32'),) + col_types
+            output = native_insert_block(data, column_names=col_names, column_types=col_types)
+            data_result = native_transform.parse_response(bytes_source(output, cls=BuffCls))
+            assert data_result.column_types == col_types
+            assert data_result.result_set == data
+    finally:
+        common.set_setting('decode_processes', 0)
+
+
+def test_process_shared_columns():
+    if np is None:
+        return
+    column = np.array([str(x) * 8 for x in range(1000)])
+    shared = SharedColumn.share(column)
+    assert np.array_equal(shared.attach(), column)
+
+    # Fixed width numpy columns come back from the worker processes, object columns are decoded locally
+    col_names = ('ts', 'name', 'id')
+    col_types = (get_from_name("datetime('America/Denver')"), get_from_name('string'), get_from_name('uuid'))
+    # The DateTime and UUID columns are large enough (MIN_PROCESS_BYTES) to be sent to the worker processes
+    data = [(x * 60, str(x % 100), uuid.UUID(int=x)) for x in range(300000)]
+    output = native_insert_block(data, column_names=col_names, column_types=col_types) * 2
+    expected = native_transform.parse_response(bytes_source(output), QueryContext(use_numpy=True)).np_result
+    expected_df = None
+    if pd is not None:
+        expected_df = native_transform.parse_response(bytes_source(output), QueryContext(use_numpy=True, as_pandas=True)).df_result
+    common.set_setting('decode_processes', 2)
+    try:
+        result = native_transform.parse_response(bytes_source(output), QueryContext(use_numpy=True)).np_result
+        if pd is not None:
+            result_df = native_transform.parse_response(bytes_source(output), QueryContext(use_numpy=True, as_pandas=True)).df_result
+            assert result_df.equals(expected_df)
+    finally:
+        common.set_setting('decode_processes', 0)
+    assert result.tolist() == expected.tolist()
+
+    # Timezone aware pandas datetimes are shared as fixed width columns, Python objects are returned as is
+    if pd is not None:
+        raw = native_insert_block([(0,), (3600,)], column_names=('ts',), column_types=col_types[:1])
+        ctx = QueryContext(use_numpy=True, as_pandas=True)
+        ctx.start_column('ts')
+        column, fixed = decode_column(col_types[0], raw[-8:], 2, ctx)
+        assert fixed and isinstance(column, SharedColumn)
+        assert column.attach().tolist() == [pd.Timestamp(x, unit='s', tz='America/Denver') for x in (0, 3600)]
+        column, fixed = decode_column(col_types[2], bytes(32), 2, QueryContext(use_numpy=True))
+        assert not fixed and list(column) == [uuid.UUID(int=0)] * 2
+
+    # Unused shared columns are removed
+    future = Future()
+    future.set_result((SharedColumn.share(np.arange(1000)), True))
+    discard_column(future)
+    with pytest.raises(FileNotFoundError):
+        future.result()[0].attach()
+
+
+def test_native_async_blocks(monkeypatch):
+    test_runs = int(os.environ.get('CLICKHOUSE_CONNECT_TEST_FUZZ', '200')) // 4
+
+    async def chunks(output: bytes):
+        ix = 0
+        while ix < len(output):
+            size = random.randint(1, 256)
+            yield output[ix: ix + size]
+            ix += size
+
+    async def read_blocks(output: bytes):
+        reader = AsyncBlockReader(chunks(output))
+        blocks = []
+        while True:
+            block = await reader.next_block()
+            if block is None:
+                return reader, blocks
+            blocks.append(block)
+
+    for _ in range(test_runs):
+        col_names, col_types = random_columns(TEST_COLUMNS)
+        batches = [random_data(col_types, random.randint(1, MAX_DATA_ROWS)) for _ in range(3)]
+        col_names = ('row_id',) + col_names
+        col_types = (get_from_name('uint32'),) + col_types
+        output = b''.join(native_insert_block(data, column_names=col_names, column_types=col_types)
+                          for data in batches)
+        # Small attempt sizes resume the block scans after every few chunks
+        monkeypatch.setattr(AsyncBlockReader, '_MIN_ATTEMPT', random.choice((16, 1 << 16)))
+        reader, blocks = asyncio.run(read_blocks(output))
+        assert tuple(reader.names) == col_names
+        assert tuple(reader.col_types) == col_types
+        assert [list(zip(*block)) for block in blocks] == [[tuple(row) for row in data] for data in batches]
+
+
+def test_decode_threads_change():
+    col_names = ('row_id', 'name')
+    col_types = (get_from_name('uint32'), get_from_name('string'))
+    data = [(ix, f'n{ix}') for ix in range(50)]
+    output = bytes(native_insert_block(data, column_names=col_names, column_types=col_types))
+    common.set_setting('decode_threads', 2)
+    try:
+        # The first block is decoded when the response is parsed, the rest while the result is read
+        result = native_transform.parse_response(bytes_source(output * 3, cls=BuffCls))
+        common.set_setting('decode_threads', 3)
+        assert native_transform.parse_response(bytes_source(output, cls=BuffCls)).result_set == data
+        assert result.result_set == data * 3
+    finally:
+        common.set_setting('decode_threads', 0)
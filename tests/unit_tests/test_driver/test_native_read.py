@@ -1,12 +1,19 @@
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
 from ipaddress import IPv4Address
 from uuid import UUID
+
+import pytz
 import pytest
 
+from timeplus_connect import common
 from timeplus_connect.datatypes import registry
+from timeplus_connect.driver import ctypes
+from timeplus_connect.driver.exceptions import DataError
 from timeplus_connect.driver.insert import InsertContext
 from timeplus_connect.driver.query import QueryContext
 from timeplus_connect.driver.transform import NativeTransform
-from tests.helpers import bytes_source
+from tests.helpers import bytes_source, native_insert_block
 from tests.unit_tests.test_driver.binary import NESTED_BINARY
 
 UINT16_NULLS = """
@@ -79,6 +86,39 @@ def test_low_cardinality():
     assert result.result_set == [('CDMA',), ('GSM',), ('UMTS',)]
 
 
+def test_low_card_numpy():
+    pd = pytest.importorskip('pandas')
+    names = ('label', 'tag')
+    col_types = (registry.get_from_name('low_cardinality(string)'),
+                 registry.get_from_name('low_cardinality(nullable(string))'))
+    first = [('x', None), ('y', 'a'), ('x', 'b')]
+    second = [('z', 'a')]
+    output = native_insert_block(first, names, col_types) * 2 + native_insert_block(second, names, col_types)
+    expected = first * 2 + second
+
+    np_result = parse_response(bytes_source(output), QueryContext(use_numpy=True)).np_result
+    assert [tuple(row) for row in np_result.tolist()] == expected
+    common.set_setting('pandas_categorical', True)
+    try:
+        df = parse_response(bytes_source(output), QueryContext(use_numpy=True, as_pandas=True)).df_result
+    finally:
+        common.set_setting('pandas_categorical', False)
+    assert isinstance(df['label'].dtype, pd.CategoricalDtype)
+    assert df['label'].tolist() == [row[0] for row in expected]
+    assert df['tag'].isna().tolist() == [row[1] is None for row in expected]
+    assert df['tag'].dropna().tolist() == [row[1] for row in expected if row[1] is not None]
+
+    # The cached dictionaries are released once the result is read or the stream is closed
+    context = QueryContext(use_numpy=True)
+    parse_response(bytes_source(output), context).np_result  # pylint: disable=expression-not-assigned
+    assert not context.lc_dictionaries
+    context = QueryContext(use_numpy=True)
+    with parse_response(bytes_source(output), context).np_stream as stream:
+        next(stream)
+        assert context.lc_dictionaries
+    assert not context.lc_dictionaries
+
+
 def test_low_card_array():
     pytest.skip("binary data has not been modified yet")
     result = parse_response(bytes_source(LOW_CARD_ARRAY))
@@ -102,6 +142,136 @@ def test_ip():
     assert tuple(python) == tuple(IPv4Address(ip) for ip in ips)
 
 
+def test_raw_formats():
+    pytest.importorskip('numpy')
+    uuids = [UUID('1d439f79-c57d-5f23-52c6-ffccca93e1a9'), UUID(int=0), UUID(int=255)]
+    for type_name, values, fmt, expected in (('uuid', uuids, 'string', [str(x) for x in uuids]),
+                                             ('uuid', uuids, 'bytes', [x.bytes for x in uuids]),
+                                             ('ipv6', ['::1', '10.2.3.4'], 'bytes',
+                                              [b'\x00' * 15 + b'\x01', b'\x00' * 10 + b'\xff\xff\x0a\x02\x03\x04']),
+                                             ('ipv4', ['10.2.3.4'], 'int', [0x0a020304])):
+        col_type = registry.get_from_name(type_name)
+        dest = bytearray()
+        col_type.write_column(values, dest, InsertContext('', [], []))
+        for use_numpy in (False, True):
+            ctx = QueryContext(column_formats={'x': fmt}, use_numpy=use_numpy)
+            ctx.start_column('x')
+            column = col_type.read_column_data(bytes_source(bytes(dest)), len(values), ctx, None)
+            if use_numpy:
+                assert column.dtype.kind in 'USu'
+                rewrite = bytearray()
+                col_type.write_column(column, rewrite, InsertContext('', [], []))
+                assert rewrite == dest
+                # Numpy 'S' values drop trailing zero bytes, so compare the raw values
+                column = (column.view('V16') if column.dtype.kind == 'S' else column).tolist()
+            assert list(column) == expected
+
+
+def test_decimal():
+    np = pytest.importorskip('numpy')
+    arrow = pytest.importorskip('pyarrow')
+    values = [Decimal('1.25'), Decimal('-0.29'), Decimal('-123456.5'), Decimal(0)]
+    for type_name in ('decimal(18, 4)', 'nullable(decimal(38, 4))', 'decimal(76, 2)'):
+        dec_type = registry.get_from_name(type_name)
+        dest = bytearray()
+        dec_type.write_column(values, dest, InsertContext('', [], []))
+        for column in (np.array([1.25, -0.29, -123456.5, 0]), arrow.array(values, arrow.decimal128(10, 2))):
+            np_dest = bytearray()
+            dec_type.write_column(column, np_dest, InsertContext('', [], []))
+            assert np_dest == dest
+
+        def read(dec_type=dec_type, dest=dest, **kwargs):
+            ctx = QueryContext(**kwargs)
+            ctx.start_column('x')
+            return dec_type.read_column_data(bytes_source(bytes(dest)), 4, ctx, None)
+
+        assert list(read()) == values
+        assert str(read()[1]) == ('-0.29' if dec_type.scale == 2 else '-0.2900')
+        assert list(read(column_formats={'x': 'int'})) == [int(x.scaleb(dec_type.scale)) for x in values]
+        assert list(read(column_formats={'x': 'float'}, use_numpy=True)) == [float(x) for x in values]
+
+
+
+def test_decimal_float_rounding():
+    np = pytest.importorskip('numpy')
+    values = [12345678.999, -2.675, 1.999, 0.29, -0.29, 1.005, 0.125, -7778499.8895, 834632.7895, 0]
+    for type_name in ('decimal(10, 2)', 'decimal(9, 1)', 'nullable(decimal(18, 6))', 'decimal(40, 2)'):
+        dec_type = registry.get_from_name(type_name)
+        dest = bytearray()
+        dec_type.write_column(values, dest, InsertContext('', [], []))
+        np_dest = bytearray()
+        dec_type.write_column(np.array(values), np_dest, InsertContext('', [], []))
+        assert np_dest == dest
+    dest = bytearray()
+    registry.get_from_name('decimal(10, 2)').write_column(np.array([12345678.999, -2.675]), dest,
+                                                           InsertContext('', [], []))
+    assert np.frombuffer(dest, dtype='<i8').tolist() == [1234567900, -267]
+
+    # Scales of 19 and more have multipliers that do not fit in an int64
+    dec_type = registry.get_from_name('decimal(38, 20)')
+    for values in ([0.01, 0.0], [0, 0]):
+        dest, np_dest = bytearray(), bytearray()
+        dec_type.write_column(values, dest, InsertContext('', [], []))
+        dec_type.write_column(np.array(values), np_dest, InsertContext('', [], []))
+        assert np_dest == dest
+
+
+def big_int_column(type_name: str):
+    int_type = registry.get_from_name(type_name)
+    bits = int_type.byte_size * 8
+    signed = 'uint' not in type_name
+    low, high = (-2 ** (bits - 1), 2 ** (bits - 1) - 1) if signed else (0, 2 ** bits - 1)
+    values = [low, high, 0, 5, 2 ** 63, 2 ** 64 + 1] + ([-1, -2 ** 63 - 1] if signed else [])
+    dest = bytearray()
+    int_type.write_column(values, dest, InsertContext('', [], []))
+    return int_type, values, bytes(dest)
+
+
+@pytest.mark.parametrize('type_name', ['int128', 'uint128', 'nullable(int256)', 'uint256'])
+def test_big_int(type_name):
+    np = pytest.importorskip('numpy')
+    int_type, values, dest = big_int_column(type_name)
+    small = [0, 5, 2 ** 63 - 1]
+    small_dest, np_dest = bytearray(), bytearray()
+    int_type.write_column(small, small_dest, InsertContext('', [], []))
+    int_type.write_column(np.array(small), np_dest, InsertContext('', [], []))
+    assert np_dest == small_dest
+
+    active = ctypes.active_backend()
+    try:
+        for backend in ctypes.available_backends():
+            ctypes.set_backend(backend)
+            ctx = QueryContext()
+            ctx.start_column('x')
+            source = bytes_source(dest, cls=ctypes.RespBuffCls)
+            assert list(int_type.read_column_data(source, len(values), ctx, None)) == values
+    finally:
+        ctypes.set_backend(active)
+
+
+@pytest.mark.parametrize('type_name', ['int128', 'uint128', 'nullable(int256)', 'uint256'])
+def test_big_int_hilo(type_name):
+    pytest.importorskip('numpy')
+    int_type, values, dest = big_int_column(type_name)
+    ctx = QueryContext(column_formats={'x': 'hilo'}, use_numpy=True)
+    ctx.start_column('x')
+    hilo = int_type.read_column_data(bytes_source(dest), len(values), ctx, None)
+    assert hilo.dtype == int_type.np_hilo_type
+    assert int(hilo['hi'][1]) == values[1] >> (int_type.byte_size * 8 - 64)
+    hilo_dest = bytearray()
+    int_type.write_column(hilo, hilo_dest, InsertContext('', [], []))
+    assert hilo_dest == dest
+
+
+def test_big_int_unsigned_negative():
+    np = pytest.importorskip('numpy')
+    int_type = registry.get_from_name('uint128')
+    with pytest.raises(OverflowError):
+        int_type.write_column([1, -1], bytearray(), InsertContext('', [], []))
+    with pytest.raises(DataError):
+        int_type.write_column(np.array([1, -1]), bytearray(), InsertContext('', [], []))
+
+
 def test_point():
     pytest.skip("proton does not support geometric type")
     points = ((3.22, 3.22),(5.22, 5.22),(4.22, 4.22))
@@ -116,3 +286,68 @@ def test_nested():
     pytest.skip("proton does not support geometric type")
     result = parse_response (bytes_source(NESTED_BINARY))
     check_result(result, [{'str1': 'one', 'int32': 5}, {'str1': 'two', 'int32': 55}], 2, 0)
+
+
+def test_columnar_containers():
+    names = ('vec', 'attrs', 'nested', 'pairs')
+    col_types = [registry.get_from_name(name) for name in
+                 ('array(float64)', 'map(string, int32)', 'array(array(int64))', 'array(tuple(string, int8))')]
+    data = [([1.5, 2.5], {'a': 1, 'b': 2}, [[1], [2, 3]], [('x', 1)]),
+            ([], {}, [], []),
+            ([3.5, 4.5], {'c': 3}, [[]], [('y', 2), ('z', 3)])]
+    output = native_insert_block(data, names, col_types)
+    formats = {'array': 'columnar', 'map': 'columnar', 'tuple': 'columnar'}
+    with parse_response(bytes_source(output), QueryContext(query_formats=formats)).column_block_stream as stream:
+        vec, attrs, nested, pairs = next(iter(stream))
+    assert len(vec) == 3 and list(vec.offsets) == [0, 2, 2, 4]
+    assert vec == [row[0] for row in data]
+    assert attrs == [row[1] for row in data]
+    assert nested == [row[2] for row in data]
+    assert pairs == [row[3] for row in data]
+    assert attrs[-1] == {'c': 3} and vec[1:] == [[], [3.5, 4.5]]
+
+    np = pytest.importorskip('numpy')
+    np_result = parse_response(bytes_source(output), QueryContext(query_formats=formats, use_numpy=True)).np_result
+    assert np_result[2][0].tolist() == [3.5, 4.5]
+    dest = bytearray()
+    col_types[0].write_column([row[0] for row in data], dest, InsertContext('', [], []))
+    ctx = QueryContext(query_formats=formats, use_numpy=True)
+    ctx.start_column('vec')
+    vec = col_types[0].read_column(bytes_source(bytes(dest)), 3, ctx)
+    assert vec.values.dtype == np.float64
+    assert np.asarray(vec).shape == (3,)
+    assert vec[2:].to_numpy().tolist() == [[3.5, 4.5]]
+
+
+def test_temporal_timezones():
+    pytest.importorskip('numpy')
+    # Includes values on both sides of US daylight saving time transitions, and before 1970 for DateTime64
+    seconds = [0, 1678611599, 1678611600, 1699174799, 1699174800, 2 ** 32 - 1]
+    denver = pytz.timezone('America/Denver')
+    for tz in (None, denver, pytz.timezone('Asia/Kolkata'), timezone(timedelta(hours=-3))):
+        ctx = QueryContext(query_tz=tz)
+        ctx.start_column('x')
+        dt_type = registry.get_from_name('datetime')
+        dest = bytearray()
+        dt_type.write_column(seconds, dest, InsertContext('', [], []))
+        active_tz = ctx.active_tz(None)
+        expected = [datetime.fromtimestamp(x, active_tz) if active_tz else datetime.utcfromtimestamp(x) for x in seconds]
+        column = dt_type.read_column_data(bytes_source(bytes(dest)), len(seconds), ctx, None)
+        assert list(column) == expected
+        assert [x.tzinfo for x in column] == [x.tzinfo for x in expected]
+
+    dt64_type = registry.get_from_name("datetime64(3, 'America/Denver')")
+    ticks = [-2208988800123, 1678611599999, 1678611600001]
+    dest = bytearray()
+    dt64_type.write_column(ticks, dest, InsertContext('', [], []))
+    ctx = QueryContext()
+    ctx.start_column('x')
+    column = dt64_type.read_column_data(bytes_source(bytes(dest)), len(ticks), ctx, None)
+    assert column == dt64_type._read_binary_tz(ticks, denver)  # pylint: disable=protected-access
+    assert column[2].utcoffset() == timedelta(hours=-6)
+
+    days = [0, 19000, 65535]
+    dest = bytearray()
+    registry.get_from_name('date').write_column(days, dest, InsertContext('', [], []))
+    column = registry.get_from_name('date').read_column_data(bytes_source(bytes(dest)), 3, ctx, None)
+    assert column == [date(1970, 1, 1) + timedelta(days=x) for x in days]
@@ -0,0 +1,76 @@
+import re
+import threading
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from timeplus_connect.driver.common import StreamContext
+from timeplus_connect.driver.exceptions import ProgrammingError, DatabaseError
+from timeplus_connect.driver.parallel import partition_conditions, ParallelQuery
+
+
+class FakeSource:
+    def close(self):
+        pass
+
+
+class FakeClient:
+    def __init__(self, session_id: str = None, ids=range(20)):
+        self.session_id = session_id
+        self.ids = ids
+        self.threads = set()
+
+    def get_client_setting(self, key):
+        return self.session_id if key == 'session_id' else None
+
+    # pylint: disable=unused-argument
+    def query_df(self, query, parameters=None, settings=None, transport_settings=None):
+        self.threads.add(threading.get_ident())
+        if 'modulo(abs(id)' in query and 'SELECT name' in query:
+            raise DatabaseError("HTTPDriver received Timeplus error code 47\n Code: 47. Unknown identifier: 'id'")
+        part = int(re.search(r'modulo\(abs\(id\), 4\) = (\d)', query).group(1))
+        return pd.DataFrame({'id': [x for x in self.ids if abs(x) % 4 == part]})
+
+    def query_df_stream(self, query, **kwargs):
+        df = self.query_df(query, **kwargs)
+        return StreamContext(FakeSource(), (df[ix: ix + 2] for ix in range(0, len(df), 2)))
+
+
+def test_partition_conditions():
+    assert partition_conditions(2, shard_expression='shard_id') == ['(shard_id) = 0', '(shard_id) = 1']
+    conditions = partition_conditions(2, time_range=(datetime(2024, 1, 1), datetime(2024, 1, 2)))
+    assert conditions[1] == "_tp_time >= '2024-01-01 12:00:00' AND _tp_time < '2024-01-02 00:00:00'"
+    with pytest.raises(ProgrammingError):
+        partition_conditions(2, shard_expression='a', modulo_key='b')
+
+
+def test_parallel_query():
+    client = FakeClient()
+    query = ParallelQuery(client, 'SELECT id FROM events', partition_conditions(4, modulo_key='id'))
+    df = query.result()
+    assert list(df['id']) == [x for part in range(4) for x in range(20) if x % 4 == part]
+    with ParallelQuery(client, 'SELECT id FROM events', partition_conditions(4, modulo_key='id'),
+                       max_workers=2).stream() as stream:
+        assert sorted(x for block in stream for x in block['id']) == list(range(20))
+    with pytest.raises(ProgrammingError):
+        ParallelQuery(FakeClient('session'), 'SELECT 1', ['1'])
+
+
+def test_parallel_query_negative_keys():
+    client = FakeClient(ids=range(-10, 10))
+    conditions = partition_conditions(4, modulo_key='id')
+    assert conditions[1] == 'modulo(abs(id), 4) = 1'
+    assert sorted(ParallelQuery(client, 'SELECT id FROM events', conditions).result()['id']) == list(range(-10, 10))
+    with ParallelQuery(client, 'SELECT id FROM events', conditions).stream() as stream:
+        assert sorted(x for block in stream for x in block['id']) == list(range(-10, 10))
+
+
+def test_parallel_query_missing_partition_column():
+    client = FakeClient()
+    conditions = partition_conditions(4, modulo_key='id')
+    with pytest.raises(ProgrammingError, match='must select every column'):
+        ParallelQuery(client, 'SELECT name FROM events', conditions).result()
+    with pytest.raises(ProgrammingError, match='must select every column'):
+        with ParallelQuery(client, 'SELECT name FROM events', conditions).stream() as stream:
+            list(stream)
@@ -0,0 +1,116 @@
+import os
+
+import pytest
+
+from timeplus_connect.driver.exceptions import OperationalError, DatabaseError
+from timeplus_connect.driver.spool import InsertSpool, SpoolEntry, SpoolReplayer, REJECTED_DIR, retryable
+
+
+class FakeClient:
+    def __init__(self):
+        self.available = False
+        self.inserted = []
+        self.insert_limit = None
+
+    def command(self, cmd):
+        if not self.available:
+            raise OperationalError('server unavailable')
+        return cmd
+
+    # pylint: disable=too-many-arguments,unused-argument
+    def raw_insert(self, table, insert_block, settings, compression, transport_settings):
+        if not self.available or len(self.inserted) == self.insert_limit:
+            raise OperationalError('server unavailable')
+        if insert_block == b'bad':
+            raise DatabaseError('Code: 27. Cannot parse input')
+        if insert_block == b'busy':
+            raise DatabaseError('HTTPDriver for http://localhost:8123 received Timeplus error code 252')
+        self.inserted.append((insert_block, settings['insert_deduplication_token']))
+
+
+def entry(ix: int, payload: bytes = None):
+    return SpoolEntry('events', 'lz4', {'insert_deduplication_token': f't{ix}'}, {}, payload or bytes([ix]) * 100)
+
+
+def test_spool_replay(tmp_path):
+    spool = InsertSpool(str(tmp_path), segment_size=500, fsync=False)
+    for ix in range(10):
+        spool.write(entry(ix, b'bad' if ix == 4 else None))
+    # A truncated entry at the end of the active segment (e.g. from a crash) is ignored
+    spool.close()
+    segments = spool.sealed_segments()
+    assert len(segments) > 1
+    with open(segments[-1], 'ab') as segment:
+        segment.write(b'TPS1\x05')
+
+    client = FakeClient()
+    replayer = SpoolReplayer(spool, client, concurrency=3)
+    stats = replayer.replay()
+    assert not stats.complete and stats.inserts == 0
+    assert spool.pending
+
+    client.available = True
+    stats = replayer.replay()
+    assert stats.complete and stats.inserts == 9 and stats.rejected == 1
+    assert sorted(token for _, token in client.inserted) == sorted(f't{ix}' for ix in range(10) if ix != 4)
+    assert not spool.pending
+    assert len(os.listdir(tmp_path / REJECTED_DIR)) == 1
+
+    # A new spool on the same directory continues after the existing segment numbers
+    spool.write(entry(11))
+    assert len(InsertSpool(str(tmp_path)).sealed_segments()) == 1
+
+
+def test_spool_streamed_entries(tmp_path):
+    spool = InsertSpool(str(tmp_path), fsync=False)
+    settings = {'database': 'metrics', 'insert_deduplication_token': 't1'}
+    spool.write(SpoolEntry('events', None, settings, {}, (bytes([x]) * 1000 for x in range(5))))
+
+    def failing_chunks():
+        yield b'partial'
+        raise ValueError('bad insert data')
+
+    with pytest.raises(ValueError):
+        spool.write(SpoolEntry('events', None, settings, {}, failing_chunks()))
+    spool.write(SpoolEntry('events', None, settings, {}, b'busy'))
+    entries = list(InsertSpool.read_segment(spool.sealed_segments()[0]))
+    assert len(entries) == 2
+    assert entries[0].settings['database'] == 'metrics'
+    assert entries[0].payload == b''.join(bytes([x]) * 1000 for x in range(5))
+
+    # Transient server errors keep the entry for the next replay instead of rejecting it
+    client = FakeClient()
+    client.available = True
+    stats = SpoolReplayer(spool, client).replay()
+    assert not stats.complete and stats.rejected == 0
+    assert spool.pending
+    assert not os.listdir(tmp_path / REJECTED_DIR)
+
+
+def test_spool_partial_replay(tmp_path):
+    spool = InsertSpool(str(tmp_path), fsync=False)
+    for ix in range(8):
+        spool.write(entry(ix, b'bad' if ix == 1 else None))
+    client = FakeClient()
+    client.available = True
+    client.insert_limit = 3
+    replayer = SpoolReplayer(spool, client, concurrency=1)
+    stats = replayer.replay()
+    assert not stats.complete and stats.inserts == 3 and stats.rejected == 1
+
+    # Inserts that were accepted or rejected are not replayed or rejected again
+    client.insert_limit = None
+    stats = replayer.replay()
+    assert stats.complete and stats.inserts == 4 and stats.rejected == 0
+    assert [token for _, token in client.inserted] == [f't{ix}' for ix in range(8) if ix != 1]
+    assert len(os.listdir(tmp_path / REJECTED_DIR)) == 1
+    assert not spool.pending
+
+
+def test_retryable_errors():
+    assert retryable(OperationalError('Error executing HTTP request'))
+    assert retryable(DatabaseError('HTTPDriver for http://localhost:8123 returned response code 502'))
+    assert retryable(DatabaseError('The Timeplus server returned an error.'))
+    assert retryable(DatabaseError('received Timeplus error code 241\n Code: 241. Memory limit exceeded'))
+    assert not retryable(DatabaseError('received Timeplus error code 60\n Code: 60. Unknown stream'))
+    assert not retryable(DatabaseError('HTTPDriver for http://localhost:8123 returned response code 400'))
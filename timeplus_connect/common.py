@@ -85,3 +85,28 @@ _init_common('max_error_size', (), 1024)
 
 # HTTP raw data buffer for streaming queries.  This should not be reduced below 64KB to ensure compatibility with LZ4 compression
 _init_common('http_buffer_size', (), 10 * 1024 * 1024)
+
+# Maximum number of decompressed HTTP response chunks read ahead of the consumer by a background reader thread.  If 0,
+# the response is read, decompressed and decoded on the same thread
+_init_common('http_read_ahead', (), 0)
+
+# Number of threads used to decode the columns of each Native format block concurrently.  Values less than 2 decode
+# columns serially on the reading thread
+_init_common('decode_threads', (), 0)
+
+# Number of threads used to encode the blocks of large inserts concurrently.  If at least 1, blocks are encoded on a
+# shared pool and compressed in order on a background thread, so that encoding, compression and sending overlap.
+# If 0, each block is encoded and compressed on the inserting thread
+_init_common('insert_threads', (), 0)
+
+# Number of worker processes used to decode columns of types that create Python objects (such as Decimal, UUID,
+# IPv6, String, Array, Map, and DateTime with a timezone).  Values less than 2 decode these columns in this process
+_init_common('decode_processes', (), 0)
+
+# Return the LowCardinality columns of pandas DataFrame query results as pandas Categorical columns, built directly
+# from the Native dictionary and keys
+_init_common('pandas_categorical', (True, False), False)
+
+# Number of blocks (or rows/DataFrames for those stream types) fetched ahead of the consumer of an AsyncClient
+# streaming query by a background task.  If 0, the next block is only fetched when requested
+_init_common('async_read_ahead', (), 0)
@@ -3,16 +3,19 @@ import logging
 
 from abc import ABC
 from math import log
-from typing import NamedTuple, Dict, Type, Any, Sequence, MutableSequence, Union, Collection
+from typing import NamedTuple, Dict, Type, Any, Sequence, MutableSequence, Union, Collection, Optional, Callable, \
+    Tuple, List
 
-from timeplus_connect.driver.common import array_type, int_size, write_array, write_uint64, low_card_version
+from timeplus_connect import common
+from timeplus_connect.driver.common import array_type, int_size, write_array, write_uint64, low_card_version, \
+    write_np_array, np_null_map
 from timeplus_connect.driver.context import BaseQueryContext
-from timeplus_connect.driver.ctypes import numpy_conv, data_conv
+from timeplus_connect.driver import ctypes, arrowconv
 from timeplus_connect.driver.exceptions import NotSupportedError
 from timeplus_connect.driver.insert import InsertContext
 from timeplus_connect.driver.query import QueryContext
 from timeplus_connect.driver.types import ByteSource
-from timeplus_connect.driver.options import np, pd
+from timeplus_connect.driver.options import np, pd, arrow
 
 logger = logging.getLogger(__name__)
 ch_read_formats = {}
@@ -47,6 +50,10 @@ class TimeplusType(ABC):
     python_type = None
     pd_type = None
     base_type = None
+    arrow_direct = False  # True if the type implements _read_arrow_binary
+    np_write_kinds = ''  # Numpy dtype kinds that _write_column_numpy can write without Python conversion
+    np_nan_null = False  # True if NaN values of numpy float columns are written as NULL
+    arrow_write = False  # True if the type writes pyarrow Array columns directly (usually with _write_column_arrow)
 
     def __init_subclass__(cls, registered: bool = True):
         if registered:
@@ -151,6 +158,8 @@ class TimeplusType(ABC):
         :return: The decoded column data as a sequence
         """
         read_state = self.read_column_prefix(source, ctx)
+        if self.low_card and ctx.as_pandas and common.get_setting('pandas_categorical'):
+            return self._read_lc_categorical(source, num_rows, ctx, read_state)
         return self.read_column_data(source, num_rows, ctx, read_state)
 
     def read_column_data(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any) -> Sequence:
@@ -173,8 +182,17 @@ class TimeplusType(ABC):
     def _read_nullable_column(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any) -> Sequence:
         null_map = source.read_bytes(num_rows)
         column = self._read_column_binary(source, num_rows, ctx, read_state)
+        if self._zero_nulls(ctx):
+            # NULL values are zero in the Native data, so the column is returned as is
+            return column
         null_obj = self._active_null(ctx)
-        return data_conv.build_nullable_column(column, null_map, null_obj)
+        return ctypes.data_conv.build_nullable_column(column, null_map, null_obj)
+
+    def _zero_nulls(self, _ctx: QueryContext) -> bool:  # pylint: disable=no-self-use
+        """
+        True if the column read for this context is returned without replacing NULL values
+        """
+        return False
 
     # The binary methods are really abstract, but they aren't implemented for container classes which
     # delegate binary operations to their elements
@@ -195,6 +213,104 @@ class TimeplusType(ABC):
     def _finalize_column(self, column: Sequence, _ctx: QueryContext) -> Sequence:
         return column
 
+    def read_arrow_column(self, source: ByteSource, num_rows: int, ctx: QueryContext):
+        """
+        Wrapping read method that decodes a Native column directly into a pyarrow Array
+        :param source: Native protocol binary read buffer
+        :param num_rows: Number of rows expected in the column
+        :param ctx: QueryContext for query specific settings
+        :return: pyarrow Array
+        """
+        read_state = self.read_column_prefix(source, ctx)
+        return self.read_arrow_data(source, num_rows, ctx, read_state)
+
+    def read_arrow_data(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any):
+        """
+        Public Arrow read method for all TimeplusType data type columns.  Types without a direct Arrow layout are
+        converted from the Python values returned by read_column_data
+        """
+        if not self.arrow_direct:
+            return arrowconv.from_python(self.read_column_data(source, num_rows, ctx, read_state))
+        if self.low_card:
+            return self._read_arrow_low_card(source, num_rows, ctx, read_state)
+        null_map = source.read_bytes(num_rows) if self.nullable else None
+        return self._read_arrow_binary(source, num_rows, ctx, read_state, null_map)
+
+    def _read_arrow_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any,
+                           null_map: Optional[bytes]):
+        """
+        Lowest level Arrow read method, only called if arrow_direct is True.  By default the Python values read by
+        _read_column_binary are converted
+        :param null_map: The Native null map of a nullable column, otherwise None
+        """
+        column = self._read_column_binary(source, num_rows, ctx, read_state)
+        return arrowconv.from_python(arrowconv.apply_nulls(column, null_map))
+
+    def _read_arrow_low_card(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any):
+        if num_rows == 0:
+            index = self._read_arrow_binary(source, 0, ctx, read_state, None)
+            return arrowconv.dictionary_array(index, b'', 4, 0, False)
+        key_sz = 2 ** (source.read_uint64() & 0xff)
+        index_cnt = source.read_uint64()
+        index = self._read_arrow_binary(source, index_cnt, ctx, read_state, None)
+        index = self._lc_dictionary(index, ctx, 'arrow', lambda x: x)
+        key_cnt = source.read_uint64()
+        return arrowconv.dictionary_array(index, source.read_bytes(key_cnt * key_sz), key_sz, key_cnt, self.nullable)
+
+    @property
+    def scannable(self) -> bool:
+        """
+        True if the raw Native bytes of a column of this type can be located without decoding the column.  By default
+        only fixed width types are scannable
+        """
+        return self.byte_size > 0
+
+    @property
+    def object_decode(self) -> bool:
+        """
+        True if decoding a column of this type normally creates Python objects, so decoding is CPU intensive and
+        holds the GIL
+        """
+        return self.np_type == 'O' or self.np_type.startswith('U')
+
+    def scan_column(self, source: ByteSource, num_rows: int, dest: bytearray):
+        """
+        Copies the undecoded Native bytes of a column (including any prefix) from the source into dest.  The copied
+        bytes can later be decoded independently with read_column.  Must only be called if the type is scannable
+        :param source: Native protocol binary read buffer
+        :param num_rows: Number of rows expected in the column
+        :param dest: Destination buffer for the raw column bytes
+        """
+        self.scan_column_prefix(source, dest)
+        self.scan_column_data(source, num_rows, dest)
+
+    def scan_column_prefix(self, source: ByteSource, dest: bytearray):
+        if self.low_card:
+            dest += source.read_bytes(8)
+
+    def scan_column_data(self, source: ByteSource, num_rows: int, dest: bytearray):
+        if self.low_card:
+            self._scan_low_card_column(source, num_rows, dest)
+            return
+        if self.nullable:
+            dest += source.read_bytes(num_rows)
+        self._scan_column_binary(source, num_rows, dest)
+
+    def _scan_column_binary(self, source: ByteSource, num_rows: int, dest: bytearray):
+        dest += source.read_bytes(num_rows * self.byte_size)
+
+    def _scan_low_card_column(self, source: ByteSource, num_rows: int, dest: bytearray):
+        if num_rows == 0:
+            return
+        key_data = source.read_bytes(8)
+        dest += key_data
+        index_cnt = source.read_bytes(8)
+        dest += index_cnt
+        self._scan_column_binary(source, int.from_bytes(index_cnt, 'little'), dest)
+        key_cnt = source.read_bytes(8)
+        dest += key_cnt
+        dest += source.read_bytes(int.from_bytes(key_cnt, 'little') * 2 ** (key_data[0] & 0xff))
+
     def _write_column_binary(self, column: Union[Sequence, MutableSequence], dest: bytearray, ctx: InsertContext):
         """
         Lowest level write method for TimeplusType data columns
@@ -224,11 +340,35 @@ class TimeplusType(ABC):
         """
         if self.low_card:
             self._write_column_low_card(column, dest, ctx)
+        elif np is not None and isinstance(column, np.ndarray) and column.dtype.kind in self.np_write_kinds:
+            if self.nullable:
+                dest += np_null_map(column, self.np_nan_null)
+            self._write_column_numpy(column, dest, ctx)
+        elif self.arrow_write and arrow is not None and isinstance(column, (arrow.Array, arrow.ChunkedArray)):
+            if isinstance(column, arrow.ChunkedArray):
+                column = column.combine_chunks()
+            if self.nullable:
+                dest += arrowconv.native_null_map(column)
+            self._write_column_arrow(column, dest, ctx)
         else:
             if self.nullable:
                 dest += bytes([1 if x is None else 0 for x in column])
             self._write_column_binary(column, dest, ctx)
 
+    def _write_column_numpy(self, column: 'np.ndarray', dest: bytearray, ctx: InsertContext):
+        """
+        Write method for numpy columns with a dtype kind in np_write_kinds.  By default the column is written
+        directly (after any numpy cast) in the layout of the type array code
+        """
+        write_np_array(self._array_type, column, dest, ctx.column_name)  # pylint: disable=no-member
+
+    def _write_column_arrow(self, column: 'arrow.Array', dest: bytearray, ctx: InsertContext):
+        """
+        Write method for pyarrow Array columns, only called if arrow_write is True.  By default the column is
+        converted to Python values
+        """
+        self._write_column_binary(column.to_pylist(), dest, ctx)
+
     # pylint: disable=no-member
     def _read_low_card_column(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any):
         if num_rows == 0:
@@ -238,6 +378,9 @@ class TimeplusType(ABC):
         index_cnt = source.read_uint64()
         index = self._read_column_binary(source, index_cnt, ctx, read_state)
         key_cnt = source.read_uint64()
+        if ctx.use_numpy:
+            keys = ctypes.numpy_conv.read_numpy_array(source, f'<u{key_sz}', key_cnt)
+            return self._build_lc_numpy_column(index, keys, ctx)
         keys = source.read_array(array_type(key_sz, False), key_cnt)
         if self.nullable:
             return self._build_lc_nullable_column(index, keys, ctx)
@@ -247,11 +390,88 @@ class TimeplusType(ABC):
         return [index[key] for key in keys]
 
     def _build_lc_nullable_column(self, index: Sequence, keys: array.array, ctx: QueryContext):
-        return data_conv.build_lc_nullable_column(index, keys, self._active_null(ctx))
+        return ctypes.data_conv.build_lc_nullable_column(index, keys, self._active_null(ctx))
+
+    def _build_lc_numpy_column(self, index: Sequence, keys: 'np.ndarray', ctx: QueryContext):
+        np_index = self._lc_dictionary(index, ctx, 'numpy', _np_index)
+        column = np_index.take(keys)
+        if self.nullable:
+            nulls = keys == 0
+            if nulls.any():
+                null_obj = self._active_null(ctx)
+                if column.dtype.kind != 'O' and (null_obj is None or null_obj is getattr(pd, 'NA', None)):
+                    column = column.astype(object)
+                column[nulls] = null_obj
+        return column
+
+    def _read_lc_categorical(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any):
+        """
+        Read a LowCardinality column as a pandas Categorical using the column dictionary as the categories and the
+        Native keys as the codes, so the column values are never expanded
+        """
+        if num_rows == 0:
+            return pd.Categorical([])
+        key_sz = 2 ** (source.read_uint64() & 0xff)
+        index_cnt = source.read_uint64()
+        index = self._read_column_binary(source, index_cnt, ctx, read_state)
+        key_cnt = source.read_uint64()
+        keys = ctypes.numpy_conv.read_numpy_array(source, f'<u{key_sz}', key_cnt)
+        categories = self._lc_dictionary(index, ctx, 'pandas', lambda x: _pd_categories(x, self.nullable))
+        if categories is None:
+            # The decoded dictionary values are not valid (unique) categories
+            return pd.Categorical(self._build_lc_numpy_column(index, keys, ctx))
+        codes = keys.astype(f'i{min(key_sz * 2, 8)}')
+        if self.nullable:
+            codes -= 1  # Key 0 is NULL, which is code -1 in pandas
+        return pd.Categorical.from_codes(codes, dtype=categories)
+
+    @staticmethod
+    def _lc_dictionary(index: Sequence, ctx: QueryContext, kind: str, convert: Callable):
+        """
+        Convert the dictionary (index) of a LowCardinality column block, reusing the previous conversion if the
+        previous block of the column had an identical dictionary
+        :param kind: The kind of conversion, since the same column can be read in different output modes
+        """
+        key = ctx.column_name, kind
+        cached = ctx.lc_dictionaries.get(key)
+        if cached is not None and _same_index(cached[0], index):
+            return cached[1]
+        converted = convert(index)
+        ctx.lc_dictionaries[key] = index, converted
+        return converted
 
     def _write_column_low_card(self, column: Sequence, dest: bytearray, ctx: InsertContext):
         if len(column) == 0:
             return
+        encoded = _lc_encode(column)
+        if encoded is not None:
+            index, keys = encoded
+            if not isinstance(index, list) and index.dtype.kind not in self.np_write_kinds:
+                index = index.tolist()
+            if self.nullable:
+                keys = keys + 1  # NULL (-1) becomes key 0, the placeholder entry
+                if isinstance(index, list):
+                    index = [None] + index
+                else:
+                    index = np.concatenate((np.zeros(1, index.dtype), index))
+            elif len(keys) and keys.min() < 0:
+                encoded = None  # NULL values for a non-nullable column are handled (rejected) by the Python path
+        if encoded is None:
+            index, keys = self._lc_encode_python(column)
+        ix_type = int(log(len(index), 2)) >> 3  # power of two bytes needed to store the total number of keys
+        write_uint64((1 << 9) | (1 << 10) | ix_type, dest)  # Index type plus new dictionary (9) and additional keys(10)
+        write_uint64(len(index), dest)
+        if isinstance(index, list):
+            self._write_column_binary(index, dest, ctx)
+        else:
+            self._write_column_numpy(index, dest, ctx)
+        write_uint64(len(keys), dest)
+        if isinstance(keys, list):
+            write_array(array_type(1 << ix_type, False), keys, dest, ctx.column_name)
+        else:
+            write_np_array(array_type(1 << ix_type, False), keys, dest, ctx.column_name)
+
+    def _lc_encode_python(self, column: Sequence) -> Tuple[List, List[int]]:
         keys = []
         index = []
         rev_map = {}
@@ -282,17 +502,71 @@ class TimeplusType(ABC):
                     key += 1
                 else:
                     keys.append(ix)
-        ix_type = int(log(len(index), 2)) >> 3  # power of two bytes needed to store the total number of keys
-        write_uint64((1 << 9) | (1 << 10) | ix_type, dest)  # Index type plus new dictionary (9) and additional keys(10)
-        write_uint64(len(index), dest)
-        self._write_column_binary(index, dest, ctx)
-        write_uint64(len(keys), dest)
-        write_array(array_type(1 << ix_type, False), keys, dest, ctx.column_name)
+        return index, keys
 
     def _active_null(self, _ctx: QueryContext) -> Any:
         return None
 
 
+def _lc_encode(column: Sequence) -> Optional[Tuple[Union['np.ndarray', List], 'np.ndarray']]:
+    """
+    Dictionary encode a column for a LowCardinality insert without a Python loop.  pandas Categorical and Arrow
+    dictionary columns use their existing dictionary and codes, other numpy, pandas and Arrow columns are factorized.
+    Python sequences are encoded in Python, since factorizing would also turn float NaN values into NULL
+    :return: The distinct values (a numpy array or a Python list) and the numpy key of each row (-1 for NULL), or
+      None if the column must be encoded in Python
+    """
+    if arrow is not None and isinstance(column, (arrow.Array, arrow.ChunkedArray)):
+        if isinstance(column, arrow.ChunkedArray):
+            column = column.unify_dictionaries() if arrow.types.is_dictionary(column.type) else column
+            column = column.combine_chunks()
+        if not arrow.types.is_dictionary(column.type):
+            column = column.dictionary_encode()
+        indices = arrowconv.pc.cast(column.indices, arrow.int64()).fill_null(-1)
+        return column.dictionary.to_pylist(), indices.to_numpy()
+    if pd is not None:
+        if isinstance(column, pd.Series):
+            column = column.array
+        if isinstance(column, pd.Categorical):
+            return np.asarray(column.categories), column.codes
+        if isinstance(column, (np.ndarray, pd.api.extensions.ExtensionArray)):
+            codes, uniques = pd.factorize(column)
+            return np.asarray(uniques), codes
+        return None
+    if np is not None and isinstance(column, np.ndarray) and column.dtype.kind in 'biufmMSU':
+        uniques, codes = np.unique(column, return_inverse=True)
+        return uniques, codes
+    return None
+
+
+def _np_index(index: Sequence) -> 'np.ndarray':
+    if isinstance(index, np.ndarray):
+        return index
+    np_index = np.empty(len(index), dtype=object)
+    np_index[:] = index
+    return np_index
+
+
+def _pd_categories(index: Sequence, nullable: bool) -> Optional['pd.CategoricalDtype']:
+    # The first entry of a nullable dictionary is a placeholder for NULL
+    try:
+        return pd.CategoricalDtype(pd.Index(index[1:] if nullable else index))
+    except ValueError:
+        return None  # Duplicate or null values are not valid categories
+
+
+def _same_index(prev: Any, index: Any) -> bool:
+    if prev is index:
+        return True
+    if len(prev) != len(index) or type(prev) is not type(index):
+        return False
+    if np is not None and isinstance(prev, np.ndarray):
+        return prev.dtype == index.dtype and bool(np.array_equal(prev, index))
+    if hasattr(prev, 'equals'):  # Arrow arrays and pandas indexes/arrays
+        return prev.equals(index)
+    return prev == index
+
+
 EMPTY_TYPE_DEF = TypeDef()
 NULLABLE_TYPE_DEF = TypeDef(wrappers=('nullable',))
 LC_TYPE_DEF = TypeDef(wrappers=('low_cardinality',))
@@ -310,6 +584,11 @@ class ArrayType(TimeplusType, ABC, registered=False):
     _struct_type = None
     valid_formats = 'string', 'native'
     python_type = int
+    arrow_type = None  # Name of the pyarrow type factory function for the same fixed width layout
+
+    @property
+    def arrow_direct(self) -> bool:
+        return self.arrow_type is not None
 
     def __init_subclass__(cls, registered: bool = True):
         super().__init_subclass__(registered)
@@ -321,16 +600,19 @@ class ArrayType(TimeplusType, ABC, registered=False):
 
     def _read_column_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, _read_state: Any):
         if ctx.use_numpy:
-            return numpy_conv.read_numpy_array(source, self.np_type, num_rows)
+            return ctypes.numpy_conv.read_numpy_array(source, self.np_type, num_rows)
         return source.read_array(self._array_type, num_rows)
 
     def _read_nullable_column(self, source: ByteSource, num_rows: int, ctx: QueryContext, _read_state: Any) -> Sequence:
-        return data_conv.read_nullable_array(source, self._array_type, num_rows, self._active_null(ctx))
+        return ctypes.data_conv.read_nullable_array(source, self._array_type, num_rows, self._active_null(ctx))
 
-    def _build_lc_column(self, index: Sequence, keys: array.array, ctx: QueryContext):
-        if ctx.use_numpy:
-            return np.fromiter((index[key] for key in keys), dtype=index.dtype, count=len(index))
-        return super()._build_lc_column(index, keys, ctx)
+    def _read_arrow_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, _read_state: Any,
+                           null_map: Optional[bytes]):
+        arrow_type = getattr(arrow, self._arrow_type(ctx))()
+        return arrowconv.read_fixed_array(source, arrow_type, self.byte_size, num_rows, null_map)
+
+    def _arrow_type(self, _ctx: QueryContext) -> str:
+        return self.arrow_type
 
     def _finalize_column(self, column: Sequence, ctx: QueryContext) -> Sequence:
         if self.read_format(ctx) == 'string':
@@ -6,6 +6,10 @@ from timeplus_connect.driver.insert import InsertContext
 from timeplus_connect.driver.query import QueryContext
 from timeplus_connect.driver.binding import quote_identifier
 from timeplus_connect.driver.types import ByteSource
+from timeplus_connect.driver import arrowconv
+from timeplus_connect.driver.columnar import ListColumn, MapColumn, TupleColumn, read_offsets, write_offsets, \
+    list_insert, map_insert
+from timeplus_connect.driver.options import arrow, np
 from timeplus_connect.json_impl import any_to_json
 from timeplus_connect.datatypes.base import TimeplusType, TypeDef
 from timeplus_connect.driver.common import must_swap, first_value
@@ -17,7 +21,9 @@ logger = logging.getLogger(__name__)
 class Array(TimeplusType):
     __slots__ = ('element_type', '_insert_name')
     python_type = list
+    valid_formats = 'native', 'columnar'
     base_type = ('array', )
+    arrow_write = True
 
     @property
     def insert_name(self):
@@ -42,6 +48,13 @@ class Array(TimeplusType):
 
     # pylint: disable=too-many-locals
     def read_column_data(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any):
+        if self.read_format(ctx) == 'columnar':
+            offsets = read_offsets(source, num_rows, ctx.use_numpy)
+            total = int(offsets[-1])
+            values = self.element_type.read_column_data(source, total, ctx, read_state) if total else []
+            if isinstance(values, (array.array, tuple)):
+                values = list(values)  # So that Python rows are lists as in the native format
+            return ListColumn(offsets, values)
         final_type = self.element_type
         depth = 1
         while isinstance(final_type, Array):
@@ -67,10 +80,33 @@ class Array(TimeplusType):
             column = data
         return column
 
+    def read_arrow_data(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any):
+        offsets, total = arrowconv.offsets_array(source, num_rows)
+        values = self.element_type.read_arrow_data(source, total, ctx, read_state)
+        return arrowconv.list_array(offsets, values, total)
+
+    @property
+    def scannable(self) -> bool:
+        return self.element_type.scannable
+
+    def scan_column_prefix(self, source: ByteSource, dest: bytearray):
+        self.element_type.scan_column_prefix(source, dest)
+
+    def scan_column_data(self, source: ByteSource, num_rows: int, dest: bytearray):
+        total_rows = scan_offsets(source, num_rows, dest)
+        if total_rows:
+            self.element_type.scan_column_data(source, total_rows, dest)
+
     def write_column_prefix(self, dest: bytearray):
         self.element_type.write_column_prefix(dest)
 
     def write_column_data(self, column: Sequence, dest: bytearray, ctx: InsertContext):
+        columnar = list_insert(column)
+        if columnar is not None:
+            ends, values = columnar
+            write_offsets(ends, dest)
+            self.element_type.write_column_data(_child_column(values, self.element_type), dest, ctx)
+            return
         final_type = self.element_type
         depth = 1
         while isinstance(final_type, Array):
@@ -94,7 +130,7 @@ class Array(TimeplusType):
 class Tuple(TimeplusType):
     _slots = 'element_names', 'element_types', '_insert_name'
     python_type = tuple
-    valid_formats = 'tuple', 'dict', 'json', 'native'  # native is 'tuple' for unnamed tuples, and dict for named tuples
+    valid_formats = 'tuple', 'dict', 'json', 'native', 'columnar'  # native is 'tuple' for unnamed tuples, and dict for named tuples
     base_type = ('tuple', )
 
     @property
@@ -138,6 +174,8 @@ class Tuple(TimeplusType):
         for ix, e_type in enumerate(self.element_types):
             column = e_type.read_column_data(source, num_rows, ctx, read_state[ix])
             columns.append(column)
+        if self.read_format(ctx) == 'columnar':
+            return TupleColumn(columns, e_names)
         if e_names and self.read_format(ctx) != 'tuple':
             dicts = [{} for _ in range(num_rows)]
             for ix, x in enumerate(dicts):
@@ -149,6 +187,24 @@ class Tuple(TimeplusType):
             return dicts
         return tuple(zip(*columns))
 
+    def read_arrow_data(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any):
+        columns = [e_type.read_arrow_data(source, num_rows, ctx, read_state[ix])
+                   for ix, e_type in enumerate(self.element_types)]
+        names = self.element_names or [str(ix + 1) for ix in range(len(columns))]
+        return arrow.StructArray.from_arrays(columns, names=list(names))
+
+    @property
+    def scannable(self) -> bool:
+        return all(e_type.scannable for e_type in self.element_types)
+
+    def scan_column_prefix(self, source: ByteSource, dest: bytearray):
+        for e_type in self.element_types:
+            e_type.scan_column_prefix(source, dest)
+
+    def scan_column_data(self, source: ByteSource, num_rows: int, dest: bytearray):
+        for e_type in self.element_types:
+            e_type.scan_column_data(source, num_rows, dest)
+
     def write_column_prefix(self, dest: bytearray):
         for e_type in self.element_types:
             e_type.write_column_prefix(dest)
@@ -173,7 +229,9 @@ class Tuple(TimeplusType):
 class Map(TimeplusType):
     _slots = 'key_type', 'value_type', '_insert_name'
     python_type = dict
+    valid_formats = 'native', 'columnar'
     base_type = ('map', )
+    arrow_write = True
 
     @property
     def insert_name(self):
@@ -191,6 +249,8 @@ class Map(TimeplusType):
         if len(sample) == 0:
             return 0
         for x in sample:
+            if not isinstance(x, dict):
+                x = dict(x)  # pyarrow MapArray rows are lists of key value pairs
             total += self.key_type.data_size(x.keys())
             total += self.value_type.data_size(x.values())
         return total // len(sample)
@@ -202,6 +262,12 @@ class Map(TimeplusType):
 
     # pylint: disable=too-many-locals
     def read_column_data(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any):
+        if self.read_format(ctx) == 'columnar':
+            offsets = read_offsets(source, num_rows, ctx.use_numpy)
+            total = int(offsets[-1])
+            keys = self.key_type.read_column_data(source, total, ctx, read_state[0])
+            values = self.value_type.read_column_data(source, total, ctx, read_state[1])
+            return MapColumn(offsets, keys, values)
         offsets = source.read_array('Q', num_rows)
         total_rows = 0 if len(offsets) == 0 else offsets[-1]
         keys = self.key_type.read_column_data(source, total_rows, ctx, read_state[0])
@@ -215,11 +281,37 @@ class Map(TimeplusType):
             last = offset
         return column
 
+    def read_arrow_data(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any):
+        offsets, total = arrowconv.offsets_array(source, num_rows)
+        keys = self.key_type.read_arrow_data(source, total, ctx, read_state[0])
+        values = self.value_type.read_arrow_data(source, total, ctx, read_state[1])
+        return arrowconv.map_array(offsets, keys, values)
+
+    @property
+    def scannable(self) -> bool:
+        return self.key_type.scannable and self.value_type.scannable
+
+    def scan_column_prefix(self, source: ByteSource, dest: bytearray):
+        self.key_type.scan_column_prefix(source, dest)
+        self.value_type.scan_column_prefix(source, dest)
+
+    def scan_column_data(self, source: ByteSource, num_rows: int, dest: bytearray):
+        total_rows = scan_offsets(source, num_rows, dest)
+        self.key_type.scan_column_data(source, total_rows, dest)
+        self.value_type.scan_column_data(source, total_rows, dest)
+
     def write_column_prefix(self, dest: bytearray):
         self.key_type.write_column_prefix(dest)
         self.value_type.write_column_prefix(dest)
 
     def write_column_data(self, column: Sequence, dest: bytearray, ctx: InsertContext):
+        columnar = map_insert(column)
+        if columnar is not None:
+            ends, keys, values = columnar
+            write_offsets(ends, dest)
+            self.key_type.write_column_data(_child_column(keys, self.key_type), dest, ctx)
+            self.value_type.write_column_data(_child_column(values, self.value_type), dest, ctx)
+            return
         offsets = array.array('Q')
         keys = []
         values = []
@@ -239,6 +331,7 @@ class Map(TimeplusType):
 class Nested(TimeplusType):
     __slots__ = 'tuple_array', 'element_names', 'element_types'
     python_type = Sequence[dict]
+    valid_formats = 'native', 'columnar'
     base_type = ('nested', )
 
     def __init__(self, type_def):
@@ -259,9 +352,32 @@ class Nested(TimeplusType):
 
     def read_column_data(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any):
         keys = self.element_names
+        if self.read_format(ctx) == 'columnar':
+            offsets = read_offsets(source, num_rows, ctx.use_numpy)
+            total = int(offsets[-1])
+            columns = [e_type.read_column_data(source, total, ctx, read_state[ix])
+                       for ix, e_type in enumerate(self.element_types)]
+            return ListColumn(offsets, TupleColumn(columns, keys))
         data = self.tuple_array.read_column_data(source, num_rows, ctx, read_state)
         return [[dict(zip(keys, x)) for x in row] for row in data]
 
+    def read_arrow_data(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any):
+        offsets, total = arrowconv.offsets_array(source, num_rows)
+        columns = [e_type.read_arrow_data(source, total, ctx, read_state[ix])
+                   for ix, e_type in enumerate(self.element_types)]
+        values = arrow.StructArray.from_arrays(columns, names=list(self.element_names))
+        return arrowconv.list_array(offsets, values, total)
+
+    @property
+    def scannable(self) -> bool:
+        return self.tuple_array.scannable
+
+    def scan_column_prefix(self, source: ByteSource, dest: bytearray):
+        self.tuple_array.scan_column_prefix(source, dest)
+
+    def scan_column_data(self, source: ByteSource, num_rows: int, dest: bytearray):
+        self.tuple_array.scan_column_data(source, num_rows, dest)
+
     def write_column_prefix(self, dest: bytearray):
         self.tuple_array.write_column_prefix(dest)
 
@@ -269,3 +385,29 @@ class Nested(TimeplusType):
         keys = self.element_names
         data = [[tuple(sub_row[key] for key in keys) for sub_row in row] for row in column]
         self.tuple_array.write_column_data(data, dest, ctx)
+
+
+def _child_column(values: Sequence, ch_type: TimeplusType) -> Sequence:
+    """
+    Convert the flat pyarrow values of a columnar Array or Map insert into a column the element type writes without
+    Python conversion where possible
+    """
+    if arrow is None or not isinstance(values, arrow.Array) or ch_type.arrow_write or ch_type.low_card:
+        return values
+    if np is not None and ch_type.np_write_kinds and values.null_count == 0:
+        np_values = values.to_numpy(zero_copy_only=False)
+        if np_values.dtype.kind in ch_type.np_write_kinds:
+            return np_values
+    return values.to_pylist()
+
+
+def scan_offsets(source: ByteSource, num_rows: int, dest: bytearray) -> int:
+    """
+    Copies the UInt64 offsets of an Array or Map column into dest
+    :return: The total number of elements in the column, which is the last offset
+    """
+    if num_rows == 0:
+        return 0
+    offsets = source.read_bytes(num_rows * 8)
+    dest += offsets
+    return int.from_bytes(offsets[-8:], 'little')
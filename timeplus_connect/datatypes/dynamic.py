@@ -4,7 +4,7 @@ from typing import List, Sequence, Collection, Any
 from timeplus_connect.datatypes.base import TimeplusType, TypeDef
 from timeplus_connect.datatypes.registry import get_from_name
 from timeplus_connect.driver.common import unescape_identifier, first_value, write_uint64
-from timeplus_connect.driver.ctypes import data_conv
+from timeplus_connect.driver import ctypes
 from timeplus_connect.driver.errors import handle_error
 from timeplus_connect.driver.exceptions import DataError
 from timeplus_connect.driver.insert import InsertContext
@@ -138,7 +138,7 @@ def write_json(ch_type: TimeplusType, column: Sequence, dest: bytearray, ctx: In
         to_json = any_to_json
         write_col = [to_json(v) for v in column]
         encoding = None
-    handle_error(data_conv.write_str_col(write_col, ch_type.nullable, encoding, dest), ctx)
+    handle_error(ctypes.data_conv.write_str_col(write_col, ch_type.nullable, encoding, dest), ctx)
 
 
 def write_str_values(ch_type: TimeplusType, column: Sequence, dest: bytearray, ctx: InsertContext):
@@ -149,7 +149,7 @@ def write_str_values(ch_type: TimeplusType, column: Sequence, dest: bytearray, c
             col[ix] = 'NULL'
         else:
             col[ix] = str(v)
-    handle_error(data_conv.write_str_col(col, False, encoding, dest), ctx)
+    handle_error(ctypes.data_conv.write_str_col(col, False, encoding, dest), ctx)
 
 
 JSONState = namedtuple('JSONState', 'serialize_version dynamic_paths typed_states dynamic_states')
@@ -21,6 +21,9 @@ class Point(TimeplusType):
     def read_column_data(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any) -> Sequence:
         return POINT_DATA_TYPE.read_column_data(source, num_rows, ctx, read_state)
 
+    def read_arrow_data(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any):
+        return POINT_DATA_TYPE.read_arrow_data(source, num_rows, ctx, read_state)
+
 
 class Ring(TimeplusType):
     def write_column(self, column: Sequence, dest: bytearray, ctx: InsertContext):
@@ -32,6 +35,9 @@ class Ring(TimeplusType):
     def read_column_data(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state) -> Sequence:
         return RING_DATA_TYPE.read_column_data(source, num_rows, ctx, read_state)
 
+    def read_arrow_data(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any):
+        return RING_DATA_TYPE.read_arrow_data(source, num_rows, ctx, read_state)
+
 
 class Polygon(TimeplusType):
     def write_column(self, column: Sequence, dest: bytearray, ctx: InsertContext):
@@ -43,6 +49,9 @@ class Polygon(TimeplusType):
     def read_column_data(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state:Any) -> Sequence:
         return POLYGON_DATA_TYPE.read_column_data(source, num_rows, ctx, read_state)
 
+    def read_arrow_data(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any):
+        return POLYGON_DATA_TYPE.read_arrow_data(source, num_rows, ctx, read_state)
+
 
 class MultiPolygon(TimeplusType):
     def write_column(self, column: Sequence, dest: bytearray, ctx: InsertContext):
@@ -54,6 +63,9 @@ class MultiPolygon(TimeplusType):
     def read_column_data(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state:Any) -> Sequence:
         return MULTI_POLYGON_DATA_TYPE.read_column_data(source, num_rows, ctx, read_state)
 
+    def read_arrow_data(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any):
+        return MULTI_POLYGON_DATA_TYPE.read_arrow_data(source, num_rows, ctx, read_state)
+
 
 class LineString(Ring):
     pass
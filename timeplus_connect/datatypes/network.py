@@ -1,13 +1,15 @@
 import socket
 from ipaddress import IPv4Address, IPv6Address
-from typing import Union, MutableSequence, Sequence, Any
+from typing import Union, MutableSequence, Sequence, Any, Optional
 
 from timeplus_connect.datatypes.base import TimeplusType
 from timeplus_connect.driver.common import write_array, int_size, first_value
 from timeplus_connect.driver.insert import InsertContext
 from timeplus_connect.driver.query import QueryContext
 from timeplus_connect.driver.types import ByteSource
-from timeplus_connect.driver.ctypes import data_conv
+from timeplus_connect.driver import ctypes, arrowconv
+from timeplus_connect.driver.exceptions import DataError
+from timeplus_connect.driver.options import arrow, np
 
 IPV4_V6_MASK = b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\xff\xff'
 V6_NULL = bytes(b'\x00' * 16)
@@ -19,15 +21,31 @@ class IPv4(TimeplusType):
     valid_formats = 'string', 'native', 'int'
     python_type = IPv4Address
     byte_size = 4
+    np_write_kinds = 'iu'
     base_type = ('ipv4', )
+    arrow_direct = True
 
     def _read_column_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, _read_state: Any):
-        if self.read_format(ctx) == 'int':
+        fmt = self.read_format(ctx)
+        if fmt == 'int':
+            if ctx.use_numpy:
+                return ctypes.numpy_conv.read_numpy_array(source, '<u4', num_rows)
             return source.read_array(self._array_type, num_rows)
-        if self.read_format(ctx) == 'string':
+        if fmt == 'string':
             column = source.read_array(self._array_type, num_rows)
             return [socket.inet_ntoa(x.to_bytes(4, 'big')) for x in column]
-        return data_conv.read_ipv4_col(source, num_rows)
+        return ctypes.data_conv.read_ipv4_col(source, num_rows)
+
+    def _zero_nulls(self, ctx: QueryContext) -> bool:
+        # NULL values are zero in the Native data, so the numpy array is returned as is
+        return ctx.use_numpy and not ctx.use_none and self.read_format(ctx) == 'int'
+
+    def _read_arrow_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any,
+                           null_map: Optional[bytes]):
+        if self.read_format(ctx) == 'string':
+            column = self._read_column_binary(source, num_rows, ctx, read_state)
+            return arrow.array(arrowconv.apply_nulls(column, null_map), arrow.string())
+        return arrowconv.read_fixed_array(source, arrow.uint32(), 4, num_rows, null_map)
 
     def _write_column_binary(self, column: Union[Sequence, MutableSequence], dest: bytearray, ctx: InsertContext):
         first = first_value(column, self.nullable)
@@ -55,16 +73,28 @@ class IPv4(TimeplusType):
 
 # pylint: disable=protected-access
 class IPv6(TimeplusType):
-    valid_formats = 'string', 'native'
+    valid_formats = 'string', 'native', 'bytes'
     python_type = IPv6Address
     byte_size = 16
     base_type = ('ipv6', )
+    arrow_direct = True
+    np_write_kinds = 'SV'
 
     def _read_column_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, _read_state: Any):
-        if self.read_format(ctx) == 'string':
+        fmt = self.read_format(ctx)
+        if fmt == 'bytes':
+            if ctx.use_numpy:
+                return ctypes.numpy_conv.read_numpy_array(source, 'S16', num_rows)
+            data = source.read_bytes(num_rows * 16)
+            return [data[ix: ix + 16] for ix in range(0, num_rows * 16, 16)]
+        if fmt == 'string':
             return self._read_binary_str(source, num_rows)
         return self._read_binary_ip(source, num_rows)
 
+    def _zero_nulls(self, ctx: QueryContext) -> bool:
+        # NULL values are zero in the Native data, so the numpy array is returned as is
+        return ctx.use_numpy and not ctx.use_none and self.read_format(ctx) == 'bytes'
+
     @staticmethod
     def _read_binary_ip(source: ByteSource, num_rows: int):
         fast_ip_v6 = IPv6Address.__new__
@@ -73,8 +103,9 @@ class IPv6(TimeplusType):
         new_col = []
         app = new_col.append
         ifb = int.from_bytes
-        for _ in range(num_rows):
-            int_value = ifb(source.read_bytes(16), 'big')
+        data = memoryview(source.read_bytes(num_rows * 16))
+        for ix in range(0, num_rows * 16, 16):
+            int_value = ifb(data[ix: ix + 16], 'big')
             if int_value >> 32 == 0xFFFF:
                 ipv4 = fast_ip_v4(IPv4Address)
                 ipv4._ip = int_value & 0xFFFFFFFF
@@ -95,14 +126,23 @@ class IPv6(TimeplusType):
         tov4 = socket.inet_ntoa
         tov6 = socket.inet_ntop
         af6 = socket.AF_INET6
-        for _ in range(num_rows):
-            x = source.read_bytes(16)
+        data = source.read_bytes(num_rows * 16)
+        for ix in range(0, num_rows * 16, 16):
+            x = data[ix: ix + 16]
             if x[:12] == v4mask:
                 app(tov4(x[12:]))
             else:
                 app(tov6(af6, x))
         return new_col
 
+    def _read_arrow_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, _read_state: Any,
+                           null_map: Optional[bytes]):
+        if self.read_format(ctx) == 'string':
+            column = arrowconv.apply_nulls(self._read_binary_str(source, num_rows), null_map)
+            return arrow.array(column, arrow.string())
+        return arrowconv.read_fixed_array(source, arrow.binary(16), 16, num_rows, null_map)
+
+    # pylint: disable=too-many-branches
     def _write_column_binary(self, column: Union[Sequence, MutableSequence], dest: bytearray, ctx: InsertContext):
         v = V6_NULL
         first = first_value(column, self.nullable)
@@ -117,6 +157,12 @@ class IPv6(TimeplusType):
                     dest += v4mask + bytes(int(b) for b in x.split('.'))
                 else:
                     dest += tov6(af6, x)
+        elif isinstance(first, (bytes, bytearray)):
+            for x in column:
+                if x is None:
+                    dest += v
+                else:
+                    dest += x if len(x) == 16 else (v4mask + x)
         else:
             for x in column:
                 if x is None:
@@ -125,6 +171,12 @@ class IPv6(TimeplusType):
                     b = x.packed
                     dest += b if len(b) == 16 else (v4mask + b)
 
+    def _write_column_numpy(self, column, dest: bytearray, ctx: InsertContext):
+        if column.dtype.itemsize != 16:
+            raise DataError(f'Numpy value size {column.dtype.itemsize} does not match {self.name} ' +
+                            f'for source column `{ctx.column_name}`')
+        dest += np.ascontiguousarray(column).data
+
     def _active_null(self, ctx):
         if ctx.use_none:
             return None
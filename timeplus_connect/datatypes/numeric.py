@@ -1,19 +1,64 @@
 import decimal
-from typing import Union, Type, Sequence, MutableSequence, Any
+from typing import Union, Type, Sequence, MutableSequence, Any, Optional, List
 
 from math import nan, isnan, isinf
 
 from timeplus_connect.datatypes.base import TypeDef, ArrayType, TimeplusType
-from timeplus_connect.driver.common import array_type, write_array, decimal_size, decimal_prec, first_value
-from timeplus_connect.driver.ctypes import numpy_conv, data_conv
+from timeplus_connect.driver.common import array_type, write_array, decimal_size, decimal_prec, first_value, \
+    write_np_array
+from timeplus_connect.driver import ctypes, arrowconv
 from timeplus_connect.driver.insert import InsertContext
-from timeplus_connect.driver.options import pd, np
+from timeplus_connect.driver.exceptions import DataError
+from timeplus_connect.driver.options import pd, np, arrow, check_numpy
 from timeplus_connect.driver.query import QueryContext
 from timeplus_connect.driver.types import ByteSource
 
 
+# Enough precision to scale any 256 bit Decimal value exactly
+_dec_context = decimal.Context(prec=80)
+
+
+def _limbs_to_float(limbs):
+    """
+    Convert two's complement integers stored as rows of little endian uint64 limbs to float64.  Negative values are
+    negated before conversion so that their low limbs do not cancel out
+    """
+    negative = limbs[:, -1] >= 2 ** 63
+    magnitude = limbs.copy()
+    if negative.any():
+        neg = ~magnitude[negative]
+        carry = np.ones(len(neg), dtype=bool)
+        for ix in range(neg.shape[1]):
+            neg[:, ix] += carry
+            carry &= neg[:, ix] == 0
+        magnitude[negative] = neg
+    column = magnitude.astype('<f8') @ (2.0 ** (64 * np.arange(limbs.shape[1])))
+    column[negative] *= -1
+    return column
+
+
+def _np_finite(column, ctx: InsertContext, nullable: bool):
+    """
+    Check the NaN and infinite values of a numpy float column written to an integer or decimal column.  NaN values
+    are written as NULL in Nullable columns (the value itself is replaced with 0), and are invalid otherwise
+    """
+    if column.dtype.kind != 'f':
+        return column
+    finite = np.isfinite(column)
+    if finite.all():
+        return column
+    if np.isinf(column).any():
+        raise ctx.data_error('Invalid infinite value')
+    if not nullable:
+        raise ctx.data_error('Invalid NaN value in non-Nullable column')
+    return np.where(finite, column, 0)
+
+
 class IntBase(ArrayType, registered=False):
     pd_type = None
+    np_write_kinds = 'biuf'
+    np_nan_null = True
+
     def __init_subclass__(cls,registered: bool = True):
         cls.pd_type = cls.__name__
         super().__init_subclass__(registered)
@@ -35,46 +80,58 @@ class IntBase(ArrayType, registered=False):
             column = [int(x) for x in column]
         write_array(self._array_type, column, dest)
 
+    def _write_column_numpy(self, column, dest: bytearray, ctx: InsertContext):
+        if column.dtype.kind == 'f':
+            column = np.trunc(_np_finite(column, ctx, self.nullable))
+        write_np_array(self._array_type, column, dest, ctx.column_name)
+
 
 class Int8(IntBase):
     _array_type = 'b'
     np_type = 'b'
+    arrow_type = 'int8'
     base_type = ('int8', )
 
 
 class UInt8(IntBase):
     _array_type = 'B'
     np_type = 'B'
+    arrow_type = 'uint8'
     base_type = ('uint8', )
 
 
 class Int16(IntBase):
     _array_type = 'h'
     np_type = '<i2'
+    arrow_type = 'int16'
     base_type = ('int16', )
 
 
 class UInt16(IntBase):
     _array_type = 'H'
     np_type = '<u2'
+    arrow_type = 'uint16'
     base_type = ('uint16', )
 
 
 class Int32(IntBase):
     _array_type = 'i'
     np_type = '<i4'
+    arrow_type = 'int32'
     base_type = ('int32', 'int')
 
 
 class UInt32(IntBase):
     _array_type = 'I'
     np_type = '<u4'
+    arrow_type = 'uint32'
     base_type = ('uint32', 'uint')
 
 
 class Int64(IntBase):
     _array_type = 'q'
     np_type = '<i8'
+    arrow_type = 'int64'
     base_type = ('int64', )
 
 
@@ -82,6 +139,7 @@ class UInt64(IntBase):
     valid_formats = 'signed', 'native'
     _array_type = 'Q'
     np_type = '<u8'
+    arrow_type = 'uint64'
     python_type = int
     base_type = ('uint64', )
 
@@ -89,12 +147,12 @@ class UInt64(IntBase):
         fmt = self.read_format(ctx)
         if ctx.use_numpy:
             np_type = '<q' if fmt == 'signed' else '<u8'
-            return numpy_conv.read_numpy_array(source, np_type, num_rows)
+            return ctypes.numpy_conv.read_numpy_array(source, np_type, num_rows)
         arr_type = 'q' if fmt == 'signed' else 'Q'
         return source.read_array(arr_type, num_rows)
 
     def _read_nullable_column(self, source: ByteSource, num_rows: int, ctx: QueryContext, _read_state: Any) -> Sequence:
-        return data_conv.read_nullable_array(source, 'q' if self.read_format(ctx) == 'signed' else 'Q',
+        return ctypes.data_conv.read_nullable_array(source, 'q' if self.read_format(ctx) == 'signed' else 'Q',
                                              num_rows, self._active_null(ctx))
 
     def _finalize_column(self, column: Sequence, ctx: QueryContext) -> Sequence:
@@ -107,31 +165,56 @@ class UInt64(IntBase):
             return np.array(column, dtype='<q' if fmt == 'signed' else '<u8')
         return column
 
+    def _arrow_type(self, ctx: QueryContext) -> str:
+        return 'int64' if self.read_format(ctx) == 'signed' else 'uint64'
+
 
 class BigInt(TimeplusType, registered=False):
     _signed = True
-    valid_formats = 'string', 'native'
+    valid_formats = 'string', 'native', 'hilo'
     python_type = int
+    arrow_direct = True
+    arrow_write = True
+    np_write_kinds = 'iuV'
 
     def __init_subclass__(cls,registered: bool = True):
         cls.pd_type = cls.__name__
         super().__init_subclass__(registered)
 
+    @property
+    def np_hilo_type(self):
+        """
+        Numpy structured dtype matching the Native layout, with the unsigned low 64 bits (three limbs for 256 bit
+        types) in the 'lo' field and the high 64 bits in the 'hi' field
+        """
+        hi_type = '<i8' if self._signed else '<u8'
+        if self.byte_size == 16:
+            return np.dtype([('lo', '<u8'), ('hi', hi_type)])
+        return np.dtype([('lo', '<u8', (3,)), ('hi', hi_type)])
 
     def _read_column_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, _read_state: Any):
-        signed = self._signed
-        sz = self.byte_size
-        column = []
-        app = column.append
-        ifb = int.from_bytes
-        if self.read_format(ctx) == 'string':
-            for _ in range(num_rows):
-                app(str(ifb(source.read_bytes(sz), 'little', signed=signed)))
-        else:
-            for _ in range(num_rows):
-                app(ifb(source.read_bytes(sz), 'little', signed=signed))
+        fmt = self.read_format(ctx)
+        if fmt == 'hilo':
+            check_numpy()
+            return ctypes.numpy_conv.read_numpy_array(source, f'V{self.byte_size}', num_rows).view(self.np_hilo_type)
+        column = ctypes.data_conv.read_bigint_col(source, num_rows, self.byte_size, self._signed)
+        if fmt == 'string':
+            return [str(x) for x in column]
         return column
 
+    def _zero_nulls(self, ctx: QueryContext) -> bool:
+        # NULL values are zero in the Native data, so the structured array is returned as is
+        return self.read_format(ctx) == 'hilo'
+
+    def _read_arrow_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any,
+                           null_map: Optional[bytes]):
+        if self.read_format(ctx) == 'string':
+            column = self._read_column_binary(source, num_rows, ctx, read_state)
+            return arrow.array(arrowconv.apply_nulls(column, null_map), arrow.string())
+        # Arrow has no integer type wider than 64 bits, so like the ClickHouse Arrow format the raw little endian
+        # values are returned as fixed size binary
+        return arrowconv.read_fixed_array(source, arrow.binary(self.byte_size), self.byte_size, num_rows, null_map)
+
     # pylint: disable=too-many-branches
     def _write_column_binary(self, column: Union[Sequence, MutableSequence], dest: bytearray, ctx: InsertContext):
         if len(column) == 0:
@@ -139,28 +222,50 @@ class BigInt(TimeplusType, registered=False):
         first = first_value(column, self.nullable)
         sz = self.byte_size
         signed = self._signed
-        empty = bytes(b'\x00' * sz)
-        ext = dest.extend
         if isinstance(first, str) or self.write_format(ctx) == 'string':
             if self.nullable:
-                for x in column:
-                    if x:
-                        ext(int(x).to_bytes(sz, 'little', signed=signed))
-                    else:
-                        ext(empty)
+                column = [int(x) if x else 0 for x in column]
             else:
-                for x in column:
-                    ext(int(x).to_bytes(sz, 'little', signed=signed))
+                column = [int(x) for x in column]
+        elif self.nullable:
+            column = [x if x else 0 for x in column]
+        # Numpy only warns when converting negative values to unsigned, so those are left to the Python conversion,
+        # which rejects them
+        if np is not None and isinstance(first, (int, str)) and (signed or min(column) >= 0):
+            try:
+                # Converting the whole column at once succeeds if all values fit in 64 bits
+                self._write_column_numpy(np.array(column, dtype='<i8' if signed else '<u8'), dest, ctx)
+                return
+            except OverflowError:
+                pass
+        ext = dest.extend
+        for x in column:
+            ext(x.to_bytes(sz, 'little', signed=signed))
+
+    def _write_column_numpy(self, column, dest: bytearray, ctx: InsertContext):
+        sz = self.byte_size
+        if column.dtype.kind == 'V':
+            if column.dtype.itemsize != sz:
+                raise DataError(f'Numpy record size {column.dtype.itemsize} does not match {self.name} ' +
+                                f'for source column `{ctx.column_name}`')
+            dest += np.ascontiguousarray(column).data
+            return
+        if column.dtype.kind == 'i' and not self._signed and len(column) and column.min() < 0:
+            raise DataError(f'Negative values for unsigned type {self.name} in source column `{ctx.column_name}`')
+        low = column.astype('<i8' if column.dtype.kind == 'i' else '<u8')
+        wide = np.zeros((len(low), sz // 8), dtype='<u8')
+        wide[:, 0] = low.view('<u8')
+        if low.dtype.kind == 'i':
+            wide[:, 1:] = (low < 0)[:, None] * np.uint64(0xFFFFFFFFFFFFFFFF)
+        dest += wide.data
+
+    def _write_column_arrow(self, column, dest: bytearray, ctx: InsertContext):
+        if column.type == arrow.binary(self.byte_size):
+            dest += arrowconv.fixed_data(column, self.byte_size)
+        elif arrow.types.is_integer(column.type) and np is not None:
+            self._write_column_numpy(column.fill_null(0).to_numpy(), dest, ctx)
         else:
-            if self.nullable:
-                for x in column:
-                    if x:
-                        ext(x.to_bytes(sz, 'little', signed=signed))
-                    else:
-                        ext(empty)
-            else:
-                for x in column:
-                    ext(x.to_bytes(sz, 'little', signed=signed))
+            super()._write_column_arrow(column, dest, ctx)
 
 
 class Int128(BigInt):
@@ -189,6 +294,7 @@ class UInt256(BigInt):
 class Float(ArrayType, registered=False):
     _array_type = 'f'
     python_type = float
+    np_write_kinds = 'biuf'
     base_type = ('float', )
 
     def _finalize_column(self, column: Sequence, ctx: QueryContext) -> Sequence:
@@ -223,12 +329,14 @@ class Float(ArrayType, registered=False):
 
 class Float32(Float):
     np_type = '<f4'
+    arrow_type = 'float32'
     base_type = ('float32', )
 
 
 class Float64(Float):
     _array_type = 'd'
     np_type = '<f8'
+    arrow_type = 'float64'
     base_type = ('float64', )
 
 
@@ -237,6 +345,8 @@ class Bool(TimeplusType):
     python_type = bool
     byte_size = 1
     base_type = ('bool', )
+    arrow_direct = True
+    np_write_kinds = 'biuf'
 
     def _read_column_binary(self, source: ByteSource, num_rows: int, _ctx: QueryContext, _read_state: Any):
         column = source.read_bytes(num_rows)
@@ -250,6 +360,14 @@ class Bool(TimeplusType):
     def _write_column_binary(self, column, dest, ctx):
         write_array('B', [1 if x else 0 for x in column], dest, ctx.column_name)
 
+    def _write_column_numpy(self, column, dest: bytearray, ctx: InsertContext):
+        write_np_array('B', column != 0, dest, ctx.column_name)
+
+    def _read_arrow_binary(self, source: ByteSource, num_rows: int, _ctx: QueryContext, _read_state: Any,
+                           null_map: Optional[bytes]):
+        column = arrowconv.read_fixed_array(source, arrow.uint8(), 1, num_rows, null_map)
+        return arrowconv.pc.not_equal(column, 0)  # pylint: disable=no-member
+
 
 class Boolean(Bool):
     pass
@@ -261,6 +379,7 @@ class Enum(TimeplusType):
     valid_formats = 'native', 'int'
     python_type = str
     base_type = ('enum', )
+    arrow_direct = True
 
     def __init__(self, type_def: TypeDef):
         super().__init__(type_def)
@@ -277,6 +396,15 @@ class Enum(TimeplusType):
         lookup = self._int_map.get
         return [lookup(x, None) for x in column]
 
+    def _read_arrow_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, _read_state: Any,
+                           null_map: Optional[bytes]):
+        int_type = arrow.int8() if self.byte_size == 1 else arrow.int16()
+        column = arrowconv.read_fixed_array(source, int_type, self.byte_size, num_rows, null_map)
+        if self.read_format(ctx) == 'int':
+            return column
+        indices = arrowconv.pc.index_in(column, value_set=arrow.array(self.type_def.values, int_type))  # pylint: disable=no-member
+        return arrow.DictionaryArray.from_arrays(indices, arrow.array(self.type_def.keys, arrow.string()))
+
     def _write_column_binary(self, column: Union[Sequence, MutableSequence], dest: bytearray, ctx:InsertContext):
         first = first_value(column, self.nullable)
         if first is None or not isinstance(first, str):
@@ -305,6 +433,11 @@ class Decimal(TimeplusType):
     python_type = decimal.Decimal
     dec_size = 0
     base_type = ('decimal', 'Decimal')
+    valid_formats = 'native', 'int', 'float'
+    arrow_direct = True
+    arrow_write = True
+    np_write_kinds = 'iuf'
+    np_nan_null = True
 
     @classmethod
     def build(cls: Type['Decimal'], type_def: TypeDef):
@@ -329,23 +462,30 @@ class Decimal(TimeplusType):
         self._name_suffix = f'({prec}, {scale})'
         self._array_type = array_type(self.byte_size, True)
 
-    def _read_column_binary(self, source: ByteSource, num_rows: int, _ctx: QueryContext, _read_state: Any):
+    def _read_column_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, _read_state: Any):
+        fmt = self.read_format(ctx)
+        if fmt != 'native' and ctx.use_numpy:
+            column = ctypes.numpy_conv.read_numpy_array(source, f'<i{self.byte_size}', num_rows)
+            return column / self._mult if fmt == 'float' else column
         column = source.read_array(self._array_type, num_rows)
-        dec = decimal.Decimal
-        scale = self.scale
-        prec = self.prec
-        if scale == 0:
-            return [dec(str(x)) for x in column]
-        new_col = []
-        app = new_col.append
-        for x in column:
-            if x >= 0:
-                digits = str(x).rjust(prec, '0')
-                app(dec(f'{digits[:-scale]}.{digits[-scale:]}'))
-            else:
-                digits = str(-x).rjust(prec, '0')
-                app(dec(f'-{digits[:-scale]}.{digits[-scale:]}'))
-        return new_col
+        return self._from_scaled(column, fmt)
+
+    def _from_scaled(self, column: Sequence[int], fmt: str) -> Sequence:
+        if fmt == 'int':
+            return column
+        if fmt == 'float':
+            mult = self._mult
+            return [x / mult for x in column]
+        # Decimal scaleb of the scaled integer is exact and much faster than building each Decimal from a string
+        scaleb = _dec_context.scaleb
+        exp = -self.scale
+        return [scaleb(x, exp) for x in column]
+
+    def _finalize_column(self, column: Sequence, ctx: QueryContext) -> Sequence:
+        fmt = self.read_format(ctx)
+        if ctx.use_numpy and self.nullable and fmt != 'native' and not ctx.use_none:
+            return np.array(column, dtype='<f8' if fmt == 'float' else f'<i{self.byte_size}')
+        return column
 
     def _write_column_binary(self, column: Union[Sequence, MutableSequence], dest: bytearray, ctx:InsertContext):
         with decimal.localcontext() as dec_ctx:
@@ -357,36 +497,137 @@ class Decimal(TimeplusType):
             else:
                 write_array(self._array_type, [int(dec(str(x)) * mult) for x in column], dest, ctx.column_name)
 
+    def _write_column_numpy(self, column, dest: bytearray, ctx: InsertContext):
+        column = _np_finite(column, ctx, self.nullable)
+        scaled = self._np_scaled(column)
+        if scaled is None:
+            self._write_column_binary(column.tolist(), dest, ctx)
+        else:
+            write_np_array(self._array_type, scaled, dest, ctx.column_name)
+
+    def _np_scaled(self, column):
+        """
+        Scale a numpy int or float column to int64 Native decimal values, or return None if the scaled values do not
+        fit in an int64.  Float values get the same result as the Python conversion of their string representation
+        """
+        mult = self._mult
+        if mult >= 2 ** 63:
+            # The scale multiplier itself does not fit in an int64
+            return None
+        if len(column) == 0:
+            return column.astype('<i8')
+        if column.dtype.kind == 'f':
+            column = column.astype('<f8')
+            scaled = column * mult
+            if np.abs(scaled).max() >= 2.0 ** 63:
+                return None
+            # A float that is the closest float to a decimal with this scale is exactly that decimal
+            whole = np.rint(scaled)
+            exact = (whole / mult == column) & (np.abs(whole) < min(10.0 ** self.prec, 2.0 ** 52))
+            # Otherwise the string representation is within the multiplication error of the scaled value, so
+            # the conversion is computed just below and above it.  Values where the two differ are converted in Python
+            margin = np.spacing(np.abs(scaled)) * 32
+            low = self._np_round(scaled - margin)
+            result = low.astype('<i8')
+            result[exact] = whole[exact]
+            inexact = np.nonzero(~exact & (low != self._np_round(scaled + margin)))[0]
+            if len(inexact):
+                result[inexact] = self._to_scaled(column[inexact].tolist())
+            return result
+        limit = (2 ** 63 - 1) // mult
+        if int(column.max()) > limit or int(column.min()) < -limit:
+            return None
+        return column.astype('<i8') * mult
+
+    def _np_round(self, scaled):
+        """
+        Round scaled float values like the Decimal context of the Python conversion, which rounds the scaled value
+        to the precision of the type, and then truncate them.  Values with the 17 significant digits of a float are
+        never rounded at higher precisions
+        """
+        if self.prec < 17:
+            shift = self.prec - np.floor(np.log10(np.maximum(np.abs(scaled), 0.1))) - 1
+            factor = 10.0 ** np.abs(shift)
+            scaled = np.where(shift >= 0, np.rint(scaled * factor) / factor, np.rint(scaled / factor) * factor)
+        return np.trunc(scaled)
+
+    def _to_scaled(self, column: Sequence) -> List[int]:
+        with decimal.localcontext() as dec_ctx:
+            dec_ctx.prec = self.prec
+            dec = decimal.Decimal
+            mult = self._mult
+            return [int(dec(str(x)) * mult) for x in column]
+
+    def _write_column_arrow(self, column, dest: bytearray, ctx: InsertContext):
+        if self.byte_size < 16 and np is None:
+            super()._write_column_arrow(column, dest, ctx)
+            return
+        dec_column = self._arrow_decimal(column)
+        if dec_column is None:
+            super()._write_column_arrow(column, dest, ctx)
+            return
+        if self.byte_size >= 16:
+            dest += arrowconv.fixed_data(dec_column, self.byte_size)
+        else:
+            # Values of Decimal32/64 precision always fit in the low 64 bits of the decimal128 value
+            low = np.frombuffer(arrowconv.fixed_data(dec_column, 16), dtype='<i8')[::2]
+            write_np_array(self._array_type, low, dest, ctx.column_name)
+
+    def _arrow_decimal(self, column):
+        """
+        Cast an Arrow decimal or integer array to the Arrow decimal layout of this type, with nulls replaced by 0.
+        :return: The cast array, or None if the values cannot be cast without losing data
+        """
+        arrow_type = arrow.decimal256(min(self.prec, 76), self.scale) if self.byte_size == 32 else \
+            arrow.decimal128(min(self.prec, 38), self.scale)
+        if not (arrow.types.is_decimal(column.type) or arrow.types.is_integer(column.type)):
+            return None
+        try:
+            column = arrowconv.pc.cast(column, arrow_type)
+        except (arrow.ArrowInvalid, arrow.ArrowNotImplementedError):
+            return None
+        return column.fill_null(0) if column.null_count else column
+
     def _active_null(self, ctx: QueryContext):
         if ctx.use_none:
             return None
+        fmt = self.read_format(ctx)
+        if fmt == 'int':
+            return 0
+        if fmt == 'float':
+            return nan if ctx.use_numpy else 0.0
         digits = str('0').rjust(self.prec, '0')
         scale = self.scale
         return decimal.Decimal(f'{digits[:-scale]}.{digits[-scale:]}')
 
+    def _read_arrow_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any,
+                           null_map: Optional[bytes]):
+        if self.byte_size < 16 and np is None:
+            column = self._read_column_binary(source, num_rows, ctx, read_state)
+            return arrowconv.from_python(arrowconv.apply_nulls(column, null_map))
+        data = source.read_bytes(num_rows * self.byte_size)
+        if self.byte_size == 32:
+            return arrowconv.fixed_array(arrow.decimal256(self.prec, self.scale), num_rows, data, null_map)
+        if self.byte_size < 16:
+            data = arrowconv.sign_extend(data, self.byte_size, num_rows)
+        return arrowconv.fixed_array(arrow.decimal128(self.prec, self.scale), num_rows, data, null_map)
+
 
 class BigDecimal(Decimal, registered=False):
-    def _read_column_binary(self, source: ByteSource, num_rows: int, _ctx: QueryContext, _read_state: Any):
-        dec = decimal.Decimal
-        scale = self.scale
-        prec = self.prec
-        column = []
-        app = column.append
+    def _read_column_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, _read_state: Any):
+        fmt = self.read_format(ctx)
         sz = self.byte_size
-        ifb = int.from_bytes
-        if scale == 0:
-            for _ in range(num_rows):
-                app(dec(str(ifb(source.read_bytes(sz), 'little', signed=True))))
-            return column
-        for _ in range(num_rows):
-            x = ifb(source.read_bytes(sz), 'little', signed=True)
-            if x >= 0:
-                digits = str(x).rjust(prec, '0')
-                app(dec(f'{digits[:-scale]}.{digits[-scale:]}'))
-            else:
-                digits = str(-x).rjust(prec, '0')
-                app(dec(f'-{digits[:-scale]}.{digits[-scale:]}'))
-        return column
+        if fmt == 'float' and np is not None:
+            data = source.read_bytes(sz * num_rows)
+            column = _limbs_to_float(np.frombuffer(data, dtype='<u8').reshape(num_rows, sz // 8)) / self._mult
+            return column if ctx.use_numpy else column.tolist()
+        return self._from_scaled(ctypes.data_conv.read_bigint_col(source, num_rows, sz, True), fmt)
+
+    def _finalize_column(self, column: Sequence, ctx: QueryContext) -> Sequence:
+        if self.read_format(ctx) == 'int' and ctx.use_numpy:
+            # 128 and 256 bit integers have no numpy dtype
+            return np.array(column, dtype=object)
+        return super()._finalize_column(column, ctx)
 
     def _write_column_binary(self, column: Union[Sequence, MutableSequence], dest: bytearray, _ctx):
         with decimal.localcontext() as ctx:
@@ -402,6 +643,14 @@ class BigDecimal(Decimal, registered=False):
                 for x in column:
                     dest += itb(int(decimal.Decimal(str(x)) * mult), sz, 'little', signed=True)
 
+    def _write_column_numpy(self, column, dest: bytearray, ctx: InsertContext):
+        column = _np_finite(column, ctx, self.nullable)
+        scaled = self._np_scaled(column)
+        if scaled is None:
+            self._write_column_binary(column.tolist(), dest, ctx)
+        else:
+            dest += arrowconv.sign_extend(scaled.tobytes(), 8, len(scaled), self.byte_size)
+
 
 class Decimal32(Decimal):
     dec_size = 32
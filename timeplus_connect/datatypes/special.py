@@ -1,30 +1,54 @@
-from typing import Union, Sequence, MutableSequence, Any
+from typing import Union, Sequence, MutableSequence, Any, Optional
 from uuid import UUID as PYUUID
 
 from timeplus_connect.datatypes.base import TypeDef, TimeplusType, ArrayType, UnsupportedType
 from timeplus_connect.datatypes.registry import get_from_name
 from timeplus_connect.driver.common import first_value
-from timeplus_connect.driver.ctypes import data_conv
+from timeplus_connect.driver.exceptions import DataError
+from timeplus_connect.driver import ctypes, arrowconv
 from timeplus_connect.driver.insert import InsertContext
 from timeplus_connect.driver.query import QueryContext
 from timeplus_connect.driver.types import ByteSource
+from timeplus_connect.driver.options import np, arrow
 
 empty_uuid_b = bytes(b'\x00' * 16)
 
 
 class UUID(TimeplusType):
-    valid_formats = 'string', 'native'
+    valid_formats = 'string', 'native', 'bytes'
     np_type = 'U36'
+    np_write_kinds = 'SV'
     byte_size = 16
     base_type = ('uuid', )
+    arrow_direct = True
 
     def python_null(self, ctx):
         return '' if self.read_format(ctx) == 'string' else PYUUID(int=0)
 
+    # pylint: disable=too-many-return-statements
     def _read_column_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, _read_state: Any):
-        if self.read_format(ctx) == 'string':
-            return self._read_binary_str(source, num_rows)
-        return data_conv.read_uuid_col(source, num_rows)
+        fmt = self.read_format(ctx)
+        if fmt == 'native':
+            return ctypes.data_conv.read_uuid_col(source, num_rows)
+        if np is None:
+            if fmt == 'string':
+                return self._read_binary_str(source, num_rows)
+            return self._read_binary_bytes(source, num_rows)
+        # Standard (big endian) UUID byte order
+        data = arrowconv.swap_halves(source.read_bytes(num_rows * 16), num_rows)
+        if fmt == 'bytes':
+            if ctx.use_numpy:
+                return np.frombuffer(data, 'S16', num_rows)
+            return [data[ix: ix + 16] for ix in range(0, num_rows * 16, 16)]
+        column = arrowconv.uuid_hex(data, num_rows)
+        if ctx.use_numpy:
+            return column.astype(self.np_type)
+        hex_str = column.tobytes().decode()
+        return [hex_str[ix: ix + 36] for ix in range(0, num_rows * 36, 36)]
+
+    def _zero_nulls(self, ctx: QueryContext) -> bool:
+        # NULL values are zero in the Native data, so the numpy array is returned as is
+        return ctx.use_numpy and not ctx.use_none and self.read_format(ctx) != 'native'
 
     @staticmethod
     def _read_binary_str(source: ByteSource, num_rows: int):
@@ -37,6 +61,22 @@ class UUID(TimeplusType):
             app(f'{x[:8]}-{x[8:12]}-{x[12:16]}-{x[16:20]}-{x[20:]}')
         return column
 
+    @staticmethod
+    def _read_binary_bytes(source: ByteSource, num_rows: int):
+        v = source.read_array('Q', num_rows * 2)
+        return [(v[ix] << 64 | v[ix + 1]).to_bytes(16, 'big') for ix in range(0, num_rows * 2, 2)]
+
+    def _read_arrow_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, _read_state: Any,
+                           null_map: Optional[bytes]):
+        if np is None:
+            column = arrowconv.apply_nulls(self._read_binary_str(source, num_rows), null_map)
+            return arrow.array(column, arrow.string())
+        # Fixed size binary in standard (big endian) UUID byte order
+        data = arrowconv.swap_halves(source.read_bytes(num_rows * 16), num_rows)
+        if self.read_format(ctx) == 'string':
+            return arrowconv.fixed_string_array(arrowconv.uuid_hex(data, num_rows), null_map)
+        return arrowconv.fixed_array(arrow.binary(16), num_rows, data, null_map)
+
     # pylint: disable=too-many-branches
     def _write_column_binary(self, column: Union[Sequence, MutableSequence], dest: bytearray, ctx: InsertContext):
         first = first_value(column, self.nullable)
@@ -70,6 +110,13 @@ class UUID(TimeplusType):
         else:
             dest += empty * len(column)
 
+    def _write_column_numpy(self, column, dest: bytearray, ctx: InsertContext):
+        if column.dtype.itemsize != 16:
+            raise DataError(f'Numpy value size {column.dtype.itemsize} does not match {self.name} ' +
+                            f'for source column `{ctx.column_name}`')
+        # Swapping the big endian halves restores the Native layout
+        dest += arrowconv.swap_halves(np.ascontiguousarray(column).data, len(column))
+
 
 class Nothing(ArrayType):
     _array_type = 'b'
@@ -104,6 +151,19 @@ class SimpleAggregateFunction(TimeplusType):
     def _read_column_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any):
         return self.element_type.read_column_data(source, num_rows, ctx, read_state)
 
+    def read_arrow_data(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any):
+        return self.element_type.read_arrow_data(source, num_rows, ctx, read_state)
+
+    @property
+    def scannable(self) -> bool:
+        return self.element_type.scannable
+
+    def scan_column_prefix(self, source: ByteSource, dest: bytearray):
+        self.element_type.scan_column_prefix(source, dest)
+
+    def _scan_column_binary(self, source: ByteSource, num_rows: int, dest: bytearray):
+        self.element_type.scan_column_data(source, num_rows, dest)
+
     def _write_column_binary(self, column: Union[Sequence, MutableSequence], dest: bytearray, ctx: InsertContext):
         self.element_type.write_column_data(column, dest, ctx)
 
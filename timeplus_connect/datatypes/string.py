@@ -1,19 +1,20 @@
-from typing import Sequence, MutableSequence, Union, Collection, Any
+from typing import Sequence, MutableSequence, Union, Collection, Any, Optional
 
 from timeplus_connect.driver.common import first_value
-from timeplus_connect.driver.ctypes import data_conv
+from timeplus_connect.driver import ctypes, arrowconv
 
 from timeplus_connect.datatypes.base import TimeplusType, TypeDef
 from timeplus_connect.driver.errors import handle_error
 from timeplus_connect.driver.insert import InsertContext
 from timeplus_connect.driver.query import QueryContext
 from timeplus_connect.driver.types import ByteSource
-from timeplus_connect.driver.options import np, pd
+from timeplus_connect.driver.options import np, pd, arrow
 
 
 class String(TimeplusType):
     valid_formats = 'bytes', 'native'
     base_type = ('string', )
+    arrow_direct = True
 
     def _active_encoding(self, ctx):
         if self.read_format(ctx) == 'bytes':
@@ -37,6 +38,17 @@ class String(TimeplusType):
     def _read_nullable_column(self, source: ByteSource, num_rows: int, ctx: QueryContext, read_state: Any) -> Sequence:
         return source.read_str_col(num_rows, self._active_encoding(ctx), True, self._active_null(ctx))
 
+    @property
+    def scannable(self) -> bool:
+        return True
+
+    def _scan_column_binary(self, source: ByteSource, num_rows: int, dest: bytearray):
+        dest += source.read_str_col_raw(num_rows)
+
+    def _read_arrow_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, _read_state: Any,
+                           null_map: Optional[bytes]):
+        return arrowconv.read_string_array(source, num_rows, null_map, self._active_encoding(ctx))
+
     def _finalize_column(self, column: Sequence, ctx: QueryContext) -> Sequence:
         if ctx.use_extended_dtypes and self.read_format(ctx) == 'native':
             return pd.array(column, dtype=pd.StringDtype())
@@ -48,7 +60,7 @@ class String(TimeplusType):
         encoding = None
         if not isinstance(first_value(column, self.nullable), bytes):
             encoding = ctx.encoding or self.encoding
-        handle_error(data_conv.write_str_col(column, self.nullable, encoding, dest), ctx)
+        handle_error(ctypes.data_conv.write_str_col(column, self.nullable, encoding, dest), ctx)
 
     def _active_null(self, ctx):
         if ctx.use_none:
@@ -61,6 +73,7 @@ class String(TimeplusType):
 class FixedString(TimeplusType):
     valid_formats = 'string', 'native'
     base_type = ('fixed_string', )
+    arrow_direct = True
 
     def __init__(self, type_def: TypeDef):
         super().__init__(type_def)
@@ -82,6 +95,10 @@ class FixedString(TimeplusType):
             return source.read_fixed_str_col(self.byte_size, num_rows, ctx.encoding or self.encoding )
         return source.read_bytes_col(self.byte_size, num_rows)
 
+    def _read_arrow_binary(self, source: ByteSource, num_rows: int, _ctx: QueryContext, _read_state: Any,
+                           null_map: Optional[bytes]):
+        return arrowconv.read_fixed_array(source, arrow.binary(self.byte_size), self.byte_size, num_rows, null_map)
+
     def _finalize_column(self, column: Sequence, ctx: QueryContext) -> Sequence:
         if ctx.use_extended_dtypes and self.read_format(ctx) == 'string':
             return pd.array(column, dtype=pd.StringDtype())
@@ -1,36 +1,111 @@
 import pytz
 
 from datetime import date, datetime, tzinfo
-from typing import Union, Sequence, MutableSequence, Any
+from itertools import repeat
+from typing import Union, Sequence, MutableSequence, Any, Optional
 
 from timeplus_connect.datatypes.base import TypeDef, TimeplusType
-from timeplus_connect.driver.common import write_array, np_date_types, int_size, first_value
+from timeplus_connect.driver.common import write_array, np_date_types, int_size, first_value, write_np_array
 from timeplus_connect.driver.exceptions import ProgrammingError
-from timeplus_connect.driver.ctypes import data_conv, numpy_conv
+from timeplus_connect.driver import ctypes, arrowconv, tzutil
 from timeplus_connect.driver.insert import InsertContext
 from timeplus_connect.driver.query import QueryContext
 from timeplus_connect.driver.types import ByteSource
-from timeplus_connect.driver.options import np, pd
+from timeplus_connect.driver.options import np, pd, arrow
 
 epoch_start_date = date(1970, 1, 1)
 epoch_start_datetime = datetime(1970, 1, 1)
 
 
+def _np_ticks(column, unit: str, ctx: InsertContext, nullable: bool, divisor: int = 1):
+    """
+    Convert a numpy datetime64 column to int64 epoch ticks of the given numpy unit, floor divided by divisor.  NaT
+    values become 0 (they are marked as NULL in the null map) in Nullable columns, and are rejected otherwise
+    """
+    nat = np.isnat(column)
+    if not nullable and nat.any():
+        raise ctx.data_error('Invalid NaT value in non-Nullable column')
+    ticks = column.astype(f'datetime64[{unit}]').view('<i8')
+    if divisor > 1:
+        ticks = ticks // divisor
+    if nat.any():
+        ticks = np.where(nat, 0, ticks)
+    return ticks
+
+
+def _epoch_datetimes(ticks, unit: str, tz_info: Optional[tzinfo]) -> list:
+    """
+    Build Python datetimes from a numpy int64 column of UTC epoch ticks ('s' or 'us' unit).  Timezone offsets are
+    applied to the whole column using the cached transition table of the timezone, instead of a timezone lookup for
+    every value, and the datetimes are then constructed directly from the numpy calendar fields
+    """
+    dt_type = f'datetime64[{unit}]'
+    if tz_info is None:
+        return ticks.view(dt_type).tolist()
+    per_second = 1 if unit == 's' else 1000000
+    local = tzutil.local_ticks(ticks, per_second, tz_info)
+    if local is None:
+        from_utc = tz_info.fromutc
+        return [from_utc(x.replace(tzinfo=tz_info)) for x in ticks.view(dt_type).tolist()]
+    ticks, index, tz_infos = local
+    if len(tz_infos) == 1:
+        tz_column = repeat(tz_infos[0])
+    else:
+        tz_column = np.array(tz_infos, dtype=object)[index].tolist()
+    return list(map(datetime, *_datetime_fields(ticks.view(dt_type), per_second), tz_column))
+
+
+def _datetime_fields(column, per_second: int) -> list:
+    """
+    The year, month, day, hour, minute, second and microsecond fields of a numpy datetime64 column ('s' or 'us'
+    unit), each as a list or iterable of ints
+    """
+    days = column.astype('datetime64[D]')
+    months = column.astype('datetime64[M]')
+    day_ticks = (column - days).view('<i8')
+    if per_second > 1:
+        seconds, micros = np.divmod(day_ticks, per_second)
+        micros = micros.tolist()
+    else:
+        seconds, micros = day_ticks, repeat(0)
+    hours, seconds = np.divmod(seconds, 3600)
+    minutes, seconds = np.divmod(seconds, 60)
+    return [(column.astype('datetime64[Y]').view('<i8') + 1970).tolist(),
+            (months.view('<i8') % 12 + 1).tolist(),
+            ((days - months).view('<i8') + 1).tolist(),
+            hours.tolist(),
+            minutes.tolist(),
+            seconds.tolist(),
+            micros]
+
+
 class Date(TimeplusType):
     _array_type = 'H'
+    np_write_kinds = 'Miu'
     np_type = 'datetime64[D]'
     nano_divisor = 86400 * 1000000000
     valid_formats = 'native', 'int'
     python_type = date
     byte_size = 2
     base_type = ('Date', 'date')
+    arrow_direct = True
 
     def _read_column_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, _read_state:Any):
         if self.read_format(ctx) == 'int':
             return source.read_array(self._array_type, num_rows)
         if ctx.use_numpy:
-            return numpy_conv.read_numpy_array(source, '<u2', num_rows).astype(self.np_type)
-        return data_conv.read_date_col(source, num_rows)
+            return ctypes.numpy_conv.read_numpy_array(source, '<u2', num_rows).astype(self.np_type)
+        if np is not None:
+            return ctypes.numpy_conv.read_numpy_array(source, '<u2', num_rows).astype(self.np_type).tolist()
+        return ctypes.data_conv.read_date_col(source, num_rows)
+
+    def _read_arrow_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, _read_state: Any,
+                           null_map: Optional[bytes]):
+        int_type = arrow.uint16() if self.byte_size == 2 else arrow.int32()
+        column = arrowconv.read_fixed_array(source, int_type, self.byte_size, num_rows, null_map)
+        if self.read_format(ctx) == 'int':
+            return column
+        return arrowconv.pc.cast(arrowconv.pc.cast(column, arrow.int32()), arrow.date32())
 
     def _write_column_binary(self, column: Union[Sequence, MutableSequence], dest: bytearray, ctx: InsertContext):
         first = first_value(column, self.nullable)
@@ -48,6 +123,11 @@ class Date(TimeplusType):
                 column = [(x - esd).days for x in column]
         write_array(self._array_type, column, dest, ctx.column_name)
 
+    def _write_column_numpy(self, column, dest: bytearray, ctx: InsertContext):
+        if column.dtype.kind == 'M':
+            column = _np_ticks(column, 'D', ctx, self.nullable)
+        write_np_array(self._array_type, column, dest, ctx.column_name)
+
     def _active_null(self, ctx: QueryContext):
         fmt = self.read_format(ctx)
         if ctx.use_extended_dtypes:
@@ -75,16 +155,28 @@ class Date32(Date):
 
     def _read_column_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, _read_state: Any):
         if ctx.use_numpy:
-            return numpy_conv.read_numpy_array(source, '<i4', num_rows).astype(self.np_type)
+            return ctypes.numpy_conv.read_numpy_array(source, '<i4', num_rows).astype(self.np_type)
         if self.read_format(ctx) == 'int':
             return source.read_array(self._array_type, num_rows)
-        return data_conv.read_date32_col(source, num_rows)
+        if np is not None:
+            return ctypes.numpy_conv.read_numpy_array(source, '<i4', num_rows).astype(self.np_type).tolist()
+        return ctypes.data_conv.read_date32_col(source, num_rows)
 
 
 class DateTimeBase(TimeplusType, registered=False):
     __slots__ = ('tzinfo',)
     valid_formats = 'native', 'int'
     python_type = datetime
+    arrow_direct = True
+    np_write_kinds = 'Miu'
+
+    def __init__(self, type_def: TypeDef):
+        super().__init__(type_def)
+        self.tzinfo: Optional[tzinfo] = None
+
+    @property
+    def object_decode(self) -> bool:
+        return self.tzinfo is not None or super().object_decode
 
     def _active_null(self, ctx: QueryContext):
         fmt = self.read_format(ctx)
@@ -111,19 +203,28 @@ class DateTime(DateTimeBase):
         self._name_suffix = type_def.arg_str
         if len(type_def.values) > 0:
             self.tzinfo = pytz.timezone(type_def.values[0][1:-1])
-        else:
-            self.tzinfo = None
 
     def _read_column_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, _read_state: Any) -> Sequence:
         if self.read_format(ctx) == 'int':
             return source.read_array(self._array_type, num_rows)
         active_tz = ctx.active_tz(self.tzinfo)
         if ctx.use_numpy:
-            np_array = numpy_conv.read_numpy_array(source, '<u4', num_rows).astype(self.np_type)
+            np_array = ctypes.numpy_conv.read_numpy_array(source, '<u4', num_rows).astype(self.np_type)
             if ctx.as_pandas and active_tz:
                 return pd.DatetimeIndex(np_array, tz='UTC').tz_convert(active_tz)
             return np_array
-        return data_conv.read_datetime_col(source, num_rows, active_tz)
+        if np is not None:
+            ticks = ctypes.numpy_conv.read_numpy_array(source, '<u4', num_rows).astype('<i8')
+            return _epoch_datetimes(ticks, 's', active_tz)
+        return ctypes.data_conv.read_datetime_col(source, num_rows, active_tz)
+
+    def _read_arrow_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, _read_state: Any,
+                           null_map: Optional[bytes]):
+        column = arrowconv.read_fixed_array(source, arrow.uint32(), 4, num_rows, null_map)
+        if self.read_format(ctx) == 'int':
+            return column
+        ts_type = arrowconv.timestamp_type('s', ctx.active_tz(self.tzinfo))
+        return arrowconv.pc.cast(arrowconv.pc.cast(column, arrow.int64()), ts_type)
 
     def _write_column_binary(self, column: Union[Sequence, MutableSequence], dest: bytearray, ctx: InsertContext):
         first = first_value(column, self.nullable)
@@ -137,6 +238,11 @@ class DateTime(DateTimeBase):
                 column = [int(x.timestamp()) for x in column]
         write_array(self._array_type, column, dest, ctx.column_name)
 
+    def _write_column_numpy(self, column, dest: bytearray, ctx: InsertContext):
+        if column.dtype.kind == 'M':
+            column = _np_ticks(column, 's', ctx, self.nullable)
+        write_np_array(self._array_type, column, dest, ctx.column_name)
+
 
 class DateTime64(DateTimeBase):
     __slots__ = 'scale', 'prec', 'unit'
@@ -151,8 +257,6 @@ class DateTime64(DateTimeBase):
         self.unit = np_date_types.get(self.scale)
         if len(type_def.values) > 1:
             self.tzinfo = pytz.timezone(type_def.values[1][1:-1])
-        else:
-            self.tzinfo = None
 
     @property
     def np_type(self):
@@ -170,15 +274,34 @@ class DateTime64(DateTimeBase):
             return source.read_array('q', num_rows)
         active_tz = ctx.active_tz(self.tzinfo)
         if ctx.use_numpy:
-            np_array = numpy_conv.read_numpy_array(source, self.np_type, num_rows)
+            np_array = ctypes.numpy_conv.read_numpy_array(source, self.np_type, num_rows)
             if ctx.as_pandas and active_tz and active_tz != pytz.UTC:
                 return pd.DatetimeIndex(np_array, tz='UTC').tz_convert(active_tz)
             return np_array
+        if np is not None:
+            ticks = ctypes.numpy_conv.read_numpy_array(source, '<i8', num_rows)
+            # Python datetimes have microsecond precision, finer ticks are truncated (floor) as in the Python path
+            ticks = ticks * (10 ** (6 - self.scale)) if self.scale <= 6 else ticks // (10 ** (self.scale - 6))
+            return _epoch_datetimes(ticks, 'us', active_tz if active_tz != pytz.UTC else None)
         column = source.read_array('q', num_rows)
         if active_tz and active_tz != pytz.UTC:
             return self._read_binary_tz(column, active_tz)
         return self._read_binary_naive(column)
 
+    def _read_arrow_binary(self, source: ByteSource, num_rows: int, ctx: QueryContext, _read_state: Any,
+                           null_map: Optional[bytes]):
+        column = arrowconv.read_fixed_array(source, arrow.int64(), 8, num_rows, null_map)
+        if self.read_format(ctx) == 'int':
+            return column
+        tz = ctx.active_tz(self.tzinfo)
+        if self.unit:
+            return column.view(arrowconv.timestamp_type(self.unit[1:-1], tz))
+        # Arrow only supports second, millisecond, microsecond and nanosecond units, so other precisions are
+        # converted to the next finer unit
+        scale = next(x for x in (3, 6, 9) if x > self.scale)
+        column = arrowconv.pc.multiply(column, 10 ** (scale - self.scale))  # pylint: disable=no-member
+        return column.view(arrowconv.timestamp_type(np_date_types[scale][1:-1], tz))
+
     def _read_binary_tz(self, column: Sequence, tz_info: tzinfo):
         new_col = []
         app = new_col.append
@@ -226,3 +349,11 @@ class DateTime64(DateTimeBase):
             else:
                 column = [((int(x.timestamp()) * 1000000 + x.microsecond) * prec) // 1000000 for x in column]
         write_array('q', column, dest, ctx.column_name)
+
+    def _write_column_numpy(self, column, dest: bytearray, ctx: InsertContext):
+        if column.dtype.kind == 'M':
+            # Convert at the next finer numpy unit to avoid the limited range of nanosecond datetime64 values
+            unit_scale = -(-self.scale // 3) * 3
+            column = _np_ticks(column, np_date_types[unit_scale][1:-1], ctx, self.nullable,
+                                10 ** (unit_scale - self.scale))
+        write_np_array('q', column, dest, ctx.column_name)
@@ -5,10 +5,12 @@ from urllib.parse import urlparse, parse_qs
 
 import timeplus_connect.driver.ctypes
 from timeplus_connect.driver.client import Client
-from timeplus_connect.driver.common import dict_copy
+from timeplus_connect.driver.common import dict_copy, coerce_bool
 from timeplus_connect.driver.exceptions import ProgrammingError
 from timeplus_connect.driver.httpclient import HttpClient
+from timeplus_connect.driver.cluster import ClusterClient
 from timeplus_connect.driver.asyncclient import AsyncClient
+from timeplus_connect.driver.asynchttp import AsyncHttpTransport, get_ssl_context
 
 
 # pylint: disable=too-many-arguments,too-many-locals,too-many-branches
@@ -52,6 +54,10 @@ def create_client(*,
     :param compress: Enable compression for ClickHouse HTTP inserts and query results.  True will select the preferred
       compression method (lz4).  A str of 'lz4', 'zstd', 'brotli', or 'gzip' can be used to use a specific compression type
     :param query_limit: Default LIMIT on returned rows.  0 means no limit
+    :param compress_level: Insert compression level (quality for brotli).  If not set, the default level of the
+      compression method is used
+    :param compress_threads: Number of zstd worker threads used to compress each insert, -1 for the number of
+      CPU cores.  The default 0 compresses on the inserting thread
     :param connect_timeout:  Timeout in seconds for the http connection
     :param send_receive_timeout: Read timeout in seconds for http connection
     :param client_name: client_name prepended to the HTTP User Agent header. Set this to track client queries
@@ -76,6 +82,15 @@ def create_client(*,
       validity.  This option can be used if using an ssh_tunnel or other indirect means to an ClickHouse server
       where the `host` argument refers to the tunnel or proxy and not the actual ClickHouse server
     :param autogenerate_session_id  If set, this will override the 'autogenerate_session_id' common setting.
+    :param insert_spool  Optional timeplus_connect.driver.spool.InsertSpool.  Inserts that fail because the server
+      is unavailable are written to the spool instead of raising an OperationalError, and can be resent later with
+      a SpoolReplayer
+    :param hedge_policy  Optional timeplus_connect.driver.hedge.HedgePolicy.  If set, query requests that have not
+      responded within the hedge delay are duplicated, and the slower query is cancelled with KILL QUERY.  Hedging
+      is not used for clients with a session_id
+    :param endpoints  Optional sequence of 'host', 'host:port' or URL strings for several Timeplus servers.  If set,
+      a ClusterClient is returned that balances requests across the endpoints.  The ClusterClient also accepts
+      the `policy` ('round_robin', 'least_in_flight', or 'latency'), `health_interval`, and `cooldown` arguments
     :return: ClickHouse Connect Client instance
     """
     if dsn:
@@ -119,7 +134,8 @@ def create_client(*,
                     if name.startswith('ch_'):
                         name = name[3:]
                     settings[name] = value
-        return HttpClient(interface, host, port, username, password, database, access_token,
+        client_cls = ClusterClient if 'endpoints' in kwargs else HttpClient
+        return client_cls(interface, host, port, username, password, database, access_token,
                           settings=settings, **kwargs)
     raise ProgrammingError(f'Unrecognized client type {interface}')
 
@@ -142,6 +158,7 @@ async def create_async_client(*,
                               settings: Optional[Dict[str, Any]] = None,
                               generic_args: Optional[Dict[str, Any]] = None,
                               executor_threads: Optional[int] = None,
+                              native_transport: bool = False,
                               **kwargs) -> AsyncClient:
     """
     The preferred method to get an async ClickHouse Connect Client instance.
@@ -165,6 +182,10 @@ async def create_async_client(*,
       It is not recommended to use this parameter externally
     :param: executor_threads 'max_worker' threads used by the client ThreadPoolExecutor.  If not set, the default
       of 4 + detected CPU cores will be used
+    :param native_transport If True, queries, commands and inserts are sent with an asyncio HTTP transport and
+      its own keep-alive connection pool instead of running the synchronous client in the executor.  Streaming
+      query methods then return AsyncStreamContext objects, and insert accepts async iterables of data batches.
+      HTTP proxies are not supported by the native transport
     :param kwargs -- Recognized keyword arguments (used by the HTTP client), see below
 
     :param compress: Enable compression for ClickHouse HTTP inserts and query results.  True will select the preferred
@@ -203,6 +224,19 @@ async def create_async_client(*,
         return create_client(host=host, username=username, password=password, database=database, interface=interface,
                              port=port, secure=secure, dsn=dsn, settings=settings, generic_args=generic_args, **kwargs)
 
+    if native_transport and (kwargs.get('http_proxy') or kwargs.get('https_proxy')):
+        raise ProgrammingError('HTTP proxies are not supported by the native async transport')
     loop = asyncio.get_running_loop()
     _client = await loop.run_in_executor(None, _create_client)
-    return AsyncClient(client=_client, executor_threads=executor_threads)
+    transport = None
+    if native_transport:
+        ssl_context = None
+        if _client.url.startswith('https'):
+            verify = kwargs.get('verify', True)
+            verify = True if isinstance(verify, str) and verify.lower() == 'proxy' else coerce_bool(verify)
+            ssl_context = get_ssl_context(verify=verify,
+                                          ca_cert=kwargs.get('ca_cert'),
+                                          client_cert=kwargs.get('client_cert'),
+                                          client_cert_key=kwargs.get('client_cert_key'))
+        transport = AsyncHttpTransport(_client, ssl_context)
+    return AsyncClient(client=_client, executor_threads=executor_threads, transport=transport)
@@ -0,0 +1,233 @@
+import binascii
+from datetime import tzinfo
+from typing import Optional, Sequence, Tuple
+
+from timeplus_connect.driver.options import arrow, np, pl
+from timeplus_connect.driver.types import ByteSource
+
+try:
+    import pyarrow.compute as pc
+except ImportError:
+    pc = None
+
+MAX_OFFSET_32 = 2 ** 31 - 1
+_OFFSET_ZERO = bytes(8)
+
+
+def validity(null_map: Optional[bytes], num_rows: int) -> Tuple[Optional['arrow.Buffer'], int]:
+    """
+    Convert a Native format null map (one byte per row, 1 for NULL) into an Arrow validity bitmap
+    :return: The validity bitmap (None if there are no nulls) and the null count
+    """
+    if not null_map:
+        return None, 0
+    null_count = null_map.count(1)
+    if null_count == 0:
+        return None, 0
+    nulls = arrow.Array.from_buffers(arrow.uint8(), num_rows, [None, arrow.py_buffer(null_map)])
+    valid = pc.equal(nulls, 0)  # pylint: disable=no-member
+    return valid.buffers()[1], null_count
+
+
+def fixed_array(arrow_type: 'arrow.DataType', num_rows: int, data: bytes,
+                null_map: Optional[bytes] = None) -> 'arrow.Array':
+    """
+    Build an Arrow array of a fixed width type directly from the little endian Native column bytes
+    """
+    bitmap, null_count = validity(null_map, num_rows)
+    return arrow.Array.from_buffers(arrow_type, num_rows, [bitmap, arrow.py_buffer(data)], null_count)
+
+
+def read_fixed_array(source: ByteSource, arrow_type: 'arrow.DataType', byte_size: int, num_rows: int,
+                     null_map: Optional[bytes] = None) -> 'arrow.Array':
+    return fixed_array(arrow_type, num_rows, source.read_bytes(byte_size * num_rows), null_map)
+
+
+def read_string_array(source: ByteSource, num_rows: int, null_map: Optional[bytes] = None,
+                      encoding: Optional[str] = None) -> 'arrow.Array':
+    """
+    Read a Native String column as an Arrow string array, or a binary array if encoding is None or the values are
+    not valid UTF-8
+    """
+    offsets, data = source.read_str_col_offsets(num_rows)
+    bitmap, null_count = validity(null_map, num_rows)
+    column = arrow.Array.from_buffers(arrow.large_binary(), num_rows,
+                                      [bitmap, arrow.py_buffer(offsets), arrow.py_buffer(data)], null_count)
+    small = len(data) <= MAX_OFFSET_32
+    if encoding and encoding.lower().replace('-', '') == 'utf8':
+        try:
+            return pc.cast(column, arrow.string() if small else arrow.large_string())
+        except arrow.ArrowInvalid:
+            pass
+    return pc.cast(column, arrow.binary()) if small else column
+
+
+def offsets_array(source: ByteSource, num_rows: int) -> Tuple['arrow.Array', int]:
+    """
+    Read the UInt64 end offsets of a Native Array or Map column as Arrow int64 offsets starting with 0
+    :return: The offsets array (num_rows + 1 values) and the total number of elements
+    """
+    data = source.read_bytes(num_rows * 8)
+    total = int.from_bytes(data[-8:], 'little') if num_rows else 0
+    return fixed_array(arrow.int64(), num_rows + 1, _OFFSET_ZERO + data), total
+
+
+def list_array(offsets: 'arrow.Array', values: 'arrow.Array', total: int) -> 'arrow.Array':
+    column = arrow.LargeListArray.from_arrays(offsets, values)
+    if total <= MAX_OFFSET_32:
+        return pc.cast(column, arrow.list_(values.type))
+    return column
+
+
+def map_array(offsets: 'arrow.Array', keys: 'arrow.Array', values: 'arrow.Array') -> 'arrow.Array':
+    return arrow.MapArray.from_arrays(pc.cast(offsets, arrow.int32()), keys, values)
+
+
+def dictionary_array(index: 'arrow.Array', keys: bytes, key_size: int, num_rows: int,
+                     nullable: bool) -> 'arrow.Array':
+    """
+    Build an Arrow dictionary array from the index (dictionary) and keys of a Native LowCardinality column.  For
+    nullable columns the first index entry is a placeholder and key 0 represents NULL
+    """
+    indices = fixed_array(getattr(arrow, f'uint{key_size * 8}')(), num_rows, keys)
+    if nullable:
+        indices = pc.if_else(pc.equal(indices, 0), arrow.scalar(None, indices.type), indices)  # pylint: disable=no-member
+    indices = pc.cast(indices, arrow.int64() if key_size == 8 else arrow.int32())
+    return arrow.DictionaryArray.from_arrays(indices, index)
+
+
+def timestamp_type(unit: str, tz: Optional[tzinfo]) -> 'arrow.DataType':
+    """
+    Arrow timestamp type in the timezone tz.  Arrow applies the timezone to the UTC values itself, so the column data
+    is never converted
+    """
+    tz_name = getattr(tz, 'zone', None) or getattr(tz, 'key', None)  # pytz and zoneinfo timezones
+    if tz_name is None and tz is not None:
+        offset = tz.utcoffset(None)
+        if offset is not None:
+            minutes = int(offset.total_seconds()) // 60
+            tz_name = f"{'-' if minutes < 0 else '+'}{abs(minutes) // 60:02d}:{abs(minutes) % 60:02d}"
+    return arrow.timestamp(unit, tz=tz_name or 'UTC')
+
+
+def swap_halves(data: bytes, num_rows: int) -> bytes:
+    """
+    Convert 16 byte values stored as two little endian UInt64 values (high half first) into big endian byte order.
+    Used for Native UUID values.  Requires numpy
+    """
+    return np.frombuffer(data, dtype='<u8', count=num_rows * 2).astype('>u8').tobytes()
+
+
+def uuid_hex(data: bytes, num_rows: int) -> 'np.ndarray':
+    """
+    Format big endian 16 byte UUID values as a numpy 'S36' array of canonical (dashed, lower case) UUID strings.
+    Requires numpy
+    """
+    digits = np.frombuffer(binascii.hexlify(data), dtype='u1', count=num_rows * 32).reshape(num_rows, 32)
+    chars = np.empty((num_rows, 36), dtype='u1')
+    chars[:, [8, 13, 18, 23]] = ord('-')
+    for dashes, (start, end) in enumerate(((0, 8), (8, 12), (12, 16), (16, 20), (20, 32))):
+        chars[:, start + dashes: end + dashes] = digits[:, start:end]
+    return chars.view('S36').reshape(num_rows)
+
+
+def fixed_string_array(data: 'np.ndarray', null_map: Optional[bytes] = None) -> 'arrow.Array':
+    """
+    Build an Arrow string array directly from a numpy array of fixed length ASCII strings ('S' dtype without
+    padding), such as the output of uuid_hex
+    """
+    num_rows, width = len(data), data.dtype.itemsize
+    offsets = np.arange(0, (num_rows + 1) * width, width, dtype='<i4')
+    bitmap, null_count = validity(null_map, num_rows)
+    return arrow.Array.from_buffers(arrow.string(), num_rows,
+                                    [bitmap, arrow.py_buffer(offsets), arrow.py_buffer(data)], null_count)
+
+
+def sign_extend(data: bytes, byte_size: int, num_rows: int, width: int = 16) -> bytes:
+    """
+    Widen little endian signed integers into little endian two's complement values of width bytes, such as the
+    layout of Arrow decimal128 arrays or Native Int128/Int256 columns.  Requires numpy
+    """
+    low = np.frombuffer(data, dtype=f'<i{byte_size}', count=num_rows).astype('<i8')
+    wide = np.empty((num_rows, width // 8), dtype='<i8')
+    wide[:, 0] = low
+    wide[:, 1:] = (low >> 63)[:, None]
+    return wide.tobytes()
+
+
+def native_null_map(column: 'arrow.Array') -> bytes:
+    """
+    Native format null map (one byte per row, 1 for NULL) of an Arrow array
+    """
+    if column.null_count == 0:
+        return bytes(len(column))
+    nulls = pc.cast(column.is_null(), arrow.uint8())
+    return nulls.buffers()[1].to_pybytes()[:len(column)]
+
+
+def fixed_data(column: 'arrow.Array', byte_size: int) -> memoryview:
+    """
+    The data buffer bytes of a fixed width Arrow array, accounting for the array offset
+    """
+    start = column.offset * byte_size
+    return memoryview(column.buffers()[1])[start: start + len(column) * byte_size]
+
+
+def apply_nulls(column: Sequence, null_map: Optional[bytes]) -> Sequence:
+    if not null_map:
+        return column
+    return [None if null else x for x, null in zip(column, null_map)]
+
+
+def from_python(column: Sequence) -> 'arrow.Array':
+    """
+    Fallback conversion of a decoded Python column, for types without a direct Arrow layout.  Values that Arrow
+    cannot convert (such as ipaddress objects or integers wider than 64 bits) are converted to strings
+    """
+    try:
+        return arrow.array(column)
+    except (arrow.ArrowException, OverflowError):
+        return arrow.array([None if x is None else str(x) for x in column], arrow.string())
+
+
+# pylint: disable=too-many-return-statements
+def _polars_type(arrow_type: 'arrow.DataType') -> Optional['arrow.DataType']:
+    """
+    :return: An equivalent Arrow type that Polars can import, or None if the type is already supported.  Polars has no
+      256 bit decimal, so those values (including nested ones) are converted to strings
+    """
+    if arrow.types.is_decimal256(arrow_type):
+        return arrow.string()
+    if arrow.types.is_map(arrow_type):
+        key_type = _polars_type(arrow_type.key_type)
+        item_type = _polars_type(arrow_type.item_type)
+        if key_type is None and item_type is None:
+            return None
+        return arrow.map_(key_type or arrow_type.key_type, item_type or arrow_type.item_type)
+    if arrow.types.is_list(arrow_type) or arrow.types.is_large_list(arrow_type):
+        value_type = _polars_type(arrow_type.value_type)
+        if value_type is None:
+            return None
+        return arrow.list_(value_type) if arrow.types.is_list(arrow_type) else arrow.large_list(value_type)
+    if arrow.types.is_struct(arrow_type):
+        fields = [arrow_type.field(ix) for ix in range(arrow_type.num_fields)]
+        field_types = [_polars_type(field.type) for field in fields]
+        if all(field_type is None for field_type in field_types):
+            return None
+        return arrow.struct([field.with_type(field_type) if field_type else field
+                             for field, field_type in zip(fields, field_types)])
+    return None
+
+
+def to_polars(data):
+    """
+    Zero copy conversion of an Arrow Table or RecordBatch to a Polars DataFrame, converting any columns that Polars
+    cannot import
+    """
+    if isinstance(data, arrow.RecordBatch):
+        data = arrow.Table.from_batches([data])
+    for ix, field in enumerate(data.schema):
+        polars_type = _polars_type(field.type)
+        if polars_type is not None:
+            data = data.set_column(ix, field.name, pc.cast(data.column(ix), polars_type))
+    return pl.from_arrow(data, rechunk=False)
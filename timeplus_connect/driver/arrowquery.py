@@ -0,0 +1,87 @@
+import logging
+from typing import Generator, Tuple
+
+from timeplus_connect.driver.arrowconv import to_polars
+from timeplus_connect.driver.common import empty_gen, StreamContext
+from timeplus_connect.driver.exceptions import StreamClosedError
+from timeplus_connect.driver.types import Closable
+from timeplus_connect.driver.options import arrow
+
+logger = logging.getLogger(__name__)
+
+
+# pylint: disable=too-many-instance-attributes
+class ArrowResult(Closable):
+    """
+    Query result of PyArrow RecordBatches decoded directly from the Native format
+    """
+    def __init__(self,
+                 batch_gen: Generator = None,
+                 column_names: Tuple = (),
+                 column_types: Tuple = (),
+                 schema=None,
+                 source: Closable = None):
+        self.column_names = column_names
+        self.column_types = column_types
+        self.schema = schema if schema is not None else arrow.schema([])
+        self.source = source
+        self.query_id = ''
+        self.summary = {}
+        self._batch_gen = batch_gen or empty_gen()
+        self._arrow_result = None
+        self._pl_result = None
+
+    def _batches(self) -> Generator:
+        if self._batch_gen is None:
+            raise StreamClosedError
+        batch_gen = self._batch_gen
+        self._batch_gen = None
+        return batch_gen
+
+    @property
+    def arrow_stream(self) -> StreamContext:
+        """
+        :return: StreamContext yielding a PyArrow RecordBatch per Native block
+        """
+        return StreamContext(self, self._batches())
+
+    @property
+    def arrow_result(self):
+        """
+        :return: PyArrow Table of the complete result
+        """
+        if self._arrow_result is None:
+            try:
+                self._arrow_result = arrow.Table.from_batches(list(self._batches()), self.schema)
+            finally:
+                self.close()
+        return self._arrow_result
+
+    @property
+    def pl_stream(self) -> StreamContext:
+        """
+        :return: StreamContext yielding a Polars DataFrame per Native block
+        """
+        def pl_gen():
+            for batch in batch_gen:
+                yield to_polars(batch)
+
+        batch_gen = self._batches()
+        return StreamContext(self, pl_gen())
+
+    @property
+    def pl_result(self):
+        """
+        :return: Polars DataFrame of the complete result, sharing the Arrow buffers of the decoded blocks
+        """
+        if self._pl_result is None:
+            self._pl_result = to_polars(self.arrow_result)
+        return self._pl_result
+
+    def close(self):
+        if self._batch_gen is not None:
+            self._batch_gen.close()
+            self._batch_gen = None
+        if self.source:
+            self.source.close()
+            self.source = None
@@ -1,34 +1,118 @@
 import asyncio
 import io
 import os
+from concurrent.futures import Executor, Future, wait
 from concurrent.futures.thread import ThreadPoolExecutor
 from datetime import tzinfo
-from typing import Optional, Union, Dict, Any, Sequence, Iterable, Generator, BinaryIO
+from typing import Optional, Union, Dict, Any, Sequence, Iterable, Generator, BinaryIO, AsyncIterable
 
+from timeplus_connect.driver.asynchttp import AsyncHttpTransport
 from timeplus_connect.driver.client import Client
-from timeplus_connect.driver.common import StreamContext
+from timeplus_connect.driver.models import full_table_name, insert_column_defs, build_insert_context
+from timeplus_connect import common
+from timeplus_connect.driver.common import StreamContext, AsyncStreamContext, async_read_ahead
+from timeplus_connect.driver.exceptions import ProgrammingError
 from timeplus_connect.driver.httpclient import HttpClient
 from timeplus_connect.driver.external import ExternalData
 from timeplus_connect.driver.query import QueryContext, QueryResult
 from timeplus_connect.driver.summary import QuerySummary
 from timeplus_connect.datatypes.base import TimeplusType
 from timeplus_connect.driver.insert import InsertContext
+from timeplus_connect.driver.options import check_numpy, check_pandas, check_polars
+
+
+_END = object()
+
+
+class ExecutorStreamContext(AsyncStreamContext):
+    """
+    AsyncStreamContext over a synchronous StreamContext.  Each item is read from the synchronous stream on the
+    executor, so network reads and decoding do not block the event loop.  Items are fetched ahead of the consumer
+    based on the 'async_read_ahead' common setting.  For backward compatibility the synchronous context manager and
+    iterator protocols are also supported, reading the wrapped stream on the calling thread
+    """
+    __slots__ = 'stream', 'executor', '_future', '_flatten', '_rows'
+
+    def __init__(self, stream: StreamContext, executor: Executor, flatten: bool = False):
+        """
+        :param stream: Synchronous StreamContext
+        :param executor: Executor used to read the synchronous stream
+        :param flatten: Yield the individual items of each item read from the stream (rows of a row block)
+        """
+        self.stream = stream
+        self.executor = executor
+        self._future: Optional[Future] = None
+        self._flatten = flatten
+        self._rows = None
+        super().__init__(self, async_read_ahead(self._items(flatten), common.get_setting('async_read_ahead')))
+
+    async def _items(self, flatten: bool):
+        while True:
+            self._future = self.executor.submit(next, self.stream, _END)
+            item = await asyncio.wrap_future(self._future)
+            if item is _END:
+                return
+            if flatten:
+                for sub_item in item:
+                    yield sub_item
+            else:
+                yield item
+
+    async def __aenter__(self):
+        self.stream.__enter__()
+        return await super().__aenter__()
+
+    async def close(self):
+        await asyncio.get_running_loop().run_in_executor(self.executor, self._close)
+
+    def _close(self):
+        # The source must not be closed while a read on another executor thread is still in progress
+        if self._future:
+            self._future.cancel()
+            wait((self._future,))
+        self.stream.__exit__(None, None, None)
+
+    def __enter__(self):
+        self.stream.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._rows = None
+        self.stream.__exit__(exc_type, exc_val, exc_tb)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self._flatten:
+            return next(self.stream)
+        while True:
+            if self._rows is not None:
+                row = next(self._rows, _END)
+                if row is not _END:
+                    return row
+            self._rows = iter(next(self.stream))
 
 
 # pylint: disable=too-many-public-methods,too-many-instance-attributes,too-many-arguments,too-many-positional-arguments,too-many-locals
 class AsyncClient:
     """
     AsyncClient is a wrapper around the ClickHouse Client object that allows for async calls to the ClickHouse server.
-    Internally, each of the methods that uses IO is wrapped in a call to EventLoop.run_in_executor.
+    Internally, each of the methods that uses IO is wrapped in a call to EventLoop.run_in_executor, unless a native
+    AsyncHttpTransport is used.  In that case queries, commands and inserts are sent directly on the event loop.
+    Streaming methods return AsyncStreamContext objects for use with `async with` and `async for`
     """
 
-    def __init__(self, *, client: Client, executor_threads: int = 0):
+    def __init__(self, *, client: Client, executor_threads: int = 0, transport: Optional[AsyncHttpTransport] = None):
         if isinstance(client, HttpClient):
             client.headers['User-Agent'] = client.headers['User-Agent'].replace('mode:sync;', 'mode:async;')
         self.client = client
+        self.transport = transport
         if executor_threads == 0:
             executor_threads = min(32, (os.cpu_count() or 1) + 4)  # Mimic the default behavior
         self.executor = ThreadPoolExecutor(max_workers=executor_threads)
+        if transport and transport.executor is None:
+            transport.executor = self.executor
 
     def set_client_setting(self, key, value):
         """
@@ -68,6 +152,8 @@ class AsyncClient:
         """
         Subclass implementation to close the connection to the server/deallocate the client
         """
+        if self.transport:
+            await self.transport.close()
         self.client.close()
         await asyncio.to_thread(self.executor.shutdown, True)
 
@@ -92,6 +178,8 @@ class AsyncClient:
         For parameters, see the create_query_context method.
         :return: QueryResult -- data and metadata from response
         """
+        if self.transport:
+            return await self._transport_query(locals())
 
         def _query():
             return self.client.query(query=query, parameters=parameters, settings=settings, query_formats=query_formats,
@@ -117,12 +205,14 @@ class AsyncClient:
                                         column_tzs: Optional[Dict[str, Union[str, tzinfo]]] = None,
                                         external_data: Optional[ExternalData] = None,
                                         transport_settings: Optional[Dict[str, str]] = None,
-                                        ) -> StreamContext:
+                                        ) -> AsyncStreamContext:
         """
         Variation of main query method that returns a stream of column oriented blocks.
         For parameters, see the create_query_context method.
-        :return: StreamContext -- Iterable stream context that returns column oriented blocks
+        :return: AsyncStreamContext -- Async iterable stream context that returns column oriented blocks
         """
+        if self.transport:
+            return await self._transport_stream(locals(), 'block')
 
         def _query_column_block_stream():
             return self.client.query_column_block_stream(query=query, parameters=parameters, settings=settings,
@@ -133,7 +223,7 @@ class AsyncClient:
 
         loop = asyncio.get_running_loop()
         result = await loop.run_in_executor(self.executor, _query_column_block_stream)
-        return result
+        return ExecutorStreamContext(result, self.executor)
 
     async def query_row_block_stream(self,
                                      query: Optional[str] = None,
@@ -147,12 +237,14 @@ class AsyncClient:
                                      query_tz: Optional[Union[str, tzinfo]] = None,
                                      column_tzs: Optional[Dict[str, Union[str, tzinfo]]] = None,
                                      external_data: Optional[ExternalData] = None,
-                                     transport_settings: Optional[Dict[str, str]] = None) -> StreamContext:
+                                     transport_settings: Optional[Dict[str, str]] = None) -> AsyncStreamContext:
         """
         Variation of main query method that returns a stream of row oriented blocks.
         For parameters, see the create_query_context method.
-        :return: StreamContext -- Iterable stream context that returns blocks of rows
+        :return: AsyncStreamContext -- Async iterable stream context that returns blocks of rows
         """
+        if self.transport:
+            return await self._transport_stream(locals(), 'row_block')
 
         def _query_row_block_stream():
             return self.client.query_row_block_stream(query=query, parameters=parameters, settings=settings,
@@ -163,7 +255,7 @@ class AsyncClient:
 
         loop = asyncio.get_running_loop()
         result = await loop.run_in_executor(self.executor, _query_row_block_stream)
-        return result
+        return ExecutorStreamContext(result, self.executor)
 
     async def query_rows_stream(self,
                                 query: Optional[str] = None,
@@ -177,23 +269,27 @@ class AsyncClient:
                                 query_tz: Optional[Union[str, tzinfo]] = None,
                                 column_tzs: Optional[Dict[str, Union[str, tzinfo]]] = None,
                                 external_data: Optional[ExternalData] = None,
-                                transport_settings: Optional[Dict[str, str]] = None) -> StreamContext:
+                                transport_settings: Optional[Dict[str, str]] = None) -> AsyncStreamContext:
         """
-        Variation of main query method that returns a stream of row oriented blocks.
+        Variation of main query method that returns a stream of rows.
         For parameters, see the create_query_context method.
-        :return: StreamContext -- Iterable stream context that returns blocks of rows
+        :return: AsyncStreamContext -- Async iterable stream context that returns individual rows
         """
+        if self.transport:
+            return await self._transport_stream(locals(), 'rows')
 
         def _query_rows_stream():
-            return self.client.query_rows_stream(query=query, parameters=parameters, settings=settings,
-                                                 query_formats=query_formats, column_formats=column_formats,
-                                                 encoding=encoding, use_none=use_none, context=context,
-                                                 query_tz=query_tz, column_tzs=column_tzs,
-                                                 external_data=external_data, transport_settings=transport_settings)
+            # Rows are fetched from the executor a block at a time
+            return self.client.query_row_block_stream(query=query, parameters=parameters, settings=settings,
+                                                      query_formats=query_formats, column_formats=column_formats,
+                                                      encoding=encoding, use_none=use_none, context=context,
+                                                      query_tz=query_tz, column_tzs=column_tzs,
+                                                      external_data=external_data,
+                                                      transport_settings=transport_settings)
 
         loop = asyncio.get_running_loop()
         result = await loop.run_in_executor(self.executor, _query_rows_stream)
-        return result
+        return ExecutorStreamContext(result, self.executor, flatten=True)
 
     async def raw_query(self,
                         query: str,
@@ -215,6 +311,10 @@ class AsyncClient:
         :param transport_settings: Optional dictionary of transport level settings (HTTP headers, etc.)
         :return: bytes representing raw ClickHouse return value based on format
         """
+        if self.transport:
+            return await self.transport.raw_query(query=query, parameters=parameters, settings=settings, fmt=fmt,
+                                                  use_database=use_database, external_data=external_data,
+                                                  transport_settings=transport_settings)
 
         def _raw_query():
             return self.client.raw_query(query=query, parameters=parameters, settings=settings, fmt=fmt,
@@ -270,6 +370,9 @@ class AsyncClient:
         For parameter values, see the create_query_context method.
         :return: Numpy array representing the result set
         """
+        if self.transport:
+            check_numpy()
+            return (await self._transport_query(locals(), use_numpy=True)).np_result
 
         def _query_np():
             return self.client.query_np(query=query, parameters=parameters, settings=settings,
@@ -292,11 +395,11 @@ class AsyncClient:
                               max_str_len: Optional[int] = None,
                               context: QueryContext = None,
                               external_data: Optional[ExternalData] = None,
-                              transport_settings: Optional[Dict[str, str]] = None) -> StreamContext:
+                              transport_settings: Optional[Dict[str, str]] = None) -> AsyncStreamContext:
         """
         Query method that returns the results as a stream of numpy arrays.
         For parameter values, see the create_query_context method.
-        :return: Generator that yield a numpy array per block representing the result set
+        :return: AsyncStreamContext that yields a numpy array per block representing the result set
         """
 
         def _query_np_stream():
@@ -307,7 +410,7 @@ class AsyncClient:
 
         loop = asyncio.get_running_loop()
         result = await loop.run_in_executor(self.executor, _query_np_stream)
-        return result
+        return ExecutorStreamContext(result, self.executor)
 
     async def query_df(self,
                        query: Optional[str] = None,
@@ -330,6 +433,9 @@ class AsyncClient:
         For parameter values, see the create_query_context method.
         :return: Pandas dataframe representing the result set
         """
+        if self.transport:
+            check_pandas()
+            return (await self._transport_query(locals(), use_numpy=True, as_pandas=True)).df_result
 
         def _query_df():
             return self.client.query_df(query=query, parameters=parameters, settings=settings,
@@ -358,11 +464,11 @@ class AsyncClient:
                               context: QueryContext = None,
                               external_data: Optional[ExternalData] = None,
                               use_extended_dtypes: Optional[bool] = None,
-                              transport_settings: Optional[Dict[str, str]] = None) -> StreamContext:
+                              transport_settings: Optional[Dict[str, str]] = None) -> AsyncStreamContext:
         """
-        Query method that returns the results as a StreamContext.
+        Query method that returns the results as an AsyncStreamContext.
         For parameter values, see the create_query_context method.
-        :return: Generator that yields a Pandas dataframe per block representing the result set
+        :return: AsyncStreamContext that yields a Pandas dataframe per block representing the result set
         """
 
         def _query_df_stream():
@@ -376,7 +482,7 @@ class AsyncClient:
 
         loop = asyncio.get_running_loop()
         result = await loop.run_in_executor(self.executor, _query_df_stream)
-        return result
+        return ExecutorStreamContext(result, self.executor)
 
     def create_query_context(self,
                              query: Optional[Union[str, bytes]] = None,
@@ -397,7 +503,8 @@ class AsyncClient:
                              as_pandas: bool = False,
                              external_data: Optional[ExternalData] = None,
                              use_extended_dtypes: Optional[bool] = None,
-                             transport_settings: Optional[Dict[str, str]] = None) -> QueryContext:
+                             transport_settings: Optional[Dict[str, str]] = None,
+                             as_arrow: bool = False) -> QueryContext:
         """
         Creates or updates a reusable QueryContext object
         :param query: Query statement/format string
@@ -428,6 +535,7 @@ class AsyncClient:
           pandas.NA and pandas.NaT for ClickHouse NULL values, as well as extended Pandas dtypes such as IntegerArray
           and StringArray.  Defaulted to True for query_df methods
         :param transport_settings: Optional dictionary of transport level settings (HTTP headers, etc.)
+        :param as_arrow Decode the Native format response directly into PyArrow arrays
         :return: Reusable QueryContext
         """
 
@@ -441,7 +549,8 @@ class AsyncClient:
                                                 streaming=streaming, as_pandas=as_pandas,
                                                 external_data=external_data,
                                                 use_extended_dtypes=use_extended_dtypes,
-                                                transport_settings=transport_settings)
+                                                transport_settings=transport_settings,
+                                                as_arrow=as_arrow)
 
     async def query_arrow(self,
                           query: str,
@@ -449,7 +558,8 @@ class AsyncClient:
                           settings: Optional[Dict[str, Any]] = None,
                           use_strings: Optional[bool] = None,
                           external_data: Optional[ExternalData] = None,
-                          transport_settings: Optional[Dict[str, str]] = None):
+                          transport_settings: Optional[Dict[str, str]] = None,
+                          use_native: bool = False):
         """
         Query method using the ClickHouse Arrow format to return a PyArrow table
         :param query: Query statement/format string
@@ -458,13 +568,14 @@ class AsyncClient:
         :param use_strings:  Convert ClickHouse String type to Arrow string type (instead of binary)
         :param external_data ClickHouse "external data" to send with query
         :param transport_settings: Optional dictionary of transport level settings (HTTP headers, etc.)
+        :param use_native: Query in the Native format and decode the response directly into Arrow arrays
         :return: PyArrow.Table
         """
 
         def _query_arrow():
             return self.client.query_arrow(query=query, parameters=parameters, settings=settings,
                                            use_strings=use_strings, external_data=external_data,
-                                           transport_settings=transport_settings)
+                                           transport_settings=transport_settings, use_native=use_native)
 
         loop = asyncio.get_running_loop()
         result = await loop.run_in_executor(self.executor, _query_arrow)
@@ -476,7 +587,8 @@ class AsyncClient:
                                  settings: Optional[Dict[str, Any]] = None,
                                  use_strings: Optional[bool] = None,
                                  external_data: Optional[ExternalData] = None,
-                                 transport_settings: Optional[Dict[str, str]] = None) -> StreamContext:
+                                 transport_settings: Optional[Dict[str, str]] = None,
+                                 use_native: bool = False) -> AsyncStreamContext:
         """
         Query method that returns the results as a stream of Arrow tables
         :param query: Query statement/format string
@@ -485,18 +597,73 @@ class AsyncClient:
         :param use_strings:  Convert ClickHouse String type to Arrow string type (instead of binary)
         :param external_data ClickHouse "external data" to send with query
         :param transport_settings: Optional dictionary of transport level settings (HTTP headers, etc.)
-        :return: Generator that yields a PyArrow.Table for per block representing the result set
+        :param use_native: Query in the Native format and decode each block directly into an Arrow RecordBatch
+        :return: AsyncStreamContext that yields a PyArrow.Table for per block representing the result set
         """
 
         def _query_arrow_stream():
             return self.client.query_arrow_stream(query=query, parameters=parameters, settings=settings,
                                                   use_strings=use_strings, external_data=external_data,
-                                                  transport_settings=transport_settings)
+                                                  transport_settings=transport_settings, use_native=use_native)
 
         loop = asyncio.get_running_loop()
         result = await loop.run_in_executor(self.executor, _query_arrow_stream)
+        return ExecutorStreamContext(result, self.executor)
+
+    async def query_pl(self,
+                       query: str,
+                       parameters: Optional[Union[Sequence, Dict[str, Any]]] = None,
+                       settings: Optional[Dict[str, Any]] = None,
+                       use_strings: Optional[bool] = None,
+                       external_data: Optional[ExternalData] = None,
+                       transport_settings: Optional[Dict[str, str]] = None):
+        """
+        Query method that returns the results as a Polars DataFrame
+        :param query: Query statement/format string
+        :param parameters: Optional dictionary used to format the query
+        :param settings: Optional dictionary of ClickHouse settings (key/string values)
+        :param use_strings: Convert ClickHouse String type to Polars String type (instead of Binary)
+        :param external_data ClickHouse "external data" to send with query
+        :param transport_settings: Optional dictionary of transport level settings (HTTP headers, etc.)
+        :return: Polars DataFrame representing the result set
+        """
+
+        def _query_pl():
+            return self.client.query_pl(query=query, parameters=parameters, settings=settings,
+                                        use_strings=use_strings, external_data=external_data,
+                                        transport_settings=transport_settings)
+
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.executor, _query_pl)
         return result
 
+    async def query_pl_stream(self,
+                              query: str,
+                              parameters: Optional[Union[Sequence, Dict[str, Any]]] = None,
+                              settings: Optional[Dict[str, Any]] = None,
+                              use_strings: Optional[bool] = None,
+                              external_data: Optional[ExternalData] = None,
+                              transport_settings: Optional[Dict[str, str]] = None) -> AsyncStreamContext:
+        """
+        Query method that returns the results as a stream of Polars DataFrames
+        :param query: Query statement/format string
+        :param parameters: Optional dictionary used to format the query
+        :param settings: Optional dictionary of ClickHouse settings (key/string values)
+        :param use_strings: Convert ClickHouse String type to Polars String type (instead of Binary)
+        :param external_data ClickHouse "external data" to send with query
+        :param transport_settings: Optional dictionary of transport level settings (HTTP headers, etc.)
+        :return: AsyncStreamContext that yields a Polars DataFrame per block representing the result set
+        """
+
+        def _query_pl_stream():
+            return self.client.query_pl_stream(query=query, parameters=parameters, settings=settings,
+                                               use_strings=use_strings, external_data=external_data,
+                                               transport_settings=transport_settings)
+
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.executor, _query_pl_stream)
+        return ExecutorStreamContext(result, self.executor)
+
     async def command(self,
                       cmd: str,
                       parameters: Optional[Union[Sequence, Dict[str, Any]]] = None,
@@ -519,6 +686,10 @@ class AsyncClient:
         :return: Decoded response from ClickHouse as either a string, int, or sequence of strings, or QuerySummary
         if no data returned
         """
+        if self.transport:
+            return await self.transport.command(cmd=cmd, parameters=parameters, data=data, settings=settings,
+                                                use_database=use_database, external_data=external_data,
+                                                transport_settings=transport_settings)
 
         def _command():
             return self.client.command(cmd=cmd, parameters=parameters, data=data, settings=settings,
@@ -544,7 +715,7 @@ class AsyncClient:
 
     async def insert(self,
                      table: Optional[str] = None,
-                     data: Sequence[Sequence[Any]] = None,
+                     data: Union[Sequence[Sequence[Any]], AsyncIterable[Sequence[Sequence[Any]]]] = None,
                      column_names: Union[str, Iterable[str]] = '*',
                      database: Optional[str] = None,
                      column_types: Sequence[TimeplusType] = None,
@@ -557,7 +728,8 @@ class AsyncClient:
         Method to insert multiple rows/data matrix of native Python objects.  If context is specified arguments
         other than data are ignored
         :param table: Target table
-        :param data: Sequence of sequences of Python data
+        :param data: Sequence of sequences of Python data.  With the native async transport this may also be an
+            async iterable of such batches, which are streamed to the server as a single insert
         :param column_names: Ordered list of column names or '*' if column types should be retrieved from the
             ClickHouse table definition
         :param database: Target database -- will use client default database if not specified.
@@ -572,6 +744,26 @@ class AsyncClient:
         :param transport_settings: Optional dictionary of transport level settings (HTTP headers, etc.)
         :return: QuerySummary with summary information, throws exception if insert fails
         """
+        if hasattr(data, '__aiter__'):
+            if not self.transport:
+                raise ProgrammingError('Inserting from an async iterable requires the native async transport')
+        elif self.transport:
+            if (context is None or context.empty) and data is None:
+                raise ProgrammingError('No data specified for insert') from None
+        if self.transport:
+            if context is None:
+                context = await self.create_insert_context(table, column_names, database, column_types,
+                                                           column_type_names, column_oriented, settings,
+                                                           transport_settings=transport_settings)
+            if hasattr(data, '__aiter__'):
+                if not context.empty:
+                    raise ProgrammingError('Attempting to insert new data with non-empty insert context') from None
+                return await self.transport.data_insert(context, data)
+            if data is not None:
+                if not context.empty:
+                    raise ProgrammingError('Attempting to insert new data with non-empty insert context') from None
+                context.data = data
+            return await self.transport.data_insert(context)
 
         def _insert():
             return self.client.insert(table=table, data=data, column_names=column_names, database=database,
@@ -609,6 +801,16 @@ class AsyncClient:
         :param transport_settings: Optional dictionary of transport level settings (HTTP headers, etc.)
         :return: QuerySummary with summary information, throws exception if insert fails
         """
+        if self.transport:
+            check_pandas()
+            if context is None:
+                if column_names is None:
+                    column_names = df.columns
+                elif len(column_names) != len(df.columns):
+                    raise ProgrammingError('DataFrame column count does not match insert_columns') from None
+            return await self.insert(table, df, column_names, database, column_types=column_types,
+                                     column_type_names=column_type_names, settings=settings,
+                                     transport_settings=transport_settings, context=context)
 
         def _insert_df():
             return self.client.insert_df(table=table, df=df, database=database, settings=settings,
@@ -620,6 +822,53 @@ class AsyncClient:
         result = await loop.run_in_executor(self.executor, _insert_df)
         return result
 
+    async def insert_pl(self, table: str = None,
+                        df=None,
+                        database: Optional[str] = None,
+                        settings: Optional[Dict] = None,
+                        column_names: Optional[Sequence[str]] = None,
+                        column_types: Sequence[TimeplusType] = None,
+                        column_type_names: Sequence[str] = None,
+                        context: InsertContext = None,
+                        transport_settings: Optional[Dict[str, str]] = None) -> QuerySummary:
+        """
+        Insert a Polars DataFrame into ClickHouse.  If context is specified arguments other than df are ignored
+        :param table: ClickHouse table
+        :param df: Polars DataFrame
+        :param database: Optional ClickHouse database
+        :param settings: Optional dictionary of ClickHouse settings (key/string values)
+        :param column_names: An optional list of ClickHouse column names.  If not set, the DataFrame column names
+           will be used
+        :param column_types: ClickHouse column types.  If set then column data does not need to be retrieved from
+            the server
+        :param column_type_names: ClickHouse column type names.  If set then column data does not need to be
+            retrieved from the server
+        :param context: Optional reusable insert context to allow repeated inserts into the same table with
+            different data batches
+        :param transport_settings: Optional dictionary of transport level settings (HTTP headers, etc.)
+        :return: QuerySummary with summary information, throws exception if insert fails
+        """
+        if self.transport:
+            check_polars()
+            if context is None:
+                if column_names is None:
+                    column_names = df.columns
+                elif len(column_names) != len(df.columns):
+                    raise ProgrammingError('DataFrame column count does not match insert_columns') from None
+            return await self.insert(table, df, column_names, database, column_types=column_types,
+                                     column_type_names=column_type_names, settings=settings,
+                                     transport_settings=transport_settings, context=context)
+
+        def _insert_pl():
+            return self.client.insert_pl(table=table, df=df, database=database, settings=settings,
+                                         column_names=column_names,
+                                         column_types=column_types, column_type_names=column_type_names,
+                                         context=context, transport_settings=transport_settings)
+
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.executor, _insert_pl)
+        return result
+
     async def insert_arrow(self, table: str,
                            arrow_table, database: str = None,
                            settings: Optional[Dict] = None,
@@ -668,6 +917,13 @@ class AsyncClient:
         :param transport_settings: Optional dictionary of transport level settings (HTTP headers, etc.)
         :return: Reusable insert context
         """
+        if self.transport:
+            full_table = full_table_name(table, database)
+            column_defs = []
+            if column_types is None and column_type_names is None:
+                column_defs = insert_column_defs(await self.query(f'DESCRIBE {full_table}'))
+            return build_insert_context(table, full_table, column_defs, column_names, column_types,
+                                        column_type_names, column_oriented, settings, data, transport_settings)
 
         def _create_insert_context():
             return self.client.create_insert_context(table=table, column_names=column_names, database=database,
@@ -685,6 +941,8 @@ class AsyncClient:
         :context: InsertContext parameter object
         :return: No return, throws an exception if the insert fails
         """
+        if self.transport:
+            return await self.transport.data_insert(context)
 
         def _data_insert():
             return self.client.data_insert(context=context)
@@ -710,6 +968,10 @@ class AsyncClient:
         :param transport_settings: Optional dictionary of transport level settings (HTTP headers, etc.)
         :param fmt: Valid clickhouse format
         """
+        if self.transport:
+            return await self.transport.raw_insert(table=table, column_names=column_names, insert_block=insert_block,
+                                                   settings=settings, fmt=fmt, compression=compression,
+                                                   transport_settings=transport_settings)
 
         def _raw_insert():
             return self.client.raw_insert(table=table, column_names=column_names, insert_block=insert_block,
@@ -720,6 +982,17 @@ class AsyncClient:
         result = await loop.run_in_executor(self.executor, _raw_insert)
         return result
 
+    async def _transport_query(self, lcls: dict, **overrides):
+        kwargs = lcls.copy()
+        kwargs.pop('self')
+        kwargs.update(overrides)
+        return await self.transport.query(self.client.create_query_context(**kwargs))
+
+    async def _transport_stream(self, lcls: dict, stream_type: str) -> AsyncStreamContext:
+        kwargs = lcls.copy()
+        kwargs.pop('self')
+        return await self.transport.query_stream(self.client.create_query_context(**kwargs), stream_type)
+
     async def __aenter__(self) -> "AsyncClient":
         return self
 
@@ -0,0 +1,674 @@
+import asyncio
+import logging
+import ssl
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Executor
+from typing import Optional, Dict, Any, Sequence, Union, Callable, AsyncIterator, AsyncIterable, Iterable, \
+    Iterator
+from urllib.parse import urlencode, urlsplit
+
+import certifi
+import lz4.frame
+import zstandard
+from urllib3.filepost import encode_multipart_formdata
+
+from timeplus_connect import common
+from timeplus_connect.driver.common import dict_copy, AsyncStreamContext, async_read_ahead
+from timeplus_connect.driver.compression import brotli, Compressor
+from timeplus_connect.driver.exceptions import DatabaseError, OperationalError, ProgrammingError
+from timeplus_connect.driver.external import ExternalData
+from timeplus_connect.driver.httpclient import HttpClient
+from timeplus_connect.driver.httpcommon import ex_header, query_params, columns_only, columns_only_result, query_body, \
+    insert_request, take_insert_exception, raw_insert_request, command_request, command_result
+from timeplus_connect.driver.insert import InsertContext
+from timeplus_connect.driver.npquery import NumpyResult
+from timeplus_connect.driver.query import QueryContext, QueryResult
+from timeplus_connect.driver.summary import QuerySummary
+from timeplus_connect.driver.transform import AsyncBlockReader, NativeTransform
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IDLE_TIMEOUT = 30
+_CHUNK_SIZE = 1 << 20
+_NO_BODY_STATUS = (204, 304)
+
+
+def get_ssl_context(verify: bool = True,
+                    ca_cert: Optional[str] = None,
+                    client_cert: Optional[str] = None,
+                    client_cert_key: Optional[str] = None) -> ssl.SSLContext:
+    """
+    Build an SSL context equivalent to the urllib3 PoolManager options used by the synchronous HttpClient
+    """
+    if ca_cert == 'certifi':
+        ca_cert = certifi.where()
+    context = ssl.create_default_context(cafile=ca_cert if verify else None)
+    if not verify:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    if client_cert:
+        context.load_cert_chain(client_cert, client_cert_key)
+    return context
+
+
+def _content_decompressor(encoding: Optional[str]) -> Optional[Callable[[bytes], bytes]]:
+    if not encoding:
+        return None
+    if encoding == 'zstd':
+        return zstandard.ZstdDecompressor().decompressobj().decompress
+    if encoding == 'lz4':
+        lz4_decom = lz4.frame.LZ4FrameDecompressor()
+
+        def lz_decompress(data: bytes) -> bytes:
+            nonlocal lz4_decom
+            output = lz4_decom.decompress(data)
+            while lz4_decom.eof and lz4_decom.unused_data:
+                data = lz4_decom.unused_data
+                lz4_decom = lz4.frame.LZ4FrameDecompressor()
+                output += lz4_decom.decompress(data)
+            return output
+
+        return lz_decompress
+    if encoding == 'gzip':
+        return zlib.decompressobj(16 + zlib.MAX_WBITS).decompress
+    if encoding == 'deflate':
+        return zlib.decompressobj().decompress
+    if encoding == 'br' and brotli:
+        return brotli.Decompressor().process
+    raise OperationalError(f'Unrecognized response content encoding {encoding}')
+
+
+class AsyncConnection:
+    __slots__ = 'reader', 'writer', 'last_used'
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.monotonic()
+
+    def close(self):
+        self.writer.close()
+
+
+class AsyncHttpResponse:
+    """
+    HTTP/1.1 response read from an asyncio stream.  The connection is returned to its pool once the body is
+    completely read, and is otherwise closed with the response
+    """
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(self,
+                 pool: 'AsyncConnectionPool',
+                 conn: AsyncConnection,
+                 status: int,
+                 headers: Dict[str, str],
+                 keep_alive: bool,
+                 has_body: bool):
+        self.status = status
+        self.headers = headers
+        self._pool = pool
+        self._conn = conn
+        self._chunked = 'chunked' in headers.get('transfer-encoding', '').lower()
+        length = headers.get('content-length')
+        self._remaining = int(length) if length is not None and not self._chunked else None
+        self._keep_alive = keep_alive and (self._chunked or self._remaining is not None)
+        if not has_body:
+            self._remaining = 0
+            self._chunked = False
+        if self._remaining == 0:
+            self._finish()
+
+    async def _read(self, coro):
+        return await asyncio.wait_for(coro, self._pool.read_timeout)
+
+    async def iter_raw(self, chunk_size: int = _CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """
+        :return: Async generator of the (still compressed) response body chunks
+        """
+        reader = self._conn.reader if self._conn else None
+        try:
+            while self._conn:
+                if self._chunked:
+                    size_line = await self._read(reader.readline())
+                    if not size_line:
+                        raise OperationalError('Connection closed before end of chunked response')
+                    size = int(size_line.split(b';', 1)[0], 16)
+                    if size == 0:
+                        while (await self._read(reader.readline())) not in (b'\r\n', b'\n', b''):
+                            pass
+                        self._finish()
+                        return
+                    chunk = await self._read(reader.readexactly(size))
+                    await self._read(reader.readline())
+                elif self._remaining is not None:
+                    chunk = await self._read(reader.read(min(chunk_size, self._remaining)))
+                    if not chunk:
+                        raise OperationalError('Connection closed before end of response')
+                    self._remaining -= len(chunk)
+                    if self._remaining == 0:
+                        self._finish()
+                else:
+                    chunk = await self._read(reader.read(chunk_size))
+                    if not chunk:
+                        self._finish()
+                        return
+                yield chunk
+        except asyncio.IncompleteReadError as ex:
+            raise OperationalError('Connection closed before end of response') from ex
+
+    async def iter_content(self, chunk_size: int = _CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """
+        :return: Async generator of the response body chunks, decompressed based on the Content-Encoding header
+        """
+        decompress = _content_decompressor(self.headers.get('content-encoding'))
+        async for chunk in self.iter_raw(chunk_size):
+            if decompress:
+                chunk = decompress(chunk)
+            if chunk:
+                yield chunk
+
+    async def read(self) -> bytes:
+        """
+        :return: The complete decompressed response body
+        """
+        output = bytearray()
+        async for chunk in self.iter_content():
+            output += chunk
+        return bytes(output)
+
+    def _finish(self):
+        conn = self._conn
+        self._conn = None
+        if conn:
+            if self._keep_alive:
+                self._pool.release(conn)
+            else:
+                conn.close()
+
+    async def close(self):
+        # An unread body can be arbitrarily large, so the connection is closed instead of drained
+        conn = self._conn
+        self._conn = None
+        if conn:
+            conn.close()
+
+
+# pylint: disable=too-many-instance-attributes
+class AsyncConnectionPool:
+    """
+    Keep-alive pool of asyncio stream connections to a single HTTP endpoint
+    """
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(self,
+                 host: str,
+                 port: int,
+                 ssl_context: Optional[ssl.SSLContext] = None,
+                 server_hostname: Optional[str] = None,
+                 maxsize: int = 16,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 connect_timeout: Optional[float] = None,
+                 read_timeout: Optional[float] = None):
+        self.host = host
+        self.port = port
+        self.ssl_context = ssl_context
+        self.server_hostname = server_hostname if ssl_context else None
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._idle = deque()
+
+    async def _connect(self) -> AsyncConnection:
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port, ssl=self.ssl_context,
+                                        server_hostname=self.server_hostname, limit=1 << 20),
+                self.connect_timeout)
+        except (OSError, asyncio.TimeoutError) as ex:
+            raise OperationalError(f'Unable to connect to {self.host}:{self.port}: {ex}') from ex
+        return AsyncConnection(reader, writer)
+
+    def _acquire_idle(self) -> Optional[AsyncConnection]:
+        now = time.monotonic()
+        while self._idle:
+            conn = self._idle.pop()
+            if now - conn.last_used < self.idle_timeout and not conn.reader.at_eof():
+                return conn
+            conn.close()
+        return None
+
+    def release(self, conn: AsyncConnection):
+        if len(self._idle) >= self.maxsize or conn.writer.is_closing():
+            conn.close()
+            return
+        conn.last_used = time.monotonic()
+        self._idle.append(conn)
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    async def request(self,
+                      method: str,
+                      target: str,
+                      headers: Dict[str, str],
+                      body: Union[None, bytes, Iterable[bytes], AsyncIterable[bytes]] = None) -> AsyncHttpResponse:
+        """
+        Send an HTTP/1.1 request and read the response status and headers.  A request on a reused keep-alive
+        connection that fails before any response is received is retried once on a new connection if the body
+        can be sent again
+        :param method: HTTP method
+        :param target: Request path and query string
+        :param headers: Request headers
+        :param body: Request body, either bytes or a sync or async iterable of bytes sent with chunked encoding
+        :return: AsyncHttpResponse with the body still to be read
+        """
+        while True:
+            conn = self._acquire_idle()
+            reused = conn is not None
+            if not reused:
+                conn = await self._connect()
+            try:
+                await self._send(conn, method, target, headers, body)
+                return await self._read_head(conn, method)
+            except (OSError, asyncio.IncompleteReadError, EOFError) as ex:
+                conn.close()
+                if reused and (body is None or isinstance(body, (bytes, bytearray))):
+                    logger.debug('Retrying remotely closed connection')
+                    continue
+                raise OperationalError(f'Error {ex} executing HTTP request to {self.host}:{self.port}') from ex
+            except BaseException:
+                conn.close()
+                raise
+
+    async def _send(self, conn: AsyncConnection, method: str, target: str, headers: Dict[str, str], body):
+        lines = [f'{method} {target} HTTP/1.1']
+        if 'host' not in (key.lower() for key in headers):
+            lines.append(f'Host: {self.server_hostname or self.host}:{self.port}')
+        lines.extend(f'{key}: {value}' for key, value in headers.items())
+        streaming = body is not None and not isinstance(body, (bytes, bytearray))
+        if streaming:
+            lines.append('Transfer-Encoding: chunked')
+        elif body or method != 'GET':
+            lines.append(f'Content-Length: {len(body) if body else 0}')
+        writer = conn.writer
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if not streaming:
+            if body:
+                writer.write(body)
+            await writer.drain()
+            return
+        if hasattr(body, '__aiter__'):
+            async for chunk in body:
+                await self._write_chunk(writer, chunk)
+        else:
+            for chunk in body:
+                await self._write_chunk(writer, chunk)
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
+
+    @staticmethod
+    async def _write_chunk(writer: asyncio.StreamWriter, chunk: bytes):
+        if chunk:
+            writer.write(f'{len(chunk):x}\r\n'.encode())
+            writer.write(chunk)
+            writer.write(b'\r\n')
+            await writer.drain()
+
+    async def _read_head(self, conn: AsyncConnection, method: str) -> AsyncHttpResponse:
+        reader = conn.reader
+        while True:
+            status_line = await asyncio.wait_for(reader.readline(), self.read_timeout)
+            if not status_line:
+                raise EOFError('Connection closed without response')
+            parts = status_line.decode('latin-1').split(None, 2)
+            try:
+                version, status = parts[0], int(parts[1])
+            except (IndexError, ValueError):
+                raise OperationalError(f'Invalid HTTP status line {status_line!r}') from None
+            headers = {}
+            while True:
+                line = await asyncio.wait_for(reader.readline(), self.read_timeout)
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                key, _, value = line.decode('latin-1').partition(':')
+                headers[key.strip().lower()] = value.strip()
+            if status != 100:
+                break
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        has_body = method != 'HEAD' and status not in _NO_BODY_STATUS
+        return AsyncHttpResponse(self, conn, status, headers, keep_alive, has_body)
+
+    async def close(self):
+        while self._idle:
+            self._idle.pop().close()
+
+
+class AsyncHttpTransport:
+    """
+    Native asyncio replacement for the executor based AsyncClient calls.  Requests are built from the settings
+    of a synchronous HttpClient, sent over a dedicated pool of asyncio connections, and responses are decoded
+    with the same Native format transform used by the HttpClient
+    """
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(self,
+                 client: HttpClient,
+                 ssl_context: Optional[ssl.SSLContext] = None,
+                 pool_size: int = 16,
+                 executor: Optional[Executor] = None):
+        """
+        :param client: HttpClient supplying the endpoint, credentials, settings and compression
+        :param ssl_context: SSL context for https endpoints.  A default verifying context is used if not set
+        :param pool_size: Maximum number of idle keep-alive connections
+        :param executor: Executor used to decode response blocks and encode insert blocks off the event loop.  If
+          not set, response blocks are decoded on the event loop thread and insert blocks are encoded on the event
+          loop default executor
+        """
+        self.client = client
+        self.executor = executor
+        url = urlsplit(client.url)
+        if url.scheme == 'https' and ssl_context is None:
+            ssl_context = get_ssl_context()
+        self.path = url.path or '/'
+        timeout = client.timeout
+        self.pool = AsyncConnectionPool(url.hostname,
+                                        url.port or (443 if url.scheme == 'https' else 80),
+                                        ssl_context if url.scheme == 'https' else None,
+                                        server_hostname=client.server_host_name or url.hostname,
+                                        maxsize=pool_size,
+                                        connect_timeout=timeout.connect_timeout,
+                                        read_timeout=timeout.read_timeout)
+
+    # pylint: disable=protected-access
+    async def _error_handler(self, response: AsyncHttpResponse, retried: bool = False):
+        err_content = None
+        if self.client.show_clickhouse_errors:
+            try:
+                err_content = await response.read()
+            except Exception:  # pylint: disable=broad-except
+                err_content = None
+        await response.close()
+        err_str = self.client._error_message(response.status, response.headers, err_content)
+        raise OperationalError(err_str) if retried else DatabaseError(err_str) from None
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-branches,too-many-locals
+    async def _raw_request(self,
+                           data,
+                           params: Dict[str, str],
+                           headers: Optional[Dict[str, Any]] = None,
+                           method: str = 'POST',
+                           retries: int = 0,
+                           server_wait: bool = True,
+                           fields: Optional[Dict[str, tuple]] = None,
+                           error_handler: Callable = None) -> AsyncHttpResponse:
+        client = self.client
+        if isinstance(data, str):
+            data = data.encode()
+        headers = dict_copy(client.headers, headers)
+        if client.server_host_name:
+            headers['Host'] = client.server_host_name
+        if fields:
+            data, content_type = encode_multipart_formdata(fields)
+            headers['Content-Type'] = content_type
+        final_params = client._request_params(params, server_wait)
+        target = f'{self.path}?{urlencode(final_params)}'
+        query_session = final_params.get('session_id')
+        attempts = 0
+        while True:
+            attempts += 1
+            if query_session:
+                if query_session == client._active_session:
+                    raise ProgrammingError('Attempt to execute concurrent queries within the same session.' +
+                                           'Please use a separate client instance per task.')
+                client._active_session = query_session
+            try:
+                response = await self.pool.request(method, target, headers, data)
+            except asyncio.TimeoutError as ex:
+                err_url = f' ({client.url})' if client.show_clickhouse_errors else ''
+                raise OperationalError(f'Timeout executing HTTP request attempt {attempts}{err_url}') from ex
+            finally:
+                if query_session:
+                    client._active_session = None
+            if 200 <= response.status < 300 and not response.headers.get(ex_header):
+                return response
+            if response.status in (429, 503, 504):
+                if attempts > retries:
+                    await self._error_handler(response, True)
+                await response.close()
+                logger.debug('Retrying requests with status code %d', response.status)
+            elif error_handler:
+                await error_handler(response)
+            else:
+                await self._error_handler(response)
+
+    async def _query_response(self, context: QueryContext) -> Union[QueryResult, AsyncHttpResponse]:
+        client = self.client
+        headers = {}
+        params = query_params(client, context)
+        if columns_only(context):
+            response = await self._raw_request(f'{context.final_query}\n FORMAT JSON',
+                                               params, headers, retries=client.query_retries)
+            return columns_only_result(await response.read())
+        body, fields = query_body(client, context, params, headers)
+        response = await self._raw_request(body,
+                                           params,
+                                           dict_copy(headers, context.transport_settings),
+                                           retries=client.query_retries,
+                                           fields=fields,
+                                           server_wait=not context.streaming)
+        context.set_response_tz(client._check_tz_change(response.headers.get('x-timeplus-timezone')))
+        return response
+
+    async def query(self, context: QueryContext) -> Union[QueryResult, NumpyResult]:
+        """
+        Execute a query and read the complete result
+        :param context: QueryContext built by the client create_query_context method
+        :return: QueryResult or NumpyResult with all blocks already decoded
+        """
+        if context.is_command:
+            response = await self.command(context.query,
+                                          parameters=context.parameters,
+                                          settings=context.settings,
+                                          external_data=context.external_data,
+                                          transport_settings=context.transport_settings)
+            if isinstance(response, QuerySummary):
+                return response.as_query_result()
+            return QueryResult([response] if isinstance(response, list) else [[response]])
+        response = await self._query_response(context)
+        if not isinstance(response, AsyncHttpResponse):
+            return response
+        reader = AsyncBlockReader(response.iter_content(), context, self.executor)
+        blocks = []
+        try:
+            while True:
+                block = await reader.next_block()
+                if block is None:
+                    break
+                blocks.append(block)
+        finally:
+            context.lc_dictionaries.clear()
+            await response.close()
+        result = self._build_result(context, reader, (block for block in blocks))
+        result.summary = self.client._summary(response)
+        return result
+
+    async def query_stream(self, context: QueryContext, stream_type: str = 'block') -> AsyncStreamContext:
+        """
+        Execute a query and return an async stream of the result
+        :param context: QueryContext built by the client create_query_context method
+        :param stream_type: 'block' for column oriented blocks, 'row_block' for blocks of rows, or 'rows' for
+          individual rows
+        :return: AsyncStreamContext for use with `async with` and `async for`
+        """
+        context.streaming = True
+        response = await self._query_response(context)
+        if not isinstance(response, AsyncHttpResponse):
+            return AsyncStreamContext(_EmptySource(), _empty_async_gen())
+        reader = AsyncBlockReader(response.iter_content(), context, self.executor)
+
+        async def stream():
+            try:
+                while True:
+                    block = await reader.next_block()
+                    if block is None:
+                        return
+                    if stream_type == 'block':
+                        yield block
+                    elif stream_type == 'row_block':
+                        yield list(zip(*block))
+                    else:
+                        for row in zip(*block):
+                            yield row
+            finally:
+                context.lc_dictionaries.clear()
+
+        return AsyncStreamContext(response, async_read_ahead(stream(), common.get_setting('async_read_ahead')))
+
+    @staticmethod
+    def _build_result(context: QueryContext, reader: AsyncBlockReader, block_gen):
+        names, col_types = tuple(reader.names), tuple(reader.col_types)
+        if context.use_numpy:
+            first_block = next(block_gen, None)
+            if first_block is None:
+                return NumpyResult()
+            res_types = [col.dtype if hasattr(col, 'dtype') else 'O' for col in first_block]
+
+            def gen():
+                yield first_block
+                yield from block_gen
+
+            return NumpyResult(gen(), names, col_types, res_types)
+        return QueryResult(None, block_gen, names, col_types, context.column_oriented)
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    async def command(self,
+                      cmd,
+                      parameters: Optional[Union[Sequence, Dict[str, Any]]] = None,
+                      data: Union[str, bytes] = None,
+                      settings: Optional[Dict] = None,
+                      use_database: int = True,
+                      external_data: Optional[ExternalData] = None,
+                      transport_settings: Optional[Dict[str, str]] = None) -> Union[str, int, Sequence[str],
+                                                                                    QuerySummary]:
+        """
+        See HttpClient command method
+        """
+        payload, params, headers, method, fields = command_request(self.client, cmd, parameters, data, settings,
+                                                                   use_database, external_data, transport_settings)
+        response = await self._raw_request(payload, params, headers, method, fields=fields, server_wait=False)
+        return command_result(await response.read(), self.client._summary(response))
+
+    async def data_insert(self,
+                          context: InsertContext,
+                          batches: Optional[AsyncIterable[Any]] = None) -> QuerySummary:
+        """
+        Insert the data of an InsertContext.  If batches is set, each batch produced by the async iterable is
+        assigned to the context data in turn, and all batches are streamed to the server in a single request
+        :param context: InsertContext with the table and column definitions
+        :param batches: Optional async iterable of column or row oriented data batches
+        :return: QuerySummary with summary information, throws exception if insert fails
+        """
+        client = self.client
+        if batches is None and context.empty:
+            logger.debug('No data included in insert, skipping')
+            return QuerySummary()
+
+        async def error_handler(resp: AsyncHttpResponse):
+            ex = take_insert_exception(context)
+            if ex:
+                await resp.close()
+                raise ex
+            await self._error_handler(resp)
+
+        params, headers = insert_request(client, context)
+        compressor = client.insert_compressor(context.compression)
+        if batches is None:
+            body = _executor_chunks(NativeTransform.build_insert(context, compressor, True), self.executor)
+        else:
+            body = _batch_insert_gen(context, batches, compressor, self.executor)
+        response = await self._raw_request(body, params, headers, error_handler=error_handler, server_wait=False)
+        await response.read()
+        logger.debug('Context insert response code: %d', response.status)
+        context.data = None
+        return QuerySummary(client._summary(response))
+
+    async def raw_query(self, query: str,
+                        parameters: Optional[Union[Sequence, Dict[str, Any]]] = None,
+                        settings: Optional[Dict[str, Any]] = None,
+                        fmt: str = None,
+                        use_database: bool = True,
+                        external_data: Optional[ExternalData] = None,
+                        transport_settings: Optional[Dict[str, str]] = None) -> bytes:
+        """
+        See HttpClient raw_query method
+        """
+        body, params, fields = self.client._prep_raw_query(query, parameters, settings, fmt, use_database,
+                                                           external_data)
+        response = await self._raw_request(body, params, fields=fields, headers=transport_settings)
+        return await response.read()
+
+    async def raw_insert(self, table: str = None,
+                         column_names: Optional[Sequence[str]] = None,
+                         insert_block: Union[str, bytes, Iterable[bytes], AsyncIterable[bytes]] = None,
+                         settings: Optional[Dict] = None,
+                         fmt: Optional[str] = None,
+                         compression: Optional[str] = None,
+                         transport_settings: Optional[Dict[str, str]] = None) -> QuerySummary:
+        """
+        See HttpClient raw_insert method.  The insert_block may also be an async iterable of bytes
+        """
+        insert_block, params, headers = raw_insert_request(self.client, table, column_names, insert_block, settings,
+                                                           fmt, compression, transport_settings)
+        response = await self._raw_request(insert_block, params, headers, server_wait=False)
+        await response.read()
+        logger.debug('Raw insert response code: %d', response.status)
+        return QuerySummary(self.client._summary(response))
+
+    async def close(self):
+        await self.pool.close()
+
+
+async def _executor_chunks(chunks: Iterator[bytes], executor: Optional[Executor]) -> AsyncIterator[bytes]:
+    # Encoding and compressing insert blocks is CPU bound, so each chunk is produced on the executor (or the event
+    # loop default executor) instead of the event loop thread
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(executor, next, chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+async def _batch_insert_gen(context: InsertContext, batches: AsyncIterable[Any],
+                            compressor: Compressor, executor: Optional[Executor]) -> AsyncIterator[bytes]:
+    # All batches share one compressor so that streaming compression formats produce a single valid stream
+    loop = asyncio.get_running_loop()
+    first = True
+    async for batch in batches:
+        # Assigning the data converts DataFrames and other columnar batches, so it also runs on the executor
+        await loop.run_in_executor(executor, setattr, context, 'data', batch)
+        if context.empty:
+            continue
+        if not first:
+            context.current_block = 1  # Only the first block includes the INSERT statement prefix
+        first = False
+        async for chunk in _executor_chunks(NativeTransform.build_insert(context, compressor), executor):
+            yield chunk
+        if context.insert_exception:
+            return
+    if first:
+        raise ProgrammingError('No data specified for insert') from None
+    footer = compressor.flush()
+    if footer:
+        yield footer
+
+
+class _EmptySource:
+    async def close(self):
+        pass
+
+
+async def _empty_async_gen():
+    for item in ():
+        yield item
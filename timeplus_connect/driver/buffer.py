@@ -1,9 +1,9 @@
 import sys
 import array
-from typing import Any, Iterable
+from typing import Any, Iterable, Tuple
 
 from timeplus_connect.driver.exceptions import StreamCompleteException
-from timeplus_connect.driver.types import ByteSource
+from timeplus_connect.driver.types import ByteSource, VIEW_CHUNK_FRACTION
 
 must_swap = sys.byteorder == 'big'
 
@@ -42,6 +42,13 @@ class ResponseBuffer(ByteSource):
                 self.buf_loc = tail
         return bridge
 
+    def read_view(self, sz: int):
+        if self.buf_loc + sz <= self.buf_sz and sz * VIEW_CHUNK_FRACTION >= self.buf_sz:
+            # Zero copy view into the current chunk, which remains referenced by the view
+            self.buf_loc += sz
+            return memoryview(self.buffer)[self.buf_loc - sz: self.buf_loc]
+        return self.read_bytes(sz)
+
     def read_byte(self) -> int:
         if self.buf_loc < self.buf_sz:
             self.buf_loc += 1
@@ -104,6 +111,41 @@ class ResponseBuffer(ByteSource):
                 app(x)
         return column
 
+    def read_str_col_raw(self, num_rows: int) -> bytes:
+        output = bytearray()
+        app = output.append
+        for _ in range(num_rows):
+            sz = 0
+            shift = 0
+            while True:
+                b = self.read_byte()
+                app(b)
+                sz += ((b & 0x7f) << shift)
+                if (b & 0x80) == 0:
+                    break
+                shift += 7
+            output += self.read_bytes(sz)
+        return output
+
+    def read_str_col_offsets(self, num_rows: int) -> Tuple[array.array, bytes]:
+        offsets = array.array('q', [0])
+        app = offsets.append
+        output = bytearray()
+        for _ in range(num_rows):
+            sz = 0
+            shift = 0
+            while True:
+                b = self.read_byte()
+                sz += ((b & 0x7f) << shift)
+                if (b & 0x80) == 0:
+                    break
+                shift += 7
+            output += self.read_bytes(sz)
+            app(len(output))
+        if must_swap:
+            offsets.byteswap()
+        return offsets, bytes(output)
+
     def read_bytes_col(self, sz: int, num_rows: int) -> Iterable[bytes]:
         source = self.read_bytes(sz * num_rows)
         return [bytes(source[x:x+sz]) for x in range(0, sz * num_rows, sz)]
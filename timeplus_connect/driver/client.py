@@ -1,6 +1,6 @@
 import io
 import logging
-from datetime import tzinfo
+from datetime import datetime, tzinfo
 
 import pytz
 
@@ -19,11 +19,11 @@ from timeplus_connect.driver.constants import CH_VERSION_WITH_PROTOCOL, PROTOCOL
 from timeplus_connect.driver.exceptions import ProgrammingError, OperationalError
 from timeplus_connect.driver.external import ExternalData
 from timeplus_connect.driver.insert import InsertContext
-from timeplus_connect.driver.options import check_arrow, check_pandas, check_numpy
+from timeplus_connect.driver.options import check_arrow, check_pandas, check_numpy, check_polars
+from timeplus_connect.driver.parallel import partitioned_query
 from timeplus_connect.driver.summary import QuerySummary
-from timeplus_connect.driver.models import ColumnDef, SettingDef, SettingStatus
+from timeplus_connect.driver.models import SettingDef, SettingStatus, full_table_name, insert_column_defs, build_insert_context
 from timeplus_connect.driver.query import QueryResult, to_arrow, to_arrow_batches, QueryContext, arrow_buffer
-from timeplus_connect.driver.binding import quote_identifier
 
 io.DEFAULT_BUFFER_SIZE = 1024 * 256
 logger = logging.getLogger(__name__)
@@ -451,7 +451,8 @@ class Client(ABC):
                              as_pandas: bool = False,
                              external_data: Optional[ExternalData] = None,
                              use_extended_dtypes: Optional[bool] = None,
-                             transport_settings: Optional[Dict[str, str]] = None) -> QueryContext:
+                             transport_settings: Optional[Dict[str, str]] = None,
+                             as_arrow: bool = False) -> QueryContext:
         """
         Creates or updates a reusable QueryContext object
         :param query: Query statement/format string
@@ -482,6 +483,7 @@ class Client(ABC):
           pandas.NA and pandas.NaT for ClickHouse NULL values, as well as extended Pandas dtypes such as IntegerArray
           and StringArray.  Defaulted to True for query_df methods
         :param transport_settings: Optional dictionary of transport level settings (HTTP headers, etc.)
+        :param as_arrow Decode the Native format response directly into PyArrow arrays
         :return: Reusable QueryContext
         """
         if context:
@@ -502,7 +504,8 @@ class Client(ABC):
                                         use_extended_dtypes=use_extended_dtypes,
                                         streaming=streaming,
                                         external_data=external_data,
-                                        transport_settings=transport_settings)
+                                        transport_settings=transport_settings,
+                                        as_arrow=as_arrow)
         if use_numpy and max_str_len is None:
             max_str_len = 0
         if use_extended_dtypes is None:
@@ -527,7 +530,8 @@ class Client(ABC):
                             streaming=streaming,
                             apply_server_tz=self.apply_server_timezone,
                             external_data=external_data,
-                            transport_settings=transport_settings)
+                            transport_settings=transport_settings,
+                            as_arrow=as_arrow)
 
     def query_arrow(self,
                     query: str,
@@ -535,7 +539,8 @@ class Client(ABC):
                     settings: Optional[Dict[str, Any]] = None,
                     use_strings: Optional[bool] = None,
                     external_data: Optional[ExternalData] = None,
-                    transport_settings: Optional[Dict[str, str]] = None):
+                    transport_settings: Optional[Dict[str, str]] = None,
+                    use_native: bool = False):
         """
         Query method using the ClickHouse Arrow format to return a PyArrow table
         :param query: Query statement/format string
@@ -544,9 +549,14 @@ class Client(ABC):
         :param use_strings: Convert ClickHouse String type to Arrow string type (instead of binary)
         :param external_data: ClickHouse "external data" to send with query
         :param transport_settings: Optional dictionary of transport level settings (HTTP headers, etc.)
+        :param use_native: Query in the Native format and decode the response directly into Arrow arrays, instead of
+          using the server Arrow format
         :return: PyArrow.Table
         """
         check_arrow()
+        if use_native:
+            return self._native_arrow_query(query, parameters, settings, use_strings,
+                                            external_data, transport_settings).arrow_result
         settings = self._update_arrow_settings(settings, use_strings)
         return to_arrow(self.raw_query(query,
                                        parameters,
@@ -561,7 +571,8 @@ class Client(ABC):
                            settings: Optional[Dict[str, Any]] = None,
                            use_strings: Optional[bool] = None,
                            external_data: Optional[ExternalData] = None,
-                           transport_settings: Optional[Dict[str, str]] = None) -> StreamContext:
+                           transport_settings: Optional[Dict[str, str]] = None,
+                           use_native: bool = False) -> StreamContext:
         """
         Query method that returns the results as a stream of Arrow tables
         :param query: Query statement/format string
@@ -570,9 +581,14 @@ class Client(ABC):
         :param use_strings: Convert ClickHouse String type to Arrow string type (instead of binary)
         :param external_data: ClickHouse "external data" to send with query
         :param transport_settings: Optional dictionary of transport level settings (HTTP headers, etc.)
+        :param use_native: Query in the Native format and decode each response block directly into an Arrow
+          RecordBatch, instead of using the server ArrowStream format
         :return: Generator that yields a PyArrow.Table for per block representing the result set
         """
         check_arrow()
+        if use_native:
+            return self._native_arrow_query(query, parameters, settings, use_strings,
+                                            external_data, transport_settings, True).arrow_stream
         settings = self._update_arrow_settings(settings, use_strings)
         return to_arrow_batches(self.raw_stream(query,
                                                 parameters,
@@ -581,6 +597,114 @@ class Client(ABC):
                                                 external_data=external_data,
                                                 transport_settings=transport_settings))
 
+    def query_pl(self,
+                 query: str,
+                 parameters: Optional[Union[Sequence, Dict[str, Any]]] = None,
+                 settings: Optional[Dict[str, Any]] = None,
+                 use_strings: Optional[bool] = None,
+                 external_data: Optional[ExternalData] = None,
+                 transport_settings: Optional[Dict[str, str]] = None):
+        """
+        Query method that returns the results as a Polars DataFrame.  The Native format response is decoded directly
+        into Arrow arrays, which the DataFrame shares without copying.  For parameters see query_arrow, except that
+        use_strings converts ClickHouse String type to Polars String type (instead of Binary)
+        :return: Polars DataFrame representing the result set
+        """
+        check_polars()
+        check_arrow()
+        return self._native_arrow_query(query, parameters, settings, use_strings,
+                                        external_data, transport_settings).pl_result
+
+    def query_pl_stream(self,
+                        query: str,
+                        parameters: Optional[Union[Sequence, Dict[str, Any]]] = None,
+                        settings: Optional[Dict[str, Any]] = None,
+                        use_strings: Optional[bool] = None,
+                        external_data: Optional[ExternalData] = None,
+                        transport_settings: Optional[Dict[str, str]] = None) -> StreamContext:
+        """
+        Query method that returns the results as a stream of Polars DataFrames.  For parameters see query_pl
+        :return: Generator that yields a Polars DataFrame per block representing the result set
+        """
+        check_polars()
+        check_arrow()
+        return self._native_arrow_query(query, parameters, settings, use_strings,
+                                        external_data, transport_settings, True).pl_stream
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def _native_arrow_query(self,
+                            query: str,
+                            parameters: Optional[Union[Sequence, Dict[str, Any]]],
+                            settings: Optional[Dict[str, Any]],
+                            use_strings: Optional[bool],
+                            external_data: Optional[ExternalData],
+                            transport_settings: Optional[Dict[str, str]],
+                            streaming: bool = False):
+        context = self.create_query_context(query=query,
+                                            parameters=parameters,
+                                            settings=settings,
+                                            query_formats={'String': 'bytes'} if use_strings is False else None,
+                                            streaming=streaming,
+                                            external_data=external_data,
+                                            transport_settings=transport_settings,
+                                            as_arrow=True)
+        return self._query_with_context(context)
+
+    def parallel_query(self,
+                       query: str,
+                       partitions: int = 4,
+                       fmt: str = 'df',
+                       shard_expression: Optional[str] = None,
+                       modulo_key: Optional[str] = None,
+                       time_range: Optional[Sequence[datetime]] = None,
+                       time_column: str = '_tp_time',
+                       max_workers: Optional[int] = None,
+                       parameters: Optional[Union[Sequence, Dict[str, Any]]] = None,
+                       settings: Optional[Dict[str, Any]] = None,
+                       transport_settings: Optional[Dict[str, str]] = None):
+        """
+        Split a query into disjoint partitions, run the partitions concurrently over separate connections, and
+        concatenate the results in partition order.  Each partition wraps the query as a subquery filtered by a
+        partition condition, so the query should not include FORMAT or SETTINGS clauses.  Since the partition
+        condition filters the query result, the query must select every column used by shard_expression, modulo_key
+        or time_column.  Exactly one of shard_expression, modulo_key, or time_range must be set.  Not supported for
+        clients with a session
+        :param query: Query statement/format string
+        :param partitions: Number of partitions
+        :param fmt: Result format -- 'np' (numpy array), 'df' (pandas DataFrame) or 'arrow' (PyArrow Table)
+        :param shard_expression: Expression that evaluates to the partition number (0 to partitions - 1) of each row
+        :param modulo_key: Integer expression whose absolute value modulo partitions is the partition number of each row
+        :param time_range: Start (inclusive) and end (exclusive) datetimes to split into equal time_column windows
+        :param time_column: Column filtered by time_range windows
+        :param max_workers: Maximum number of concurrent partition queries, defaults to the number of partitions
+        :param parameters: Optional dictionary used to format the query
+        :param settings: Optional dictionary of Timeplus settings (key/string values)
+        :param transport_settings: Optional dictionary of transport level settings (HTTP headers, etc.)
+        :return: Concatenated numpy array, DataFrame, or PyArrow Table
+        """
+        return partitioned_query(self, query, partitions, fmt, shard_expression, modulo_key, time_range, time_column,
+                                 max_workers, parameters, settings, transport_settings).result()
+
+    def parallel_query_stream(self,
+                              query: str,
+                              partitions: int = 4,
+                              fmt: str = 'df',
+                              shard_expression: Optional[str] = None,
+                              modulo_key: Optional[str] = None,
+                              time_range: Optional[Sequence[datetime]] = None,
+                              time_column: str = '_tp_time',
+                              max_workers: Optional[int] = None,
+                              parameters: Optional[Union[Sequence, Dict[str, Any]]] = None,
+                              settings: Optional[Dict[str, Any]] = None,
+                              transport_settings: Optional[Dict[str, str]] = None) -> StreamContext:
+        """
+        Streaming version of parallel_query.  Blocks from all partitions are yielded in the order they are
+        received, so the result is not ordered.  For parameters see parallel_query
+        :return: StreamContext yielding a numpy array, DataFrame or PyArrow Table per block
+        """
+        return partitioned_query(self, query, partitions, fmt, shard_expression, modulo_key, time_range, time_column,
+                                 max_workers, parameters, settings, transport_settings).stream()
+
     def _update_arrow_settings(self,
                                settings: Optional[Dict[str, Any]],
                                use_strings: Optional[bool]) -> Dict[str, Any]:
@@ -717,6 +841,36 @@ class Client(ABC):
                            transport_settings=transport_settings,
                            context=context)
 
+    def insert_pl(self, table: str = None,
+                  df=None,
+                  database: Optional[str] = None,
+                  settings: Optional[Dict] = None,
+                  column_names: Optional[Sequence[str]] = None,
+                  column_types: Sequence[TimeplusType] = None,
+                  column_type_names: Sequence[str] = None,
+                  context: InsertContext = None,
+                  transport_settings: Optional[Dict[str, str]] = None) -> QuerySummary:
+        """
+        Insert a Polars DataFrame into ClickHouse.  If context is specified arguments other than df are ignored.  For
+        parameters see insert_df, except that df is a Polars DataFrame
+        :return: QuerySummary with summary information, throws exception if insert fails
+        """
+        check_polars()
+        if context is None:
+            if column_names is None:
+                column_names = df.columns
+            elif len(column_names) != len(df.columns):
+                raise ProgrammingError('DataFrame column count does not match insert_columns') from None
+        return self.insert(table,
+                           df,
+                           column_names,
+                           database,
+                           column_types=column_types,
+                           column_type_names=column_type_names,
+                           settings=settings,
+                           transport_settings=transport_settings,
+                           context=context)
+
     def insert_arrow(self, table: str,
                      arrow_table,
                      database: str = None,
@@ -762,42 +916,12 @@ class Client(ABC):
         :param transport_settings: Optional dictionary of transport level settings (HTTP headers, etc.)
         :return: Reusable insert context
         """
-        full_table = table
-        if '.' not in table:
-            if database:
-                full_table = f'{quote_identifier(database)}.{quote_identifier(table)}'
-            else:
-                full_table = quote_identifier(table)
+        full_table = full_table_name(table, database)
         column_defs = []
         if column_types is None and column_type_names is None:
-            describe_result = self.query(f'DESCRIBE {full_table}')
-            column_defs = [ColumnDef(**row) for row in describe_result.named_results()
-                           if row['default_type'] not in ('ALIAS', 'MATERIALIZED')]
-        if column_names is None or isinstance(column_names, str) and column_names == '*':
-            column_names = [cd.name for cd in column_defs]
-            column_types = [cd.ch_type for cd in column_defs]
-        elif isinstance(column_names, str):
-            column_names = [column_names]
-        if len(column_names) == 0:
-            raise ValueError('Column names must be specified for insert')
-        if not column_types:
-            if column_type_names:
-                column_types = [get_from_name(name) for name in column_type_names]
-            else:
-                column_map = {d.name: d for d in column_defs}
-                try:
-                    column_types = [column_map[name].ch_type for name in column_names]
-                except KeyError as ex:
-                    raise ProgrammingError(f'Unrecognized column {ex} in table {table}') from None
-        if len(column_names) != len(column_types):
-            raise ProgrammingError('Column names do not match column types') from None
-        return InsertContext(full_table,
-                             column_names,
-                             column_types,
-                             column_oriented=column_oriented,
-                             settings=settings,
-                             transport_settings=transport_settings,
-                             data=data)
+            column_defs = insert_column_defs(self.query(f'DESCRIBE {full_table}'))
+        return build_insert_context(table, full_table, column_defs, column_names, column_types, column_type_names,
+                                    column_oriented, settings, data, transport_settings)
 
     def min_version(self, version_str: str) -> bool:
         """
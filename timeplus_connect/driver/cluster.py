@@ -0,0 +1,269 @@
+import logging
+import random
+import threading
+import time
+from typing import Optional, Sequence, List, Dict, Any
+from urllib.parse import urlparse
+
+from urllib3.response import HTTPResponse
+
+from timeplus_connect.driver.exceptions import ProgrammingError, OperationalError
+from timeplus_connect.driver.hedge import HEDGE_SUFFIX
+from timeplus_connect.driver.httpclient import HttpClient
+
+logger = logging.getLogger(__name__)
+
+ROUND_ROBIN = 'round_robin'
+LEAST_IN_FLIGHT = 'least_in_flight'
+LATENCY = 'latency'
+balance_policies = (ROUND_ROBIN, LEAST_IN_FLIGHT, LATENCY)
+
+_LATENCY_DECAY = 0.2
+
+
+class Endpoint:
+    """
+    Routing state for a single Timeplus server in a ClusterClient
+    """
+    __slots__ = 'url', 'in_flight', 'latency', 'failures', 'ejected_until', 'requests'
+
+    def __init__(self, url: str):
+        self.url = url
+        self.in_flight = 0
+        self.latency = 0.0  # Exponentially weighted average round trip seconds of the health probes
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+
+    def available(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+    def __repr__(self):
+        return f'Endpoint({self.url}, in_flight={self.in_flight}, latency={self.latency:.4f})'
+
+
+def endpoint_url(endpoint: str, interface: str, default_port: int, proxy_path: str) -> str:
+    if '://' in endpoint:
+        parsed = urlparse(endpoint)
+        return f'{parsed.scheme}://{parsed.hostname}:{parsed.port or default_port}{parsed.path.rstrip("/")}'
+    host, _, port = endpoint.rpartition(':') if ':' in endpoint else (endpoint, '', '')
+    return f'{interface}://{host}:{port or default_port}{proxy_path}'
+
+
+# pylint: disable=too-many-instance-attributes
+class ClusterClient(HttpClient):
+    """
+    HTTP client that spreads requests across several Timeplus servers.  Each request is routed to an endpoint chosen
+    by the balance policy: round_robin, least_in_flight, or latency (random choice weighted by the inverse of the
+    recent health probe round trip time of each endpoint, which unlike query response times does not include server
+    query execution time).  Endpoints that fail with a connection error or an exhausted
+    429/503/504 retry are ejected for the cool-down period, and a background thread probes all endpoints every
+    health_interval seconds to eject or restore them.  Queries (which are idempotent reads) that fail with an
+    OperationalError are retried on another endpoint; inserts and commands are not.  Sessions are not supported
+    since session state exists only on a single server
+    """
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(self,
+                 interface: str,
+                 host: str,
+                 port: int,
+                 username: str,
+                 password: str,
+                 database: str,
+                 access_token: Optional[str] = None,
+                 endpoints: Optional[Sequence[str]] = None,
+                 policy: str = ROUND_ROBIN,
+                 health_interval: float = 5.0,
+                 cooldown: float = 30.0,
+                 **kwargs):
+        """
+        Create a Timeplus Connect client for a cluster of servers.  See timeplus_connect.get_client for the
+        common parameters
+        :param endpoints: Sequence (or comma separated str) of 'host', 'host:port' or full URL endpoint strings.
+          If None, only host:port is used
+        :param policy: Endpoint selection policy, one of round_robin, least_in_flight, or latency
+        :param health_interval: Seconds between health probes of all endpoints.  0 disables the probe thread, so
+          the latency policy then chooses endpoints at random
+        :param cooldown: Seconds that a failed endpoint is excluded from routing (unless no endpoint is available)
+        """
+        if policy not in balance_policies:
+            raise ProgrammingError(f'Unrecognized cluster balance policy {policy}')
+        if kwargs.get('session_id'):
+            raise ProgrammingError('Sessions are not supported by the cluster client')
+        kwargs['autogenerate_session_id'] = False
+        if isinstance(endpoints, str):
+            endpoints = [endpoint.strip() for endpoint in endpoints.split(',') if endpoint.strip()]
+        if endpoints is not None and not endpoints:
+            raise ProgrammingError('No endpoints specified for the cluster client')
+        proxy_path = kwargs.get('proxy_path', '').lstrip('/')
+        proxy_path = '/' + proxy_path if proxy_path else ''
+        self.endpoints: List[Endpoint] = [Endpoint(endpoint_url(endpoint, interface, port, proxy_path))
+                                          for endpoint in (endpoints or [f'{host}:{port}'])]
+        self.policy = policy
+        self.cooldown = cooldown
+        self.health_interval = health_interval
+        self._route_lock = threading.Lock()
+        self._next = 0
+        self._stop = threading.Event()
+        self._health_thread = None
+        self._query_endpoints: Dict[str, Endpoint] = {}
+        super().__init__(interface, host, port, username, password, database, access_token, **kwargs)
+        if health_interval:
+            self._health_thread = threading.Thread(target=self._probe_loop, name='tp_cluster_health', daemon=True)
+            self._health_thread.start()
+
+    def _select(self, exclude: Sequence[Endpoint] = ()) -> Endpoint:
+        now = time.monotonic()
+        with self._route_lock:
+            candidates = [ep for ep in self.endpoints if ep.available(now) and ep not in exclude]
+            if not candidates:
+                # With every endpoint ejected, try the one that will be restored first rather than failing
+                remaining = [ep for ep in self.endpoints if ep not in exclude] or self.endpoints
+                candidates = [min(remaining, key=lambda ep: ep.ejected_until)]
+            if self.policy == LEAST_IN_FLIGHT:
+                least = min(ep.in_flight for ep in candidates)
+                candidates = [ep for ep in candidates if ep.in_flight == least]
+                self._next += 1
+                endpoint = candidates[self._next % len(candidates)]
+            elif self.policy == LATENCY:
+                # Endpoints without a measurement yet get the best weight so that they are sampled
+                weights = [1 / ep.latency if ep.latency else 0.0 for ep in candidates]
+                best = max(weights)
+                weights = [weight or best or 1.0 for weight in weights]
+                endpoint = random.choices(candidates, weights)[0]
+            else:
+                self._next += 1
+                endpoint = candidates[self._next % len(candidates)]
+            endpoint.in_flight += 1
+            endpoint.requests += 1
+        return endpoint
+
+    def _complete(self, endpoint: Endpoint, failed: bool):
+        with self._route_lock:
+            endpoint.in_flight -= 1
+            if failed:
+                self._eject(endpoint)
+            else:
+                endpoint.failures = 0
+
+    def _eject(self, endpoint: Endpoint):
+        endpoint.failures += 1
+        endpoint.ejected_until = time.monotonic() + self.cooldown
+        logger.warning('Timeplus endpoint %s ejected for %.1f seconds', endpoint.url, self.cooldown)
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    def _raw_request(self,
+                     data,
+                     params: Dict[str, str],
+                     headers: Optional[Dict[str, Any]] = None,
+                     method: str = 'POST',
+                     retries: int = 0,
+                     stream: bool = False,
+                     server_wait: bool = True,
+                     fields: Optional[Dict[str, tuple]] = None,
+                     error_handler=None,
+                     endpoint: Optional[str] = None) -> HTTPResponse:
+        if endpoint:
+            return super()._raw_request(data, params, headers, method, retries, stream, server_wait, fields,
+                                        error_handler, endpoint)
+        # Only queries are sent with retries, and their (non-generator) bodies can safely be sent to another server
+        idempotent = retries > 0 and not hasattr(data, '__next__')
+        query_id = params.get('query_id')
+        exclude = []
+        if query_id and query_id.endswith(HEDGE_SUFFIX):
+            # Hedged requests should go to a different server than the original request
+            primary = self._query_endpoints.get(query_id[:-len(HEDGE_SUFFIX)])
+            if primary:
+                exclude.append(primary)
+        tried = []
+        while True:
+            target = self._select(tried + exclude)
+            tried.append(target)
+            if query_id:
+                self._query_endpoints[query_id] = target
+            try:
+                response = super()._raw_request(data, params, headers, method, retries, stream, server_wait, fields,
+                                                error_handler, target.url)
+            except OperationalError:
+                self._release_query(query_id, target)
+                self._complete(target, True)
+                if not idempotent or len(tried) >= len(self.endpoints):
+                    raise
+                logger.debug('Retrying query on another endpoint after failure of %s', target.url)
+                continue
+            except Exception:
+                self._release_query(query_id, target)
+                self._complete(target, False)
+                raise
+            if stream:
+                # The streamed query is still running on the endpoint until the response is closed, so it stays in
+                # flight and a KILL QUERY or hedged request for it is routed correctly
+                self._release_on_close(response, query_id, target)
+            else:
+                self._complete(target, False)
+                self._release_query(query_id, target)
+            return response
+
+    def _release_query(self, query_id: Optional[str], endpoint: Endpoint):
+        if query_id and self._query_endpoints.get(query_id) is endpoint:
+            self._query_endpoints.pop(query_id, None)
+
+    def _release_on_close(self, response: HTTPResponse, query_id: Optional[str], endpoint: Endpoint):
+        close = response.close
+        released = False
+
+        def release_close():
+            nonlocal released
+            if not released:
+                released = True
+                self._release_query(query_id, endpoint)
+                self._complete(endpoint, False)
+            close()
+
+        response.close = release_close
+
+    def _query_endpoint(self, query_id: str) -> Optional[str]:
+        endpoint = self._query_endpoints.get(query_id)
+        return endpoint.url if endpoint else None
+
+    def _kill_query(self, query_id: str, endpoint: Optional[str] = None):
+        # The query can only be killed on the server that is running it
+        super()._kill_query(query_id, endpoint or self._query_endpoint(query_id))
+
+    def probe(self):
+        """
+        Check every endpoint with a simple query, ejecting failed endpoints and restoring healthy ones.  The round
+        trip time of each probe updates the endpoint latency used by the latency policy
+        """
+        for endpoint in self.endpoints:
+            start = time.monotonic()
+            try:
+                super()._raw_request('SELECT 1', {}, endpoint=endpoint.url)
+            except Exception:  # pylint: disable=broad-except
+                with self._route_lock:
+                    if endpoint.available(time.monotonic()):
+                        self._eject(endpoint)
+                continue
+            rtt = time.monotonic() - start
+            with self._route_lock:
+                endpoint.latency = rtt if not endpoint.latency else \
+                    endpoint.latency + _LATENCY_DECAY * (rtt - endpoint.latency)
+                if endpoint.ejected_until:
+                    logger.info('Timeplus endpoint %s restored', endpoint.url)
+                endpoint.ejected_until = 0.0
+                endpoint.failures = 0
+
+    def _probe_loop(self):
+        while not self._stop.wait(self.health_interval):
+            try:
+                self.probe()
+            except Exception:  # pylint: disable=broad-except
+                logger.warning('Cluster health probe failed', exc_info=True)
+
+    def close(self):
+        self._stop.set()
+        if self._health_thread:
+            self._health_thread.join()
+            self._health_thread = None
+        super().close()
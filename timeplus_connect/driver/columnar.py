@@ -0,0 +1,249 @@
+import array
+from typing import Sequence, Optional, Any, Tuple
+
+from timeplus_connect.driver.common import must_swap, write_np_array
+from timeplus_connect.driver.options import np, arrow
+
+
+def read_offsets(source, num_rows: int, use_numpy: bool) -> Sequence[int]:
+    """
+    Read the UInt64 end offsets of a Native Array or Map column as start offsets, so that the offsets have
+    num_rows + 1 values beginning with 0 (the Arrow layout)
+    :param source: Native protocol binary read buffer
+    :param num_rows: Number of rows in the column
+    :param use_numpy: Return a numpy int64 array instead of an array.array
+    :return: The offsets sequence
+    """
+    if use_numpy:
+        offsets = np.zeros(num_rows + 1, dtype='<i8')
+        offsets[1:] = np.frombuffer(source.read_bytes(num_rows * 8), dtype='<u8', count=num_rows)
+        return offsets
+    offsets = array.array('Q', [0])
+    offsets.extend(source.read_array('Q', num_rows))
+    return offsets
+
+
+def write_offsets(ends: Sequence[int], dest: bytearray):
+    """
+    Write the UInt64 end offsets of a Native Array or Map column
+    :param ends: Numpy array or array.array('Q') of the end offset of each row
+    :param dest: Native binary write buffer
+    """
+    if np is not None and isinstance(ends, np.ndarray):
+        write_np_array('Q', ends, dest)
+        return
+    if must_swap:
+        ends = array.array('Q', ends)
+        ends.byteswap()
+    dest += ends
+
+
+def _end_offsets(offsets: Sequence[int]) -> Tuple[Sequence[int], int, int]:
+    """
+    Convert start offsets (num_rows + 1 values) that may not begin at zero into end offsets beginning at zero
+    :return: The end offsets and the start and end positions of the rows in the flat values
+    """
+    start, end = int(offsets[0]), int(offsets[-1])
+    if np is not None:
+        ends = np.asarray(offsets[1:], dtype='<i8')
+        return (ends - start) if start else ends, start, end
+    return array.array('Q', (x - start for x in offsets[1:])), start, end
+
+
+# pylint: disable=too-many-return-statements
+def list_insert(column: Any) -> Optional[Tuple[Sequence[int], Any]]:
+    """
+    Split a columnar Array insert column into the end offsets and flat values of the rows, without iterating the
+    values in Python.  Supported columns are pyarrow list arrays, ListColumns, two dimensional numpy arrays, and
+    sequences (including numpy object arrays such as pandas columns) of numpy arrays
+    :param column: Insert column data
+    :return: The end offsets and values of the column, or None if the column is not a supported columnar type
+    """
+    if arrow is not None and isinstance(column, (arrow.Array, arrow.ChunkedArray)):
+        if isinstance(column, arrow.ChunkedArray):
+            column = column.combine_chunks()
+        if isinstance(column, arrow.FixedSizeListArray):
+            width = column.type.list_size
+            ends = np.arange(width, (len(column) + 1) * width, width, dtype='<i8')
+            return ends, column.flatten()
+        if isinstance(column, (arrow.ListArray, arrow.LargeListArray)) and not isinstance(column, arrow.MapArray):
+            ends, start, end = _end_offsets(column.offsets.to_numpy())
+            return ends, column.values.slice(start, end - start)
+        return None
+    if isinstance(column, ListColumn):
+        ends, start, end = _end_offsets(column.offsets)
+        values = column.values
+        return ends, values if start == 0 and end == len(values) else values[start:end]
+    if np is None or len(column) == 0:
+        return None
+    if isinstance(column, np.ndarray) and column.ndim == 2:
+        num_rows, width = column.shape
+        return np.arange(width, (num_rows + 1) * width, width, dtype='<i8'), column.reshape(-1)
+    if isinstance(column[0], np.ndarray):
+        rows = list(column)
+        ends = np.cumsum(np.fromiter((len(x) for x in rows), dtype='<i8', count=len(rows)))
+        return ends, np.concatenate(rows)
+    return None
+
+
+def map_insert(column: Any) -> Optional[Tuple[Sequence[int], Any, Any]]:
+    """
+    Split a columnar Map insert column (a pyarrow MapArray or a MapColumn) into the end offsets, keys and values
+    :param column: Insert column data
+    :return: The end offsets, keys and values of the column, or None if the column is not a supported columnar type
+    """
+    if arrow is not None and isinstance(column, (arrow.MapArray, arrow.ChunkedArray)):
+        if isinstance(column, arrow.ChunkedArray):
+            if not isinstance(column.type, arrow.MapType):
+                return None
+            column = column.combine_chunks()
+        ends, start, end = _end_offsets(column.offsets.to_numpy())
+        keys, values = column.values.slice(start, end - start).flatten()
+        return ends, keys, values
+    if isinstance(column, MapColumn):
+        ends, start, end = _end_offsets(column.offsets)
+        return ends, column.keys[start:end], column.values[start:end]
+    return None
+
+
+def object_array(column: Sequence) -> 'np.ndarray':
+    """
+    One dimensional numpy object array of the rows of column, even if every row is a sequence of the same length
+    """
+    result = np.empty(len(column), dtype=object)
+    for ix, value in enumerate(column):
+        result[ix] = value
+    return result
+
+
+class _LazyColumn(Sequence):
+    """
+    Base class for the lazy columnar container columns.  Rows are only built when accessed
+    """
+    __slots__ = ()
+
+    def _row(self, ix: int) -> Any:
+        raise NotImplementedError
+
+    def _slice(self, start: int, stop: int) -> '_LazyColumn':
+        raise NotImplementedError
+
+    def __getitem__(self, ix):
+        num_rows = len(self)
+        if isinstance(ix, slice):
+            start, stop, step = ix.indices(num_rows)
+            if step == 1:
+                return self._slice(start, max(start, stop))
+            return [self._row(x) for x in range(start, stop, step)]
+        if ix < 0:
+            ix += num_rows
+        if not 0 <= ix < num_rows:
+            raise IndexError('column index out of range')
+        return self._row(ix)
+
+    def __iter__(self):
+        for ix in range(len(self)):
+            yield self._row(ix)
+
+    def __array__(self, dtype=None, copy=None):
+        # pylint: disable=unused-argument
+        return object_array(self)
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence) and not isinstance(other, (str, bytes)):
+            return len(self) == len(other) and all(_equal(x, y) for x, y in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'{type(self).__name__}({list(self)!r})'
+
+
+def _equal(x, y) -> bool:
+    result = x == y
+    if isinstance(result, bool):
+        return result
+    if np is not None and isinstance(result, np.ndarray):
+        return len(x) == len(y) and bool(result.all())
+    return bool(result)
+
+
+class ListColumn(_LazyColumn):
+    """
+    Columnar Array column, made up of the flat element values and the start offset of each row.  Each row is a slice
+    of the values, so for numpy values the rows are views of the values array
+    """
+    __slots__ = 'offsets', 'values'
+
+    def __init__(self, offsets: Sequence[int], values: Sequence):
+        self.offsets = offsets
+        self.values = values
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _row(self, ix: int):
+        return self.values[self.offsets[ix]: self.offsets[ix + 1]]
+
+    def _slice(self, start: int, stop: int) -> 'ListColumn':
+        return ListColumn(self.offsets[start: stop + 1], self.values)
+
+    def to_numpy(self) -> 'np.ndarray':
+        """
+        Two dimensional numpy array of the rows (without copying the values) if every row has the same length, such
+        as for feature vectors.  Otherwise a one dimensional numpy object array of the rows
+        :return: Numpy array
+        """
+        offsets = np.asarray(self.offsets, dtype='<i8')
+        values = np.asarray(self.values)
+        num_rows = len(offsets) - 1
+        width = int(offsets[1] - offsets[0]) if num_rows else 0
+        if width and (np.diff(offsets) == width).all():
+            return values[offsets[0]: offsets[-1]].reshape(num_rows, width)
+        return object_array(self)
+
+
+class MapColumn(_LazyColumn):
+    """
+    Columnar Map column, made up of the flat keys and values and the start offset of each row.  Row dictionaries
+    are built when accessed
+    """
+    __slots__ = 'offsets', 'keys', 'values'
+
+    def __init__(self, offsets: Sequence[int], keys: Sequence, values: Sequence):
+        self.offsets = offsets
+        self.keys = keys
+        self.values = values
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _row(self, ix: int) -> dict:
+        start, end = self.offsets[ix], self.offsets[ix + 1]
+        return dict(zip(self.keys[start:end], self.values[start:end]))
+
+    def _slice(self, start: int, stop: int) -> 'MapColumn':
+        return MapColumn(self.offsets[start: stop + 1], self.keys, self.values)
+
+
+class TupleColumn(_LazyColumn):
+    """
+    Columnar Tuple column, made up of one column per tuple element.  Rows are dictionaries for named tuples,
+    and tuples otherwise
+    """
+    __slots__ = 'columns', 'names'
+
+    def __init__(self, columns: Sequence[Sequence], names: Optional[Sequence[str]] = None):
+        self.columns = columns
+        self.names = names
+
+    def __len__(self):
+        return len(self.columns[0]) if self.columns else 0
+
+    def _row(self, ix: int):
+        row = tuple(column[ix] for column in self.columns)
+        return dict(zip(self.names, row)) if self.names else row
+
+    def _slice(self, start: int, stop: int) -> 'TupleColumn':
+        return TupleColumn([column[start: stop] for column in self.columns], self.names)
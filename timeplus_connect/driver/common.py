@@ -1,10 +1,15 @@
 import array
+import asyncio
 import struct
 import sys
+import threading
+from contextlib import suppress
+from queue import Queue, Full
 
-from typing import Sequence, MutableSequence, Dict, Optional, Union, Generator
+from typing import Sequence, MutableSequence, Dict, Optional, Union, Generator, AsyncGenerator, Any
 
 from timeplus_connect.driver.exceptions import ProgrammingError, StreamClosedError, DataError
+from timeplus_connect.driver.options import np
 from timeplus_connect.driver.types import Closable
 
 
@@ -58,6 +63,38 @@ def write_array(code: str, column: Sequence, dest: MutableSequence, col_name: Op
                                   'values into a ClickHouse column that is not Nullable') from ex
 
 
+def write_np_array(code: str, column: 'np.ndarray', dest: bytearray, col_name: Optional[str] = None):
+    """
+    Write a numpy column directly through the buffer protocol.  Columns with a different dtype are cast with numpy,
+    checking that integer values fit the destination type
+    :param code: Python array.array code matching the column data type
+    :param column: Numpy array of column values
+    :param dest: Destination byte buffer
+    :param col_name: Optional column name for error tracking
+    """
+    dtype = np.dtype(code).newbyteorder('<')
+    if column.dtype != dtype:
+        if dtype.kind in 'iu' and column.dtype.kind in 'iuf' and len(column) and not np.can_cast(column.dtype, dtype):
+            info = np.iinfo(dtype)
+            if column.min() < info.min or column.max() > info.max:
+                col_msg = f' for source column `{col_name}`' if col_name else ''
+                raise DataError(f'Numpy values out of range for {dtype.name}{col_msg}')
+        column = column.astype(dtype)
+    dest += np.ascontiguousarray(column).data
+
+
+def np_null_map(column: 'np.ndarray', nan_null: bool = False) -> bytes:
+    """
+    Native null map of a numpy column.  Datetime NaT values are treated as NULL, and float NaN values if nan_null
+    is True
+    """
+    if column.dtype.kind in 'mM':
+        return np.isnat(column).tobytes()
+    if nan_null and column.dtype.kind == 'f':
+        return np.isnan(column).tobytes()
+    return bytes(len(column))
+
+
 def write_uint64(value: int, dest: MutableSequence):
     """
     Write a single UInt64 value to a binary write buffer
@@ -218,3 +255,126 @@ class StreamContext:
         self._in_context = False
         self.source.close()
         self.gen = None
+
+
+class AsyncStreamContext:
+    """
+    Async version of the StreamContext, wrapping an async generator and a source with an async close method
+    """
+    __slots__ = 'source', 'gen', '_in_context'
+
+    def __init__(self, source: Any, gen: AsyncGenerator):
+        self.source = source
+        self.gen = gen
+        self._in_context = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._in_context:
+            raise ProgrammingError('Stream should be used within a context')
+        return await self.gen.__anext__()
+
+    async def __aenter__(self):
+        if not self.gen:
+            raise StreamClosedError
+        self._in_context = True
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._in_context = False
+        await self.gen.aclose()
+        await self.source.close()
+        self.gen = None
+
+
+class StoppableQueue:
+    """
+    Bounded queue that hands items from a background thread to a consumer.  A producer blocked on a full queue
+    gives up once the queue is stopped, so an abandoned consumer never leaves the producer thread hanging
+    """
+    __slots__ = 'queue', 'stop_event'
+
+    def __init__(self, maxsize: int):
+        self.queue = Queue(maxsize=maxsize)
+        self.stop_event = threading.Event()
+
+    @property
+    def stopped(self) -> bool:
+        return self.stop_event.is_set()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def put(self, item) -> bool:
+        """
+        :param item: Item to add, waiting for space in the queue
+        :return: False if the queue was stopped before the item was added
+        """
+        while not self.stop_event.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def get(self):
+        return self.queue.get()
+
+    def items(self, end: Any = None) -> Generator:
+        """
+        :param end: Sentinel value put by the producer after the last item
+        :return: Generator of the queued items, raising any Exception put by the producer
+        """
+        while True:
+            item = self.queue.get()
+            if item is end:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+_END = object()
+
+
+async def async_read_ahead(gen: AsyncGenerator, size: int) -> AsyncGenerator:
+    """
+    Wraps an async generator so that up to `size` items are produced by a background task ahead of the consumer
+    :param gen: The source async generator, which is closed with the wrapper
+    :param size: Maximum number of items buffered ahead of the consumer.  If less than 1 items are produced on demand
+    """
+    if size < 1:
+        try:
+            async for item in gen:
+                yield item
+        finally:
+            await gen.aclose()
+        return
+    queue = asyncio.Queue(size)
+
+    async def produce():
+        try:
+            async for item in gen:
+                await queue.put((item, None))
+        except Exception as ex:  # pylint: disable=broad-except
+            await queue.put((None, ex))
+            return
+        await queue.put((_END, None))
+
+    task = asyncio.create_task(produce())
+    try:
+        while True:
+            item, ex = await queue.get()
+            if ex is not None:
+                raise ex
+            if item is _END:
+                return
+            yield item
+    finally:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+        await gen.aclose()
@@ -1,6 +1,7 @@
+import threading
 import zlib
 from abc import abstractmethod
-from typing import Union
+from typing import Union, Optional, Dict, List
 
 import lz4
 import lz4.frame
@@ -34,8 +35,8 @@ class Compressor:
 
 
 class GzipCompressor(Compressor, tag='gzip', thread_safe=False):
-    def __init__(self, level: int = 6, wbits: int = 31):
-        self.zlib_obj = zlib.compressobj(level=level, wbits=wbits)
+    def __init__(self, level: Optional[int] = None, wbits: int = 31, **_):
+        self.zlib_obj = zlib.compressobj(level=6 if level is None else level, wbits=wbits)
 
     def compress_block(self, block):
         return self.zlib_obj.compress(block)
@@ -45,33 +46,100 @@ class GzipCompressor(Compressor, tag='gzip', thread_safe=False):
 
 
 class Lz4Compressor(Compressor, tag='lz4', thread_safe=False):
-    def __init__(self):
-        self.comp = lz4.frame.LZ4FrameCompressor()
+    """
+    Writes all blocks of an insert as a single LZ4 frame
+    """
+    def __init__(self, level: Optional[int] = None, **_):
+        self.comp = lz4.frame.LZ4FrameCompressor(compression_level=level or 0)
+        self.started = False
 
     def compress_block(self, block):
-        output = self.comp.begin(len(block))
-        output += self.comp.compress(block)
-        return output + self.comp.flush()
+        if not self.started:
+            self.started = True
+            return self.comp.begin() + self.comp.compress(block)
+        return self.comp.compress(block)
+
+    def flush(self):
+        if self.started:
+            self.started = False
+            return self.comp.flush()
+        return None
+
+
+class _ZstdContextPool:
+    """
+    zstandard compression contexts are relatively expensive to create at higher levels, so they are reused by
+    subsequent inserts with the same level and thread count.  A context cannot be used by two streams at once, so
+    each insert takes one from the pool and returns it when its frame is complete
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.contexts: Dict[tuple, List[zstandard.ZstdCompressor]] = {}
+
+    def acquire(self, key: tuple) -> zstandard.ZstdCompressor:
+        with self.lock:
+            free = self.contexts.get(key)
+            if free:
+                return free.pop()
+        return zstandard.ZstdCompressor(level=key[0], threads=key[1])
+
+    def release(self, key: tuple, ctx: zstandard.ZstdCompressor):
+        with self.lock:
+            free = self.contexts.setdefault(key, [])
+            if len(free) < 16:
+                free.append(ctx)
+
 
+_zstd_contexts = _ZstdContextPool()
+
+
+class ZstdCompressor(Compressor, tag='zstd', thread_safe=False):
+    """
+    Writes all blocks of an insert as a single zstd frame using a pooled compression context.  If threads is
+    non-zero, zstd compresses the frame with that many worker threads (-1 for the number of CPU cores)
+    """
+    def __init__(self, level: Optional[int] = None, threads: int = 0, **_):
+        self.key = (3 if level is None else level, threads or 0)
+        self.ctx = _zstd_contexts.acquire(self.key)
+        self.comp = self.ctx.compressobj()
 
-class ZstdCompressor(Compressor, tag='zstd'):
     def compress_block(self, block):
-        return zstandard.compress(block)
+        return self.comp.compress(block)
+
+    def flush(self):
+        if self.ctx is None:
+            return None
+        output = self.comp.flush()
+        _zstd_contexts.release(self.key, self.ctx)
+        self.ctx = None
+        return output
 
 
-class BrotliCompressor(Compressor, tag='br'):
+class BrotliCompressor(Compressor, tag='br', thread_safe=False):
+    def __init__(self, level: Optional[int] = None, **_):
+        self.comp = brotli.Compressor() if level is None else brotli.Compressor(quality=level)
+
     def compress_block(self, block):
-        return brotli.compress(block)
+        return self.comp.process(bytes(block))
+
+    def flush(self):
+        return self.comp.finish()
 
 
 null_compressor = Compressor()
 
 
-def get_compressor(compression: str) -> Compressor:
+def get_compressor(compression: str, level: Optional[int] = None, threads: int = 0) -> Compressor:
+    """
+    :param compression: HTTP Content-Encoding compression method
+    :param level: Compression level (quality for brotli), or None for the method default
+    :param threads: zstd worker threads.  Ignored by other methods
+    :return: Compressor for a single insert stream.  The stream must be completed by calling flush
+    """
     if not compression:
         return null_compressor
     comp = comp_map[compression]
     try:
-        return comp()
+        return comp(level=level, threads=threads)
     except TypeError:
         return comp
@@ -1,49 +1,94 @@
 import logging
 import os
+from typing import Tuple
 
 import timeplus_connect.driver.dataconv as pydc
 import timeplus_connect.driver.npconv as pync
 from timeplus_connect.driver.buffer import ResponseBuffer
 from timeplus_connect.driver.common import coerce_bool
+from timeplus_connect.driver.exceptions import ProgrammingError
 
 logger = logging.getLogger(__name__)
 
+PYTHON_BACKEND = 'python'
+C_BACKEND = 'c'
+
 RespBuffCls = ResponseBuffer
 data_conv = pydc
 numpy_conv = pync
 
+# The active ResponseBuffer, data conversion and numpy conversion modules must always come from the same backend,
+# since the Cython conversion functions only accept the Cython ResponseBuffer
+_backends = {PYTHON_BACKEND: (ResponseBuffer, pydc, pync)}
+_active_backend = PYTHON_BACKEND
 
-# pylint: disable=import-outside-toplevel,global-statement
 
-def connect_c_modules():
-    if not coerce_bool(os.environ.get('CLICKHOUSE_CONNECT_USE_C', True)):
-        logger.info('ClickHouse Connect C optimizations disabled')
-        return
+# pylint: disable=import-outside-toplevel,global-statement
 
-    global RespBuffCls, data_conv
+def _load_c_backend() -> bool:
+    if C_BACKEND in _backends:
+        return True
     try:
         from timeplus_connect.driverc.buffer import ResponseBuffer as CResponseBuffer
         import timeplus_connect.driverc.dataconv as cdc
-
-        data_conv = cdc
-        RespBuffCls = CResponseBuffer
-        logger.debug('Successfully imported ClickHouse Connect C data optimizations')
-        connect_numpy()
     except ImportError as ex:
         logger.warning('Unable to connect optimized C data functions [%s], falling back to pure Python',
                        str(ex))
+        return False
+    logger.debug('Successfully imported ClickHouse Connect C data optimizations')
+    _backends[C_BACKEND] = (CResponseBuffer, cdc, _load_c_numpy())
+    return True
 
 
-def connect_numpy():
-    global numpy_conv
+def _load_c_numpy():
     try:
         import timeplus_connect.driverc.npconv as cnc
 
-        numpy_conv = cnc
         logger.debug('Successfully import ClickHouse Connect C/Numpy optimizations')
+        return cnc
     except ImportError as ex:
         logger.debug('Unable to connect ClickHouse Connect C to Numpy API [%s], falling back to pure Python',
-             str(ex))
+                     str(ex))
+    return pync
+
+
+def available_backends() -> Tuple[str, ...]:
+    """
+    :return: The names of the decoding backends that can be activated in this environment
+    """
+    _load_c_backend()
+    return tuple(_backends.keys())
+
+
+def active_backend() -> str:
+    """
+    :return: The name of the backend ('c' or 'python') currently used to decode Native format responses
+    """
+    return _active_backend
+
+
+def set_backend(name: str):
+    """
+    Switch the ResponseBuffer and data conversion functions used for Native format decoding.  The switch applies to
+    queries started after this call, and should not be made while other threads are reading query results
+    :param name: 'c' for the compiled Cython extensions, 'python' for the pure Python implementation
+    """
+    global RespBuffCls, data_conv, numpy_conv, _active_backend
+    name = name.lower()
+    if name == C_BACKEND and not _load_c_backend():
+        raise ProgrammingError('The Timeplus Connect C extensions are not available in this environment')
+    if name not in _backends:
+        raise ProgrammingError(f'Unrecognized decoding backend {name}')
+    RespBuffCls, data_conv, numpy_conv = _backends[name]
+    _active_backend = name
+
+
+def connect_c_modules():
+    if not coerce_bool(os.environ.get('CLICKHOUSE_CONNECT_USE_C', True)):
+        logger.info('ClickHouse Connect C optimizations disabled')
+        return
+    if _load_c_backend():
+        set_backend(C_BACKEND)
 
 
-# connect_c_modules()
+connect_c_modules()
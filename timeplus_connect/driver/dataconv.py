@@ -81,6 +81,20 @@ def read_uuid_col(source: ByteSource, num_rows: int):
     return column
 
 
+def read_bigint_col(source: ByteSource, num_rows: int, sz: int, signed: bool):
+    data = source.read_bytes(sz * num_rows)
+    if np is not None and num_rows:
+        # Values that fit in 64 bits (the common case) have high limbs that are only sign extension
+        limbs = np.frombuffer(data, dtype='<i8' if signed else '<u8').reshape(num_rows, sz // 8)
+        low = limbs[:, 0]
+        ext = (low >> 63)[:, None] if signed else 0
+        if (limbs[:, 1:] == ext).all():
+            return low.tolist()
+    ifb = int.from_bytes
+    view = memoryview(data)
+    return [ifb(view[ix: ix + sz], 'little', signed=signed) for ix in range(0, sz * num_rows, sz)]
+
+
 def read_nullable_array(source: ByteSource, array_type: str, num_rows: int, null_obj: Any):
     null_map = source.read_bytes(num_rows)
     column = source.read_array(array_type, num_rows)
@@ -0,0 +1,122 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Callable, Deque
+
+logger = logging.getLogger(__name__)
+
+HEDGE_SUFFIX = '-hedge'
+
+
+# pylint: disable=too-many-instance-attributes
+class HedgePolicy:
+    """
+    Hedged read policy for HttpClient queries.  A query is first sent normally, and if its response has not started
+    after the hedge delay a duplicate request with a different query_id is sent (to another endpoint for a
+    ClusterClient, otherwise on another pooled connection).  The first response wins and the other query is killed on
+    the server with KILL QUERY.  The hedge delay is the configured percentile of recent time-to-first-byte
+    measurements, limited to the min_delay - max_delay range.  A policy may be shared by several clients
+    """
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(self,
+                 percentile: float = 95.0,
+                 min_delay: float = 0.01,
+                 max_delay: float = 2.0,
+                 initial_delay: float = 0.1,
+                 window: int = 1000,
+                 max_workers: int = 16):
+        """
+        :param percentile: Percentile of recent first byte latencies used as the hedge delay
+        :param min_delay: Minimum hedge delay in seconds
+        :param max_delay: Maximum hedge delay in seconds
+        :param initial_delay: Hedge delay used until enough latencies have been recorded
+        :param window: Number of recent first byte latencies retained
+        :param max_workers: Maximum number of concurrent primary and hedged requests
+        """
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.initial_delay = initial_delay
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tp_hedge')
+        self._delay = None
+        self._recorded = 0
+
+    def delay(self) -> float:
+        with self._lock:
+            if len(self.latencies) < 10:
+                return self.initial_delay
+            # Recalculating the percentile on every request is unnecessary, the delay changes slowly
+            if self._delay is None or self._recorded >= 16:
+                ordered = sorted(self.latencies)
+                ix = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+                self._delay = min(self.max_delay, max(self.min_delay, ordered[ix]))
+                self._recorded = 0
+            return self._delay
+
+    def record(self, latency: float, hedged: bool, hedge_won: bool):
+        with self._lock:
+            self.latencies.append(latency)
+            self._recorded += 1
+            self.requests += 1
+            if hedged:
+                self.hedged += 1
+            if hedge_won:
+                self.hedge_wins += 1
+
+    def execute(self, request: Callable[[str], object], query_id: str, kill: Callable[[str], None],
+                release: Callable[[object], None]):
+        """
+        Run a request with hedging
+        :param request: Function that sends the request with the query_id argument and returns the response once
+          its first byte has arrived
+        :param query_id: Query id of the primary request.  The hedged request uses this id with the hedge suffix
+        :param kill: Function called with the query id of the losing request to cancel it on the server
+        :param release: Function called with the response of the losing request if it completes anyway
+        :return: The first successful response
+        """
+        start = time.monotonic()
+        hedge_id = query_id + HEDGE_SUFFIX
+        futures = {self._executor.submit(request, query_id): query_id}
+        done, _ = wait(futures, timeout=self.delay())
+        if not done:
+            logger.debug('Sending hedged request for query %s', query_id)
+            futures[self._executor.submit(request, hedge_id)] = hedge_id
+        first_error = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    winner = futures[future]
+                    self.record(time.monotonic() - start, len(futures) > 1, winner == hedge_id)
+                    for loser in pending:
+                        self._cancel(loser, futures[loser], kill, release)
+                    for other in done:
+                        if other is not future and other.exception() is None:
+                            release(other.result())
+                    return future.result()
+                if futures[future] == query_id or first_error is None:
+                    first_error = future.exception()
+        raise first_error
+
+    def _cancel(self, future: Future, query_id: str, kill: Callable[[str], None], release: Callable[[object], None]):
+        def release_loser(loser: Future):
+            if loser.exception() is None:
+                release(loser.result())
+
+        future.add_done_callback(release_loser)
+        try:
+            self._executor.submit(kill, query_id)
+        except RuntimeError:  # Executor shutdown
+            pass
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -1,10 +1,9 @@
 import io
 import json
 import logging
-import re
 import uuid
 from base64 import b64encode
-from typing import Optional, Dict, Any, Sequence, Union, List, Callable, Generator, BinaryIO
+from typing import Optional, Dict, Any, Sequence, Union, Callable, Generator, BinaryIO
 from urllib.parse import urlencode
 
 from urllib3 import Timeout
@@ -13,25 +12,26 @@ from urllib3.poolmanager import PoolManager
 from urllib3.response import HTTPResponse
 
 from timeplus_connect import common
-from timeplus_connect.datatypes import registry
-from timeplus_connect.datatypes.base import TimeplusType
 from timeplus_connect.driver.client import Client
 from timeplus_connect.driver.common import dict_copy, coerce_bool, coerce_int, dict_add
-from timeplus_connect.driver.compression import available_compression
-from timeplus_connect.driver.ctypes import RespBuffCls
+from timeplus_connect.driver.compression import available_compression, get_compressor
+from timeplus_connect.driver import ctypes
 from timeplus_connect.driver.exceptions import DatabaseError, OperationalError, ProgrammingError
 from timeplus_connect.driver.external import ExternalData
+from timeplus_connect.driver.hedge import HedgePolicy
+from timeplus_connect.driver.httpcommon import ex_header, query_params, columns_only, \
+    columns_only_result, query_body, insert_request, take_insert_exception, raw_insert_request, command_request, \
+    command_result
 from timeplus_connect.driver.httputil import ResponseSource, get_pool_manager, get_response_data, \
     default_pool_manager, get_proxy_manager, all_managers, check_env_proxy, check_conn_expiration
 from timeplus_connect.driver.insert import InsertContext
 from timeplus_connect.driver.query import QueryResult, QueryContext
-from timeplus_connect.driver.binding import quote_identifier, bind_query
+from timeplus_connect.driver.binding import bind_query, format_str
+from timeplus_connect.driver.spool import InsertSpool, SpoolEntry
 from timeplus_connect.driver.summary import QuerySummary
 from timeplus_connect.driver.transform import NativeTransform
 
 logger = logging.getLogger(__name__)
-columns_only_re = re.compile(r'LIMIT 0\s*$', re.IGNORECASE)
-ex_header = 'x-timeplus-exception-code'
 
 
 # pylint: disable=too-many-instance-attributes
@@ -45,6 +45,8 @@ class HttpClient(Client):
                                    'http_headers_progress_interval_ms',
                                    'enable_http_compression'}
     _owns_pool_manager = False
+    insert_spool: Optional[InsertSpool] = None
+    hedge_policy: Optional[HedgePolicy] = None
 
     # pylint: disable=too-many-positional-arguments,too-many-arguments,too-many-locals,too-many-branches,too-many-statements,unused-argument
     def __init__(self,
@@ -75,7 +77,11 @@ class HttpClient(Client):
                  show_clickhouse_errors: Optional[bool] = None,
                  autogenerate_session_id: Optional[bool] = None,
                  tls_mode: Optional[str] = None,
-                 proxy_path: str = ''):
+                 proxy_path: str = '',
+                 insert_spool: Optional[InsertSpool] = None,
+                 hedge_policy: Optional[HedgePolicy] = None,
+                 compress_level: Optional[int] = None,
+                 compress_threads: int = 0):
         """
         Create an HTTP Timeplus Connect client
         See timeplus_connect.get_client for parameters
@@ -128,6 +134,10 @@ class HttpClient(Client):
         self.headers['User-Agent'] = common.build_client_name(client_name)
         self._read_format = self._write_format = 'Native'
         self._transform = NativeTransform()
+        self.insert_spool = insert_spool
+        self.hedge_policy = hedge_policy
+        self.compress_level = compress_level
+        self.compress_threads = compress_threads
 
         # There are use cases when the client needs to disable timeouts.
         if connect_timeout is not None:
@@ -179,6 +189,13 @@ class HttpClient(Client):
                 self._setting_status('http_headers_progress_interval_ms').is_writable:
             self._progress_interval = str(min(120000, max(10000, (send_receive_timeout - 5) * 1000)))
 
+    def insert_compressor(self, compression: Optional[str]):
+        """
+        :param compression: Insert compression method
+        :return: A new Compressor for one insert stream with the client compression level and zstd threads
+        """
+        return get_compressor(compression, self.compress_level, self.compress_threads)
+
     def set_client_setting(self, key, value):
         str_value = self._validate_setting(key, value, common.get_setting('invalid_setting_action'))
         if str_value is not None:
@@ -204,54 +221,49 @@ class HttpClient(Client):
 
     def _query_with_context(self, context: QueryContext) -> QueryResult:
         headers = {}
-        params = {}
-        if self.database:
-            params['database'] = self.database
-        if self.protocol_version:
-            params['client_protocol_version'] = self.protocol_version
-            context.block_info = True
-        params.update(context.bind_params)
-        params.update(self._validate_settings(context.settings))
-        if not context.is_insert and columns_only_re.search(context.uncommented_query):
+        params = query_params(self, context)
+        if columns_only(context):
             response = self._raw_request(f'{context.final_query}\n FORMAT JSON',
                                          params, headers, retries=self.query_retries)
-            json_result = json.loads(response.data)
-            # Timeplus will respond with a JSON object of meta, data, and some other objects
-            # We just grab the column names and column types from the metadata sub object
-            names: List[str] = []
-            types: List[TimeplusType] = []
-            for col in json_result['meta']:
-                names.append(col['name'])
-                types.append(registry.get_from_name(col['type']))
-            return QueryResult([], None, tuple(names), tuple(types))
-
-        if self.compression:
-            headers['Accept-Encoding'] = self.compression
-            if self._send_comp_setting:
-                params['enable_http_compression'] = '1'
-        final_query = self._prep_query(context)
-        if context.external_data:
-            body = bytes()
-            params['query'] = final_query
-            params.update(context.external_data.query_params)
-            fields = context.external_data.form_data
+            return columns_only_result(response.data)
+        body, fields = query_body(self, context, params, headers)
+        headers = dict_copy(headers, context.transport_settings)
+        if self.hedge_policy and not context.streaming and 'session_id' not in self.params and 'session_id' not in params:
+            response = self._hedged_request(body, params, headers, fields)
         else:
-            body = final_query
-            fields = None
-            headers['Content-Type'] = 'text/plain; charset=utf-8'
-        response = self._raw_request(body,
-                                     params,
-                                     dict_copy(headers, context.transport_settings),
-                                     stream=True,
-                                     retries=self.query_retries,
-                                     fields=fields,
-                                     server_wait=not context.streaming)
-        byte_source = RespBuffCls(ResponseSource(response))  # pylint: disable=not-callable
+            response = self._raw_request(body,
+                                         params,
+                                         headers,
+                                         stream=True,
+                                         retries=self.query_retries,
+                                         fields=fields,
+                                         server_wait=not context.streaming)
+        byte_source = ctypes.RespBuffCls(ResponseSource(response))  # pylint: disable=not-callable
         context.set_response_tz(self._check_tz_change(response.headers.get('x-timeplus-timezone')))
         query_result = self._transform.parse_response(byte_source, context)
         query_result.summary = self._summary(response)
         return query_result
 
+    def _hedged_request(self, body, params: Dict[str, str], headers: Dict[str, str], fields) -> HTTPResponse:
+        # Concurrent requests are not possible within a session, so hedged requests are only used without one
+        def request(query_id: str):
+            return self._raw_request(body,
+                                     dict_copy(params, {'query_id': query_id}),
+                                     headers,
+                                     stream=True,
+                                     retries=self.query_retries,
+                                     fields=fields)
+
+        return self.hedge_policy.execute(request, params.get('query_id') or str(uuid.uuid4()),
+                                         self._kill_query, HTTPResponse.close)
+
+    def _kill_query(self, query_id: str, endpoint: Optional[str] = None):
+        try:
+            self._raw_request(f'KILL QUERY WHERE query_id = {format_str(query_id)} ASYNC', {},
+                              endpoint=endpoint).close()
+        except Exception:  # pylint: disable=broad-except
+            logger.debug('Failed to kill query %s', query_id, exc_info=True)
+
     def data_insert(self, context: InsertContext) -> QuerySummary:
         """
         See BaseClient doc_string for this method
@@ -261,30 +273,55 @@ class HttpClient(Client):
             return QuerySummary()
 
         def error_handler(resp: HTTPResponse):
-            # If we actually had a local exception when building the insert, throw that instead
-            if context.insert_exception:
-                ex = context.insert_exception
-                context.insert_exception = None
+            ex = take_insert_exception(context)
+            if ex:
                 raise ex
             self._error_handler(resp)
 
-        headers = {'Content-Type': 'application/octet-stream'}
-        if context.compression is None:
-            context.compression = self.write_compression
-        if context.compression:
-            headers['Content-Encoding'] = context.compression
-        block_gen = self._transform.build_insert(context)
-
-        params = {}
-        if self.database:
-            params['database'] = self.database
-        params.update(self._validate_settings(context.settings))
-        headers = dict_copy(headers, context.transport_settings)
+        params, headers = insert_request(self, context)
+        block_gen = self._transform.build_insert(context, self.insert_compressor(context.compression), True)
+        if self.insert_spool:
+            return self._spooled_insert(context, block_gen, params, headers, error_handler)
         response = self._raw_request(block_gen, params, headers, error_handler=error_handler, server_wait=False)
         logger.debug('Context insert response code: %d, content: %s', response.status, response.data)
         context.data = None
         return QuerySummary(self._summary(response))
 
+    def _spooled_insert(self, context: InsertContext, block_gen, params: Dict[str, str], headers: Dict[str, str],
+                        error_handler: Callable) -> QuerySummary:
+        # The insert is streamed to the server as usual.  If the server is unavailable the insert is encoded again
+        # and streamed to the spool, so that the complete body is never held in memory
+        rows = context.row_count
+        dedup_setting = self.insert_spool.dedup_setting
+        if dedup_setting and dedup_setting not in params and dedup_setting in self.server_settings:
+            params[dedup_setting] = str(uuid.uuid4())
+        try:
+            response = self._raw_request(block_gen, params, headers, error_handler=error_handler, server_wait=False)
+        except OperationalError:
+            ex = take_insert_exception(context)
+            if ex:
+                raise ex from None
+            context.current_block = 0
+            context.current_row = 0
+            blocks = self._transform.build_insert(context, self.insert_compressor(context.compression), True)
+
+            def spool_blocks():
+                for block in blocks:
+                    block_ex = take_insert_exception(context)
+                    if block_ex:
+                        raise block_ex
+                    yield block
+
+            try:
+                self.insert_spool.write(SpoolEntry(context.table, context.compression or None, dict(params),
+                                                   dict(context.transport_settings or {}), spool_blocks()))
+            finally:
+                context.data = None
+            return QuerySummary({'spooled_rows': str(rows)})
+        logger.debug('Context insert response code: %d, content: %s', response.status, response.data)
+        context.data = None
+        return QuerySummary(self._summary(response))
+
     def raw_insert(self, table: str = None,
                    column_names: Optional[Sequence[str]] = None,
                    insert_block: Union[str, bytes, Generator[bytes, None, None], BinaryIO] = None,
@@ -295,23 +332,8 @@ class HttpClient(Client):
         """
         See BaseClient doc_string for this method
         """
-        params = {}
-        headers = {'Content-Type': 'application/octet-stream'}
-        if compression:
-            headers['Content-Encoding'] = compression
-        if table:
-            cols = f" ({', '.join([quote_identifier(x) for x in column_names])})" if column_names is not None else ''
-            query = f'INSERT INTO {table}{cols} FORMAT {fmt if fmt else self._write_format}'
-            if not compression and isinstance(insert_block, str):
-                insert_block = query + '\n' + insert_block
-            elif not compression and isinstance(insert_block, (bytes, bytearray, BinaryIO)):
-                insert_block = (query + '\n').encode() + insert_block
-            else:
-                params['query'] = query
-        if self.database:
-            params['database'] = self.database
-        params.update(self._validate_settings(settings or {}))
-        headers = dict_copy(headers, transport_settings)
+        insert_block, params, headers = raw_insert_request(self, table, column_names, insert_block, settings, fmt,
+                                                           compression, transport_settings)
         response = self._raw_request(insert_block, params, headers, server_wait=False)
         logger.debug('Raw insert response code: %d, content: %s', response.status, response.data)
         return QuerySummary(self._summary(response))
@@ -338,47 +360,13 @@ class HttpClient(Client):
         """
         See BaseClient doc_string for this method
         """
-        cmd, params = bind_query(cmd, parameters, self.server_tz)
-        headers = {}
-        payload = None
-        fields = None
-        if external_data:
-            if data:
-                raise ProgrammingError('Cannot combine command data with external data') from None
-            fields = external_data.form_data
-            params.update(external_data.query_params)
-        elif isinstance(data, str):
-            headers['Content-Type'] = 'text/plain; charset=utf-8'
-            payload = data.encode()
-        elif isinstance(data, bytes):
-            headers['Content-Type'] = 'application/octet-stream'
-            payload = data
-        if payload is None and not cmd:
-            raise ProgrammingError('Command sent without query or recognized data') from None
-        if payload or fields:
-            params['query'] = cmd
-        else:
-            payload = cmd
-        if use_database and self.database:
-            params['database'] = self.database
-        params.update(self._validate_settings(settings or {}))
-        headers = dict_copy(headers, transport_settings)
-        method = 'POST' if payload or fields else 'GET'
+        payload, params, headers, method, fields = command_request(self, cmd, parameters, data, settings, use_database,
+                                                                   external_data, transport_settings)
         response = self._raw_request(payload, params, headers, method, fields=fields, server_wait=False)
-        if response.data:
-            try:
-                result = response.data.decode()[:-1].split('\t')
-                if len(result) == 1:
-                    try:
-                        return int(result[0])
-                    except ValueError:
-                        return result[0]
-                return result
-            except UnicodeDecodeError:
-                return str(response.data)
-        return QuerySummary(self._summary(response))
+        return command_result(response.data, self._summary(response))
 
     def _error_handler(self, response: HTTPResponse, retried: bool = False) -> None:
+        err_content = None
         if self.show_clickhouse_errors:
             try:
                 err_content = get_response_data(response)
@@ -386,20 +374,36 @@ class HttpClient(Client):
                 err_content = None
             finally:
                 response.close()
-
-            err_str = f'HTTPDriver for {self.url} returned response code {response.status}'
-            err_code = response.headers.get(ex_header)
-            if err_code:
-                err_str = f'HTTPDriver for {self.url} received Timeplus error code {err_code}'
-            if err_content:
-                err_msg = common.format_error(err_content.decode(errors='backslashreplace'))
-                if err_msg.startswith('Code'):
-                    err_str = f'{err_str}\n {err_msg}'
-        else:
-            err_str = 'The Timeplus server returned an error.'
-
+        err_str = self._error_message(response.status, response.headers, err_content)
         raise OperationalError(err_str) if retried else DatabaseError(err_str) from None
 
+    def _error_message(self, status: int, headers, err_content: Optional[bytes]) -> str:
+        if not self.show_clickhouse_errors:
+            return 'The Timeplus server returned an error.'
+        err_str = f'HTTPDriver for {self.url} returned response code {status}'
+        err_code = headers.get(ex_header)
+        if err_code:
+            err_str = f'HTTPDriver for {self.url} received Timeplus error code {err_code}'
+        if err_content:
+            err_msg = common.format_error(err_content.decode(errors='backslashreplace'))
+            if err_msg.startswith('Code'):
+                err_str = f'{err_str}\n {err_msg}'
+        return err_str
+
+    def _request_params(self, params: Dict[str, str], server_wait: bool) -> Dict[str, str]:
+        final_params = {}
+        if server_wait:
+            final_params['wait_end_of_query'] = '1'
+        # We can't actually read the progress headers, but we enable them so Timeplus sends something
+        # to keep the connection alive when waiting for long-running queries and (2) to get summary information
+        # if not streaming
+        if self._send_progress:
+            final_params['send_progress_in_http_headers'] = '1'
+        if self._progress_interval:
+            final_params['http_headers_progress_interval_ms'] = self._progress_interval
+        final_params = dict_copy(self.params, final_params)
+        return dict_copy(final_params, params)
+
     def _raw_request(self,
                      data,
                      params: Dict[str, str],
@@ -409,24 +413,15 @@ class HttpClient(Client):
                      stream: bool = False,
                      server_wait: bool = True,
                      fields: Optional[Dict[str, tuple]] = None,
-                     error_handler: Callable = None) -> HTTPResponse:
+                     error_handler: Callable = None,
+                     endpoint: Optional[str] = None) -> HTTPResponse:
         if isinstance(data, str):
             data = data.encode()
         headers = dict_copy(self.headers, headers)
         attempts = 0
-        final_params = {}
-        if server_wait:
-            final_params['wait_end_of_query'] = '1'
-        # We can't actually read the progress headers, but we enable them so Timeplus sends something
-        # to keep the connection alive when waiting for long-running queries and (2) to get summary information
-        # if not streaming
-        if self._send_progress:
-            final_params['send_progress_in_http_headers'] = '1'
-        if self._progress_interval:
-            final_params['http_headers_progress_interval_ms'] = self._progress_interval
-        final_params = dict_copy(self.params, final_params)
-        final_params = dict_copy(final_params, params)
-        url = f'{self.url}?{urlencode(final_params)}'
+        final_params = self._request_params(params, server_wait)
+        endpoint = endpoint or self.url
+        url = f'{endpoint}?{urlencode(final_params)}'
         kwargs = {
             'headers': headers,
             'timeout': self.timeout,
@@ -463,7 +458,7 @@ class HttpClient(Client):
                         logger.debug('Retrying remotely closed connection')
                         continue
                 logger.warning('Unexpected Http Driver Exception')
-                err_url = f' ({self.url})' if self.show_clickhouse_errors else ''
+                err_url = f' ({endpoint})' if self.show_clickhouse_errors else ''
                 raise OperationalError(f'Error {ex} executing HTTP request attempt {attempts}{err_url}') from ex
             finally:
                 if query_session:
@@ -0,0 +1,188 @@
+import json
+import re
+from typing import Optional, Dict, Any, Sequence, Union, List, Tuple, BinaryIO, TYPE_CHECKING
+
+from timeplus_connect.datatypes import registry
+from timeplus_connect.datatypes.base import TimeplusType
+from timeplus_connect.driver.binding import bind_query, quote_identifier
+from timeplus_connect.driver.common import dict_copy
+from timeplus_connect.driver.exceptions import ProgrammingError
+from timeplus_connect.driver.external import ExternalData
+from timeplus_connect.driver.insert import InsertContext
+from timeplus_connect.driver.query import QueryContext, QueryResult
+from timeplus_connect.driver.summary import QuerySummary
+
+if TYPE_CHECKING:
+    from timeplus_connect.driver.httpclient import HttpClient
+
+# Request building and response parsing shared by the HttpClient and the asyncio HTTP transport, which sends
+# requests built from the settings of an HttpClient
+
+# pylint: disable=protected-access
+
+columns_only_re = re.compile(r'LIMIT 0\s*$', re.IGNORECASE)
+ex_header = 'x-timeplus-exception-code'
+
+
+def query_params(client: 'HttpClient', context: QueryContext) -> Dict[str, str]:
+    params = {}
+    if client.database:
+        params['database'] = client.database
+    if client.protocol_version:
+        params['client_protocol_version'] = client.protocol_version
+        context.block_info = True
+    params.update(context.bind_params)
+    params.update(client._validate_settings(context.settings))
+    return params
+
+
+def columns_only(context: QueryContext) -> bool:
+    """
+    :return: True if the query only requests the result columns, which are read from a JSON format response
+    """
+    return not context.is_insert and not context.as_arrow and bool(columns_only_re.search(context.uncommented_query))
+
+
+def columns_only_result(json_data: Union[str, bytes]) -> QueryResult:
+    # Timeplus will respond with a JSON object of meta, data, and some other objects
+    # We just grab the column names and column types from the metadata sub object
+    json_result = json.loads(json_data)
+    names: List[str] = []
+    types: List[TimeplusType] = []
+    for col in json_result['meta']:
+        names.append(col['name'])
+        types.append(registry.get_from_name(col['type']))
+    return QueryResult([], None, tuple(names), tuple(types))
+
+
+def query_body(client: 'HttpClient',
+               context: QueryContext,
+               params: Dict[str, str],
+               headers: Dict[str, str]) -> Tuple[Union[str, bytes], Optional[Dict[str, tuple]]]:
+    """
+    Add the compression and query settings of a Native format query to the request params and headers
+    :return: The request body and the multipart form fields of any external data
+    """
+    if client.compression:
+        headers['Accept-Encoding'] = client.compression
+        if client._send_comp_setting:
+            params['enable_http_compression'] = '1'
+    final_query = client._prep_query(context)
+    if context.external_data:
+        params['query'] = final_query
+        params.update(context.external_data.query_params)
+        return bytes(), context.external_data.form_data
+    headers['Content-Type'] = 'text/plain; charset=utf-8'
+    return final_query, None
+
+
+def insert_request(client: 'HttpClient', context: InsertContext) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    :return: The request params and headers of a Native format insert.  Sets the context compression to the client
+      write compression if it is not set
+    """
+    headers = {'Content-Type': 'application/octet-stream'}
+    if context.compression is None:
+        context.compression = client.write_compression
+    if context.compression:
+        headers['Content-Encoding'] = context.compression
+    params = {}
+    if client.database:
+        params['database'] = client.database
+    params.update(client._validate_settings(context.settings))
+    return params, dict_copy(headers, context.transport_settings)
+
+
+def take_insert_exception(context: InsertContext) -> Optional[Exception]:
+    """
+    If we actually had a local exception when building the insert, it is raised instead of the server error
+    """
+    ex = context.insert_exception
+    context.insert_exception = None
+    return ex
+
+
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+def raw_insert_request(client: 'HttpClient',
+                       table: Optional[str],
+                       column_names: Optional[Sequence[str]],
+                       insert_block: Any,
+                       settings: Optional[Dict],
+                       fmt: Optional[str],
+                       compression: Optional[str],
+                       transport_settings: Optional[Dict[str, str]]) -> Tuple[Any, Dict[str, str], Dict[str, str]]:
+    """
+    :return: The request body, params and headers of a raw insert
+    """
+    params = {}
+    headers = {'Content-Type': 'application/octet-stream'}
+    if compression:
+        headers['Content-Encoding'] = compression
+    if table:
+        cols = f" ({', '.join([quote_identifier(x) for x in column_names])})" if column_names is not None else ''
+        query = f'INSERT INTO {table}{cols} FORMAT {fmt if fmt else client._write_format}'
+        if not compression and isinstance(insert_block, str):
+            insert_block = query + '\n' + insert_block
+        elif not compression and isinstance(insert_block, (bytes, bytearray, BinaryIO)):
+            insert_block = (query + '\n').encode() + insert_block
+        else:
+            params['query'] = query
+    if client.database:
+        params['database'] = client.database
+    params.update(client._validate_settings(settings or {}))
+    return insert_block, params, dict_copy(headers, transport_settings)
+
+
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+def command_request(client: 'HttpClient',
+                    cmd,
+                    parameters: Optional[Union[Sequence, Dict[str, Any]]],
+                    data: Union[str, bytes],
+                    settings: Optional[Dict],
+                    use_database: int,
+                    external_data: Optional[ExternalData],
+                    transport_settings: Optional[Dict[str, str]]):
+    """
+    :return: The request body, params, headers, method and multipart form fields of a command
+    """
+    cmd, params = bind_query(cmd, parameters, client.server_tz)
+    headers = {}
+    payload = None
+    fields = None
+    if external_data:
+        if data:
+            raise ProgrammingError('Cannot combine command data with external data') from None
+        fields = external_data.form_data
+        params.update(external_data.query_params)
+    elif isinstance(data, str):
+        headers['Content-Type'] = 'text/plain; charset=utf-8'
+        payload = data.encode()
+    elif isinstance(data, bytes):
+        headers['Content-Type'] = 'application/octet-stream'
+        payload = data
+    if payload is None and not cmd:
+        raise ProgrammingError('Command sent without query or recognized data') from None
+    if payload or fields:
+        params['query'] = cmd
+    else:
+        payload = cmd
+    if use_database and client.database:
+        params['database'] = client.database
+    params.update(client._validate_settings(settings or {}))
+    method = 'POST' if payload or fields else 'GET'
+    return payload, params, dict_copy(headers, transport_settings), method, fields
+
+
+def command_result(response_data: bytes, summary: Dict[str, Any]) -> Union[str, int, Sequence[str], QuerySummary]:
+    if response_data:
+        try:
+            result = response_data.decode()[:-1].split('\t')
+            if len(result) == 1:
+                try:
+                    return int(result[0])
+                except ValueError:
+                    return result[0]
+            return result
+        except UnicodeDecodeError:
+            return str(response_data)
+    return QuerySummary(summary)
@@ -5,6 +5,7 @@ import multiprocessing
 import os
 import sys
 import socket
+import threading
 import time
 from collections import deque
 from typing import Dict, Any, Optional, Tuple, Callable
@@ -16,6 +17,7 @@ import zstandard
 from urllib3.poolmanager import PoolManager, ProxyManager
 from urllib3.response import HTTPResponse
 
+from timeplus_connect.driver.common import StoppableQueue
 from timeplus_connect.driver.exceptions import ProgrammingError
 from timeplus_connect import common
 
@@ -189,35 +191,44 @@ def default_pool_manager():
     return get_pool_manager()
 
 
+READER_JOIN_TIMEOUT = 5.0  # seconds to wait for the read ahead thread when closing a response
+
+
+def _chunk_decompressor(compression: Optional[str]) -> Optional[Callable]:
+    decompress:Optional[Callable] = None
+    if compression == 'zstd':
+        zstd_decom = zstandard.ZstdDecompressor().decompressobj()
+
+        def zstd_decompress(c: deque) -> Tuple[bytes, int]:
+            chunk = c.popleft()
+            return zstd_decom.decompress(chunk), len(chunk)
+
+        decompress = zstd_decompress
+    elif compression == 'lz4':
+        lz4_decom = lz4.frame.LZ4FrameDecompressor()
+
+        def lz_decompress(c: deque) -> Tuple[Optional[bytes], int]:
+            read_amt = 0
+            data = c.popleft()
+            read_amt += len(data)
+            if lz4_decom.unused_data:
+                read_amt += len(lz4_decom.unused_data)
+                data = lz4_decom.unused_data + data
+            block = lz4_decom.decompress(data)
+            if lz4_decom.unused_data:
+                read_amt -= len(lz4_decom.unused_data)
+            return block, read_amt
+
+        decompress = lz_decompress
+    return decompress
+
+
 class ResponseSource:
     def __init__(self, response: HTTPResponse, chunk_size: int = 1024 * 1024):
         self.response = response
-        compression = response.headers.get('content-encoding')
-        decompress:Optional[Callable] = None
-        if compression == 'zstd':
-            zstd_decom = zstandard.ZstdDecompressor().decompressobj()
-
-            def zstd_decompress(c: deque) -> Tuple[bytes, int]:
-                chunk = c.popleft()
-                return zstd_decom.decompress(chunk), len(chunk)
-
-            decompress = zstd_decompress
-        elif compression == 'lz4':
-            lz4_decom = lz4.frame.LZ4FrameDecompressor()
-
-            def lz_decompress(c: deque) -> Tuple[Optional[bytes], int]:
-                read_amt = 0
-                data = c.popleft()
-                read_amt += len(data)
-                if lz4_decom.unused_data:
-                    read_amt += len(lz4_decom.unused_data)
-                    data = lz4_decom.unused_data + data
-                block = lz4_decom.decompress(data)
-                if lz4_decom.unused_data:
-                    read_amt -= len(lz4_decom.unused_data)
-                return block, read_amt
-
-            decompress = lz_decompress
+        self._reader = None
+        self._complete = False
+        decompress = _chunk_decompressor(response.headers.get('content-encoding'))
 
         buffer_size = common.get_setting('http_buffer_size')
 
@@ -231,6 +242,7 @@ class ResponseSource:
                     chunk = None
                     try:
                         chunk = next(read_gen, None) # Always try to read at least one chunk if there are any left
+                        self._complete = chunk is None
                     except Exception: # pylint: disable=broad-except
                         # By swallowing an unexpected exception reading the stream, we will let consumers decide how to
                         # handle the unexpected end of stream
@@ -253,10 +265,43 @@ class ResponseSource:
                 if chunk:
                     yield chunk
 
+        read_ahead = common.get_setting('http_read_ahead')
+        self.gen = self._start_read_ahead(buffered(), read_ahead) if read_ahead > 0 else buffered()
 
+    def _start_read_ahead(self, chunk_gen, read_ahead: int):
+        # Read and decompress the response on a background thread so network reads and decompression overlap
+        # with decoding on the consumer thread.  The bounded queue provides backpressure
+        self._queue = StoppableQueue(read_ahead)
+        self._reader = threading.Thread(target=self._read_ahead, args=(chunk_gen,),
+                                        name='tp_http_reader', daemon=True)
+        self._reader.start()
+        return self._queue.items()
 
-        self.gen = buffered()
+    def _read_ahead(self, chunk_gen):
+        try:
+            for chunk in chunk_gen:
+                if not self._queue.put(chunk):
+                    return
+        except Exception as ex:  # pylint: disable=broad-except
+            # Propagate decompression and other unexpected errors to the consumer thread
+            self._queue.put(ex)
+            return
+        self._queue.put(None)
 
     def close(self):
-        self.response.drain_conn()
+        complete = self._complete
+        if self._reader:
+            self._queue.stop()
+            if not complete:
+                # The reader thread may be blocked reading an unbounded streaming response, so shut down the
+                # connection to unblock it instead of waiting for more data
+                shutdown = getattr(self.response, 'shutdown', None)  # urllib3 2.3+
+                if shutdown:
+                    shutdown()
+                self.response.close()
+            self._reader.join(READER_JOIN_TIMEOUT)
+        if complete:
+            # Release the connection back to the pool.  An incomplete response may be an unbounded stream, so it
+            # is never drained
+            self.response.drain_conn()
         self.response.close()
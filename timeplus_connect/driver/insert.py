@@ -4,9 +4,9 @@ from typing import Iterable, Sequence, Optional, Any, Dict, NamedTuple, Generato
 
 from timeplus_connect.driver.binding import quote_identifier
 
-from timeplus_connect.driver.ctypes import data_conv
+from timeplus_connect.driver import ctypes
 from timeplus_connect.driver.context import BaseQueryContext
-from timeplus_connect.driver.options import np, pd, pd_time_test
+from timeplus_connect.driver.options import np, pd, pd_time_test, pl, arrow
 from timeplus_connect.driver.exceptions import ProgrammingError, DataError
 
 if TYPE_CHECKING:
@@ -16,6 +16,13 @@ logger = logging.getLogger(__name__)
 DEFAULT_BLOCK_BYTES = 1 << 21   # Try to generate blocks between 1MB and 2MB in raw size
 
 
+def _np_writable(col_type: 'TimeplusType', dtype) -> bool:
+    """
+    True if numpy columns of this dtype are written directly from the numpy buffer
+    """
+    return not col_type.low_card and dtype.kind in col_type.np_write_kinds
+
+
 class InsertBlock(NamedTuple):
     prefix: bytes
     column_count: int
@@ -76,6 +83,9 @@ class InsertContext(BaseQueryContext):
         if pd and isinstance(data, pd.DataFrame):
             data = self._convert_pandas(data)
             self.column_oriented = True
+        if pl and isinstance(data, pl.DataFrame):
+            data = self._convert_polars(data)
+            self.column_oriented = True
         if np and isinstance(data, np.ndarray):
             data = self._convert_numpy(data)
         if self.column_oriented:
@@ -108,7 +118,12 @@ class InsertContext(BaseQueryContext):
                 continue
             if self.column_oriented:
                 col_data = self._data[i]
-                if sample_freq == 1:
+                if pd and isinstance(col_data, pd.Categorical):
+                    # The categories are written as the LowCardinality dictionary
+                    d_size = d_type.data_size(col_data.categories.tolist() or [''])
+                elif arrow and isinstance(col_data, (arrow.Array, arrow.ChunkedArray)):
+                    d_size = d_type.data_size(col_data.take(list(range(0, self.row_count, sample_freq))).to_pylist())
+                elif sample_freq == 1:
                     d_size = d_type.data_size(col_data)
                 else:
                     sample = [col_data[j] for j in range(0, self.row_count, sample_freq)]
@@ -143,19 +158,33 @@ class InsertContext(BaseQueryContext):
         return [col[block_start: block_end] for col in self._block_columns]
 
     def _row_block_data(self, block_start, block_end):
-        return data_conv.pivot(self._block_rows, block_start, block_end)
+        return ctypes.data_conv.pivot(self._block_rows, block_start, block_end)
 
+    # pylint: disable=too-many-branches
     def _convert_pandas(self, df):
         data = []
         for df_col_name, col_name, ch_type in zip(df.columns, self.column_names, self.column_types):
             df_col = df[df_col_name]
+            if (ch_type.arrow_write or ch_type.low_card) and isinstance(df_col.dtype, getattr(pd, 'ArrowDtype', ())):
+                data.append(arrow.array(df_col.array))
+                continue
+            if ch_type.low_card and isinstance(df_col.dtype, pd.CategoricalDtype):
+                # Written directly from the categories and codes
+                data.append(df_col.array)
+                continue
             d_type_kind = df_col.dtype.kind
             if ch_type.python_type == int:
                 if d_type_kind == 'f':
                     df_col = df_col.round().astype(ch_type.pd_type, copy=False)
                 elif d_type_kind in ('i', 'u') and not df_col.hasnans:
-                    data.append(df_col.to_list())
+                    np_col = df_col.to_numpy()
+                    data.append(np_col if _np_writable(ch_type, np_col.dtype) else df_col.to_list())
                     continue
+            elif d_type_kind == 'M' and _np_writable(ch_type, df_col.dtype):
+                if getattr(df_col.dtype, 'tz', None) is not None:
+                    df_col = df_col.dt.tz_convert(None)
+                data.append(df_col.to_numpy())
+                continue
             elif 'datetime' in ch_type.np_type and (pd_time_test(df_col) or 'datetime64[ns' in str(df_col.dtype)):
                 div = ch_type.nano_divisor
                 data.append([None if pd.isnull(x) else x.value // div for x in df_col])
@@ -174,8 +203,36 @@ class InsertContext(BaseQueryContext):
             data.append(df_col.to_numpy(copy=False))
         return data
 
+    def _convert_polars(self, df):
+        data = []
+        for pl_col, ch_type in zip(df.get_columns(), self.column_types):
+            dtype = pl_col.dtype
+            if ch_type.arrow_write and dtype.is_decimal():
+                data.append(pl_col.to_arrow())
+                continue
+            if ch_type.low_card and dtype in (pl.Categorical, pl.Enum):
+                data.append(pl_col.to_arrow())
+                continue
+            if ch_type.arrow_write and ch_type.python_type == list and dtype in (pl.List, pl.Array):
+                # Written directly from the Arrow offsets and values
+                data.append(pl_col.to_arrow())
+                continue
+            if dtype in (pl.Date, pl.Datetime) or (dtype.is_numeric() and not pl_col.has_nulls()):
+                # Temporal nulls become NaT, which is written as NULL
+                np_col = pl_col.to_numpy()
+                if _np_writable(ch_type, np_col.dtype):
+                    data.append(np_col)
+                    continue
+            data.append(pl_col.to_list())
+        return data
+
+    # pylint: disable=too-many-branches
     def _convert_numpy(self, np_array):
         if np_array.dtype.names is None:
+            if all(_np_writable(col_type, np_array.dtype) for col_type in self.column_types):
+                data = list(np_array) if self.column_oriented else list(np_array.T)
+                self.column_oriented = True
+                return data
             if 'date' in str(np_array.dtype):
                 for col_name, col_type in zip(self.column_names, self.column_types):
                     if 'date' in col_type.np_type:
@@ -193,6 +250,8 @@ class InsertContext(BaseQueryContext):
             data = [np_array[col_name] for col_name in np_array.dtype.names]
         for ix, (col_name, col_type) in enumerate(zip(self.column_names, self.column_types)):
             d_type = data[ix].dtype
+            if _np_writable(col_type, d_type):
+                continue
             if 'date' in str(d_type) and 'date' in col_type.np_type:
                 self.column_formats[col_name] = 'int'
                 data[ix] = data[ix].astype(int).tolist()
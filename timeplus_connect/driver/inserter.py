@@ -0,0 +1,299 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Optional, Sequence, Any, Dict, List, Callable, NamedTuple, Union, Deque
+
+from timeplus_connect.datatypes.base import TimeplusType
+from timeplus_connect.driver.client import Client
+from timeplus_connect.driver.exceptions import ProgrammingError, OperationalError
+from timeplus_connect.driver.insert import InsertContext
+from timeplus_connect.driver.models import full_table_name
+from timeplus_connect.driver.summary import QuerySummary
+
+logger = logging.getLogger(__name__)
+
+_SAMPLE_SIZE = 16
+
+
+class FlushStats(NamedTuple):
+    table: str
+    rows: int
+    est_bytes: int
+    latency: float  # Seconds between the oldest row being buffered and the completion of the insert
+    duration: float  # Seconds spent on the insert request
+    summary: Optional[QuerySummary]
+    error: Optional[Exception]
+
+
+class _StreamBuffer:
+    __slots__ = 'context', 'columns', 'rows', 'bytes', 'row_size', 'first_time'
+
+    def __init__(self, context: InsertContext):
+        self.context = context
+        self.columns: List[List[Any]] = [[] for _ in context.column_names]
+        self.rows = 0
+        self.bytes = 0
+        self.row_size = 0
+        self.first_time = 0.0
+
+    def estimate_row_size(self, columns: Sequence[Sequence[Any]]):
+        row_size = 0
+        for col_type, column in zip(self.context.column_types, columns):
+            row_size += col_type.byte_size or col_type.data_size(column[:_SAMPLE_SIZE])
+        self.row_size = max(row_size, 1)
+
+    def take(self):
+        batch = self.columns, self.rows, self.bytes, self.first_time
+        self.columns = [[] for _ in self.context.column_names]
+        self.rows = 0
+        self.bytes = 0
+        return batch
+
+
+# pylint: disable=too-many-instance-attributes
+class BufferedInserter:
+    """
+    Thread safe insert buffer for high rate ingestion of small batches or single rows.  Data for each target stream
+    is accumulated in column oriented buffers and sent with a single reusable InsertContext by a background thread
+    when the buffered row count or estimated size for the stream reaches its limit, or when the oldest buffered row
+    reaches the maximum latency.  Producers block when the total estimated size of buffered and in flight data exceeds
+    max_buffer_bytes.  Insert errors do not stop the inserter, but are reported to the on_flush callback, recorded in
+    recent_flushes, and raised by the next call to flush or close
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self,
+                 client: Client,
+                 max_rows: int = 100000,
+                 max_bytes: int = 16 * 1024 * 1024,
+                 max_latency: float = 1.0,
+                 max_buffer_bytes: int = 256 * 1024 * 1024,
+                 on_flush: Optional[Callable[[FlushStats], None]] = None,
+                 stats_history: int = 1000):
+        """
+        :param client: Timeplus Connect Client used for all inserts.  The client should not be used concurrently
+          for queries in the same session by other threads
+        :param max_rows: Buffered rows for a single stream that trigger a flush of that stream
+        :param max_bytes: Estimated buffered bytes for a single stream that trigger a flush of that stream
+        :param max_latency: Maximum time in seconds that a row is buffered before its stream is flushed
+        :param max_buffer_bytes: Estimated total bytes of buffered and in flight data before producers are blocked
+        :param on_flush: Optional callback invoked on the flush thread with the FlushStats of every insert
+        :param stats_history: Number of FlushStats retained in recent_flushes
+        """
+        self.client = client
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_latency = max_latency
+        self.max_buffer_bytes = max_buffer_bytes
+        self.on_flush = on_flush
+        self.recent_flushes: Deque[FlushStats] = deque(maxlen=stats_history)
+        self.total_rows = 0
+        self.failed_rows = 0
+        self.flush_count = 0
+        self._streams: Dict[str, _StreamBuffer] = {}
+        self._lock = threading.Lock()
+        self._client_lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._flushed = threading.Condition(self._lock)
+        self._buffered_bytes = 0
+        self._blocked = 0
+        self._requested = 0
+        self._completed = 0
+        self._errors: List[Exception] = []
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='tp_buffered_insert', daemon=True)
+        self._thread.start()
+
+    # pylint: disable=too-many-arguments
+    def add_stream(self,
+                   table: str,
+                   column_names: Optional[Union[str, Sequence[str]]] = '*',
+                   database: Optional[str] = None,
+                   column_types: Sequence[TimeplusType] = None,
+                   column_type_names: Sequence[str] = None,
+                   settings: Optional[Dict[str, Any]] = None,
+                   transport_settings: Optional[Dict[str, str]] = None) -> str:
+        """
+        Register a target stream.  Streams that are not registered are added with all columns on the first insert.
+        For parameters see the Client create_insert_context method
+        :return: The key used for the stream by the insert methods (the table name qualified by database if set)
+        """
+        key = full_table_name(table, database) if database else table
+        if key in self._streams:
+            return key
+        with self._client_lock:
+            context = self.client.create_insert_context(table,
+                                                        column_names,
+                                                        database,
+                                                        column_types,
+                                                        column_type_names,
+                                                        column_oriented=True,
+                                                        settings=settings,
+                                                        transport_settings=transport_settings)
+        with self._lock:
+            self._streams.setdefault(key, _StreamBuffer(context))
+        return key
+
+    def insert_row(self, table: str, row: Sequence[Any], timeout: Optional[float] = None):
+        """
+        Buffer a single row
+        :param table: Stream key returned by add_stream, or a stream name to register with default settings
+        :param row: Sequence of column values in stream column order
+        :param timeout: Maximum seconds to wait for buffer space, or None to wait indefinitely
+        """
+        self._append(table, [[value] for value in row], 1, timeout)
+
+    def insert_rows(self, table: str, rows: Sequence[Sequence[Any]], timeout: Optional[float] = None):
+        """
+        Buffer a sequence of rows.  See insert_row for parameters
+        """
+        if rows:
+            self._append(table, list(zip(*rows)), len(rows), timeout)
+
+    def insert_columns(self, table: str, columns: Sequence[Sequence[Any]], timeout: Optional[float] = None):
+        """
+        Buffer column oriented data.  See insert_row for parameters
+        """
+        if columns and len(columns[0]):
+            self._append(table, columns, len(columns[0]), timeout)
+
+    def _append(self, table: str, columns: Sequence[Sequence[Any]], count: int, timeout: Optional[float]):
+        buffer = self._streams.get(table)
+        if buffer is None:
+            buffer = self._streams[self.add_stream(table)]
+        if len(columns) != len(buffer.columns):
+            raise ProgrammingError(f'Insert data column count does not match columns for stream {table}')
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            if self._closed:
+                raise ProgrammingError('BufferedInserter is closed')
+            if not buffer.row_size:
+                buffer.estimate_row_size(columns)
+            size = count * buffer.row_size
+            while self._buffered_bytes and self._buffered_bytes + size > self.max_buffer_bytes:
+                # Blocked producers trigger a flush of all streams so that buffer space is released
+                self._wake.notify()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                self._blocked += 1
+                try:
+                    if remaining is not None and remaining <= 0 or not self._not_full.wait(remaining):
+                        raise OperationalError('Timed out waiting for BufferedInserter buffer space')
+                finally:
+                    self._blocked -= 1
+                if self._closed:
+                    raise ProgrammingError('BufferedInserter is closed')
+            if not buffer.rows:
+                buffer.first_time = time.monotonic()
+                self._wake.notify()  # The flush thread must recalculate its max latency wait
+            for target, values in zip(buffer.columns, columns):
+                target.extend(values)
+            buffer.rows += count
+            buffer.bytes += size
+            self._buffered_bytes += size
+            if buffer.rows >= self.max_rows or buffer.bytes >= self.max_bytes:
+                self._wake.notify()
+
+    def flush(self, timeout: Optional[float] = None):
+        """
+        Send all currently buffered data and wait for the inserts to complete
+        :param timeout: Maximum seconds to wait, or None to wait indefinitely
+        """
+        with self._lock:
+            self._requested += 1
+            target = self._requested
+            self._wake.notify()
+            if not self._flushed.wait_for(lambda: self._completed >= target or not self._thread.is_alive(), timeout):
+                raise OperationalError('Timed out waiting for BufferedInserter flush')
+            self._raise_errors()
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        Flush all buffered data and stop the background thread
+        :param timeout: Maximum seconds to wait for the final inserts
+        """
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._wake.notify()
+                self._not_full.notify_all()
+        self._thread.join(timeout)
+        with self._lock:
+            self._raise_errors()
+
+    def _raise_errors(self):
+        if self._errors:
+            ex = self._errors[0]
+            self._errors = []
+            raise ex
+
+    def _ready(self, now: float, flush_all: bool) -> List[_StreamBuffer]:
+        return [buffer for buffer in self._streams.values() if buffer.rows and
+                (flush_all or buffer.rows >= self.max_rows or buffer.bytes >= self.max_bytes or
+                 now - buffer.first_time >= self.max_latency)]
+
+    def _next_wait(self, now: float) -> Optional[float]:
+        oldest = [buffer.first_time for buffer in self._streams.values() if buffer.rows]
+        if not oldest:
+            return None
+        return max(0.0, min(oldest) + self.max_latency - now)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while True:
+                    flush_requested = self._closed or self._requested > self._completed
+                    requested = self._requested
+                    # Blocked producers only need a flush if there is buffered data, otherwise they are waiting
+                    # for a flush in progress to release buffer space
+                    ready = self._ready(time.monotonic(), flush_requested or self._blocked > 0)
+                    if ready or flush_requested:
+                        break
+                    self._wake.wait(self._next_wait(time.monotonic()))
+                batches = [(buffer, buffer.take()) for buffer in ready]
+                done = self._closed and not batches
+            for buffer, batch in batches:
+                self._insert(buffer, *batch)
+            with self._lock:
+                self._buffered_bytes -= sum(batch[2] for _, batch in batches)
+                self._completed = max(self._completed, requested)
+                self._not_full.notify_all()
+                self._flushed.notify_all()
+            if done:
+                return
+
+    def _insert(self, buffer: _StreamBuffer, columns: List[List[Any]], rows: int, est_bytes: int, first_time: float):
+        context = buffer.context
+        start = time.monotonic()
+        summary = None
+        error = None
+        try:
+            context.data = columns
+            with self._client_lock:
+                summary = self.client.data_insert(context)
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.error('Buffered insert of %d rows into %s failed', rows, context.table, exc_info=True)
+            context.data = None
+            error = ex
+        end = time.monotonic()
+        stats = FlushStats(context.table, rows, est_bytes, end - first_time, end - start, summary, error)
+        with self._lock:
+            self.flush_count += 1
+            if error:
+                self.failed_rows += rows
+                self._errors.append(error)
+            else:
+                self.total_rows += rows
+            self.recent_flushes.append(stats)
+        if self.on_flush:
+            try:
+                self.on_flush(stats)
+            except Exception:  # pylint: disable=broad-except
+                logger.warning('BufferedInserter on_flush callback failed', exc_info=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
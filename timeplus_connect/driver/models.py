@@ -1,6 +1,13 @@
-from typing import NamedTuple
+from typing import NamedTuple, Optional, Union, Sequence, Dict, Any, List, TYPE_CHECKING
 
 from timeplus_connect.datatypes.registry import get_from_name
+from timeplus_connect.datatypes.base import TimeplusType
+from timeplus_connect.driver.binding import quote_identifier
+from timeplus_connect.driver.exceptions import ProgrammingError
+from timeplus_connect.driver.insert import InsertContext
+
+if TYPE_CHECKING:
+    from timeplus_connect.driver.query import QueryResult
 
 
 class ColumnDef(NamedTuple):
@@ -39,3 +46,54 @@ class SettingStatus(NamedTuple):
     """
     is_set: bool
     is_writable: bool
+
+
+def full_table_name(table: str, database: Optional[str] = None) -> str:
+    if '.' in table:
+        return table
+    if database:
+        return f'{quote_identifier(database)}.{quote_identifier(table)}'
+    return quote_identifier(table)
+
+
+def insert_column_defs(describe_result: 'QueryResult') -> List[ColumnDef]:
+    return [ColumnDef(**row) for row in describe_result.named_results()
+            if row['default_type'] not in ('ALIAS', 'MATERIALIZED')]
+
+
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+def build_insert_context(table: str,
+                         full_table: str,
+                         column_defs: List[ColumnDef],
+                         column_names: Optional[Union[str, Sequence[str]]] = None,
+                         column_types: Sequence[TimeplusType] = None,
+                         column_type_names: Sequence[str] = None,
+                         column_oriented: bool = False,
+                         settings: Optional[Dict[str, Any]] = None,
+                         data: Optional[Sequence[Sequence[Any]]] = None,
+                         transport_settings: Optional[Dict[str, str]] = None) -> InsertContext:
+    if column_names is None or isinstance(column_names, str) and column_names == '*':
+        column_names = [cd.name for cd in column_defs]
+        column_types = [cd.ch_type for cd in column_defs]
+    elif isinstance(column_names, str):
+        column_names = [column_names]
+    if len(column_names) == 0:
+        raise ValueError('Column names must be specified for insert')
+    if not column_types:
+        if column_type_names:
+            column_types = [get_from_name(name) for name in column_type_names]
+        else:
+            column_map = {d.name: d for d in column_defs}
+            try:
+                column_types = [column_map[name].ch_type for name in column_names]
+            except KeyError as ex:
+                raise ProgrammingError(f'Unrecognized column {ex} in table {table}') from None
+    if len(column_names) != len(column_types):
+        raise ProgrammingError('Column names do not match column types') from None
+    return InsertContext(full_table,
+                         column_names,
+                         column_types,
+                         column_oriented=column_oriented,
+                         settings=settings,
+                         transport_settings=transport_settings,
+                         data=data)
@@ -5,5 +5,9 @@ from timeplus_connect.driver.types import ByteSource
 
 def read_numpy_array(source: ByteSource, np_type: str, num_rows: int):
     dtype = np.dtype(np_type)
-    buffer = source.read_bytes(dtype.itemsize * num_rows)
-    return np.frombuffer(buffer, dtype, num_rows)
+    buffer = source.read_view(dtype.itemsize * num_rows)
+    column = np.frombuffer(buffer, dtype, num_rows)
+    if not column.flags.aligned:
+        # A view into the middle of a response chunk may not be aligned for the dtype
+        return column.copy()
+    return column
@@ -7,9 +7,22 @@ from timeplus_connect.driver.exceptions import StreamClosedError
 from timeplus_connect.driver.types import Closable
 from timeplus_connect.driver.options import np, pd
 
+try:
+    from pandas.api.types import union_categoricals
+except ImportError:
+    union_categoricals = None
+
 logger = logging.getLogger(__name__)
 
 
+def _concat_series(series: Sequence):
+    first = series[0].dtype
+    if all(isinstance(s.dtype, pd.CategoricalDtype) for s in series) and any(s.dtype != first for s in series[1:]):
+        # Blocks with different LowCardinality dictionaries would otherwise be concatenated as object columns
+        return pd.Series(union_categoricals(series))
+    return pd.concat(series, copy=False, ignore_index=True)
+
+
 # pylint: disable=too-many-instance-attributes
 class NumpyResult(Closable):
     def __init__(self,
@@ -103,7 +116,7 @@ class NumpyResult(Closable):
         for c in chains:
             series = [pd.Series(piece, copy=False) for piece in c if len(piece) > 0]
             if len(series) > 0:
-                new_df_series.append(pd.concat(series, copy=False, ignore_index=True))
+                new_df_series.append(_concat_series(series))
         self._df_result = pd.DataFrame(dict(zip(self.column_names, new_df_series)))
         self.close()
         return self
@@ -0,0 +1,193 @@
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, tzinfo
+from typing import Optional, Sequence, Tuple, List, Callable, Any, Dict, Union, TYPE_CHECKING
+
+import pytz
+
+from timeplus_connect.driver.binding import format_query_value
+from timeplus_connect.driver.common import StreamContext, StoppableQueue
+from timeplus_connect.driver.exceptions import ProgrammingError, DatabaseError
+from timeplus_connect.driver.options import check_numpy, check_pandas, check_arrow
+
+if TYPE_CHECKING:
+    from timeplus_connect.driver.client import Client
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+_UNKNOWN_IDENTIFIER_RE = re.compile(r'(?:error code |Code: )47\b')
+
+
+def partition_conditions(partitions: int,
+                         shard_expression: Optional[str] = None,
+                         modulo_key: Optional[str] = None,
+                         time_range: Optional[Tuple[datetime, datetime]] = None,
+                         time_column: str = '_tp_time',
+                         server_tz: tzinfo = pytz.UTC) -> List[str]:
+    """
+    Build the filter conditions that split a query into disjoint partitions.  Exactly one of shard_expression,
+    modulo_key, or time_range must be set
+    :param partitions: Number of partitions
+    :param shard_expression: Expression that evaluates to the partition number (0 to partitions - 1) of each row
+    :param modulo_key: Integer expression whose absolute value modulo partitions is the partition number of each row
+    :param time_range: Start (inclusive) and end (exclusive) datetimes, split into equal windows of time_column
+    :param time_column: Column or expression filtered by the time_range windows
+    :param server_tz: Server timezone used to format the window boundaries
+    :return: List of condition strings, one per partition
+    """
+    if partitions < 1:
+        raise ProgrammingError('At least one query partition is required')
+    if sum(x is not None for x in (shard_expression, modulo_key, time_range)) != 1:
+        raise ProgrammingError('Exactly one of shard_expression, modulo_key, or time_range must be specified')
+    if shard_expression:
+        return [f'({shard_expression}) = {ix}' for ix in range(partitions)]
+    if modulo_key:
+        # The modulo function is used instead of % to avoid conflicts with query parameter formatting.  It keeps the
+        # sign of the dividend, so the key is made non-negative first to keep rows with negative keys in a partition
+        return [f'modulo(abs({modulo_key}), {partitions}) = {ix}' for ix in range(partitions)]
+    start, end = time_range
+    if end <= start:
+        raise ProgrammingError('Query partition time_range end must be after start')
+    step = (end - start) / partitions
+    bounds = [format_query_value(start + step * ix, server_tz) for ix in range(partitions)]
+    bounds.append(format_query_value(end, server_tz))
+    return [f'{time_column} >= {bounds[ix]} AND {time_column} < {bounds[ix + 1]}' for ix in range(partitions)]
+
+
+def partition_query(query: str, condition: str) -> str:
+    """
+    Wrap a query as a subquery filtered by a partition condition.  The condition is applied to the query result, so
+    the columns it uses must be selected by the query
+    """
+    return f'SELECT * FROM ({query.strip().rstrip(";")}) WHERE {condition}'
+
+
+def _partition_error(ex: Exception) -> Exception:
+    if isinstance(ex, DatabaseError) and _UNKNOWN_IDENTIFIER_RE.search(str(ex)):
+        error = ProgrammingError('Parallel query partition failed with an unknown identifier.  The partition ' +
+                                 'condition filters the query result, so the query must select every column used ' +
+                                 f'by the partition expression: {ex}')
+        error.__cause__ = ex
+        return error
+    return ex
+
+
+def _fmt_methods(client: 'Client', fmt: str) -> Tuple[Callable, Callable, Callable[[List[Any]], Any]]:
+    if fmt == 'np':
+        np = check_numpy()
+        return client.query_np, client.query_np_stream, np.concatenate
+    if fmt == 'df':
+        pd = check_pandas()
+        return client.query_df, client.query_df_stream, lambda dfs: pd.concat(dfs, ignore_index=True)
+    if fmt == 'arrow':
+        arrow = check_arrow()
+        return client.query_arrow, client.query_arrow_stream, arrow.concat_tables
+    raise ProgrammingError(f'Unsupported parallel query format {fmt}, must be one of np, df, or arrow')
+
+
+# pylint: disable=too-many-instance-attributes
+class ParallelQuery:
+    """
+    Runs the partitions of a query concurrently on a client's connection pool
+    """
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(self,
+                 client: 'Client',
+                 query: str,
+                 conditions: Sequence[str],
+                 fmt: str = 'df',
+                 max_workers: Optional[int] = None,
+                 query_args: Optional[Dict[str, Any]] = None):
+        if client.get_client_setting('session_id'):
+            raise ProgrammingError('Parallel queries cannot run within a session.  Use a client created with ' +
+                                   'autogenerate_session_id=False and no session_id')
+        self.client = client
+        self.queries = [partition_query(query, condition) for condition in conditions]
+        self.query_fn, self.stream_fn, self.concat = _fmt_methods(client, fmt)
+        self.max_workers = min(max_workers or len(self.queries), len(self.queries))
+        self.query_args = query_args or {}
+        self._queue = StoppableQueue(self.max_workers * 2)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def result(self):
+        """
+        :return: The results of all partitions concatenated in partition order
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='tp_parallel') as executor:
+            futures = [executor.submit(self.query_fn, query, **self.query_args) for query in self.queries]
+            try:
+                results = [future.result() for future in futures]
+            except Exception as ex:
+                for future in futures:
+                    future.cancel()
+                error = _partition_error(ex)
+                if error is ex:
+                    raise
+                raise error from ex
+        return self.concat(results)
+
+    def stream(self) -> StreamContext:
+        """
+        :return: StreamContext yielding the result blocks of all partitions in the order they are received
+        """
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='tp_parallel')
+        for query in self.queries:
+            self._executor.submit(self._stream_partition, query)
+        return StreamContext(self, self._blocks())
+
+    def _stream_partition(self, query: str):
+        try:
+            if self._queue.stopped:
+                return
+            with self.stream_fn(query, **self.query_args) as stream:
+                for block in stream:
+                    if not self._queue.put(block):
+                        return
+        except Exception as ex:  # pylint: disable=broad-except
+            self._queue.put(_partition_error(ex))
+            return
+        self._queue.put(_END)
+
+    def _blocks(self):
+        remaining = len(self.queries)
+        while remaining:
+            item = self._queue.get()
+            if item is _END:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+
+    def close(self):
+        self._queue.stop()
+        if self._executor:
+            self._executor.shutdown(wait=True)  # Queued partitions return immediately once stopped
+            self._executor = None
+
+
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+def partitioned_query(client: 'Client',
+                      query: str,
+                      partitions: int,
+                      fmt: str,
+                      shard_expression: Optional[str],
+                      modulo_key: Optional[str],
+                      time_range: Optional[Sequence[datetime]],
+                      time_column: str,
+                      max_workers: Optional[int],
+                      parameters: Optional[Union[Sequence, Dict[str, Any]]],
+                      settings: Optional[Dict[str, Any]],
+                      transport_settings: Optional[Dict[str, str]]) -> ParallelQuery:
+    """
+    Build the ParallelQuery for the Client parallel_query methods
+    """
+    conditions = partition_conditions(partitions, shard_expression, modulo_key, time_range, time_column,
+                                      client.server_tz)
+    query_args = {'parameters': parameters,
+                  'settings': settings,
+                  'transport_settings': transport_settings}
+    return ParallelQuery(client, query, conditions, fmt, max_workers, query_args)
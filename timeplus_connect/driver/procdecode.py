@@ -0,0 +1,134 @@
+import logging
+import sys
+import threading
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Optional, Tuple, Sequence
+
+from timeplus_connect import common
+from timeplus_connect.datatypes.base import TimeplusType
+from timeplus_connect.driver.options import np, pd
+from timeplus_connect.driver.query import QueryContext
+
+logger = logging.getLogger(__name__)
+
+MIN_PROCESS_BYTES = 1 << 20  # Smaller columns are decoded in the calling process
+
+_pool_lock = threading.Lock()
+_process_pool: Optional[Tuple[int, ProcessPoolExecutor]] = None
+
+
+def decode_process_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    :return: The shared process pool for column decoding if the decode_processes common setting is at least 2
+    """
+    global _process_pool  # pylint: disable=global-statement
+    processes = common.get_setting('decode_processes')
+    if processes < 2:
+        return None
+    with _pool_lock:
+        if _process_pool is None or _process_pool[0] != processes:
+            if _process_pool:
+                _process_pool[1].shutdown(wait=False)
+            _process_pool = processes, ProcessPoolExecutor(max_workers=processes)
+        return _process_pool[1]
+
+
+def _shared_memory(name: Optional[str] = None, size: int = 0) -> SharedMemory:
+    # Segment lifetime is managed explicitly (the receiving process unlinks it as soon as it is mapped), so the
+    # segments must not be tracked by the multiprocessing resource tracker of the creating process.  Before Python
+    # 3.13 attaching also registers the segment, and that registration is removed again by SharedMemory.unlink
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name, create=name is None, size=size, track=False)  # pylint: disable=unexpected-keyword-arg
+    shm = SharedMemory(name, create=name is None, size=size)
+    if name is None:
+        resource_tracker.unregister(shm._name, 'shared_memory')  # pylint: disable=protected-access
+    return shm
+
+
+class SharedColumn:
+    """
+    Reference to a numpy column decoded in a worker process and stored in a shared memory segment.  Timezone aware
+    pandas datetimes are shared as their UTC datetime64 values and the name of the timezone
+    """
+    __slots__ = 'name', 'dtype', 'shape', 'tz'
+
+    def __init__(self, name: str, dtype: str, shape: tuple, tz: Optional[str] = None):
+        self.name = name
+        self.dtype = dtype
+        self.shape = shape
+        self.tz = tz
+
+    @classmethod
+    def share(cls, column: 'np.ndarray', tz: Optional[str] = None) -> 'SharedColumn':
+        shm = _shared_memory(size=max(column.nbytes, 1))
+        try:
+            np.ndarray(column.shape, column.dtype, buffer=shm.buf)[...] = column
+            return cls(shm.name, column.dtype.str, column.shape, tz)
+        finally:
+            shm.close()
+
+    def attach(self) -> Sequence:
+        """
+        Map the shared segment into this process without copying.  The segment name is removed immediately, and
+        the mapping is released when the returned array is garbage collected
+        """
+        shm = _shared_memory(self.name)
+        shm.unlink()
+        column = np.ndarray(self.shape, np.dtype(self.dtype), buffer=shm.buf)
+        weakref.finalize(column, shm.close)
+        if self.tz:
+            return pd.DatetimeIndex(column, tz='UTC').tz_convert(self.tz)
+        return column
+
+    def unlink(self):
+        """
+        Remove a shared segment that will never be attached
+        """
+        shm = _shared_memory(self.name)
+        shm.close()
+        shm.unlink()
+
+
+def decode_column(col_type: TimeplusType, data: bytes, num_rows: int, context: QueryContext) -> Tuple[Any, bool]:
+    """
+    Worker process function that decodes the raw Native bytes of a column.  Fixed width numpy columns (including
+    timezone aware pandas datetimes) are returned through shared memory if they are large.  Other columns contain
+    Python objects, and unpickling those in the main process costs about as much as decoding them there, so they
+    are returned as is and the caller should decode the column locally in later blocks
+    :return: The decoded column or a SharedColumn, and True if the column is fixed width
+    """
+    # pylint: disable=import-outside-toplevel,cyclic-import
+    from timeplus_connect.driver.transform import _decode_raw_column
+    column = _decode_raw_column(col_type, data, num_rows, context)
+    tz = None
+    if pd is not None and isinstance(column, pd.DatetimeIndex) and column.tz is not None:
+        tz = str(column.tz)
+        column = column.tz_convert('UTC').tz_localize(None).to_numpy()
+    if np is None or type(column) is not np.ndarray or column.dtype.hasobject:  # pylint: disable=unidiomatic-typecheck
+        return column, False
+    if column.nbytes > 4096 or tz:
+        return SharedColumn.share(column, tz), True
+    return column, True
+
+
+def resolve_column(column: Optional[Sequence]) -> Optional[Sequence]:
+    if isinstance(column, SharedColumn):
+        return column.attach()
+    return column
+
+
+def discard_column(future: Future):
+    """
+    Release the shared memory segment (if any) of a decode_column result that will not be used
+    """
+    if future.cancel():
+        return
+    try:
+        column, _ = future.result()
+    except Exception:  # pylint: disable=broad-except
+        return
+    if isinstance(column, SharedColumn):
+        column.unlink()
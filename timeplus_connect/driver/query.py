@@ -53,7 +53,8 @@ class QueryContext(BaseQueryContext):
                  streaming: bool = False,
                  apply_server_tz: bool = False,
                  external_data: Optional[ExternalData] = None,
-                 transport_settings: Optional[Dict[str, str]] = None):
+                 transport_settings: Optional[Dict[str, str]] = None,
+                 as_arrow: bool = False):
         """
         Initializes various configuration settings for the query context
 
@@ -80,6 +81,7 @@ class QueryContext(BaseQueryContext):
           objects with the selected timezone
         :param column_tzs A dictionary of column names to tzinfo objects (or strings that will be converted to
           tzinfo objects).  The timezone will be applied to datetime objects returned in the query
+        :param as_arrow Decode the Native format response directly into PyArrow arrays
         """
         super().__init__(settings,
                          query_formats,
@@ -117,7 +119,10 @@ class QueryContext(BaseQueryContext):
         self.block_info = False
         self.as_pandas = as_pandas
         self.use_pandas_na = as_pandas and pd_extended_dtypes
+        self.as_arrow = as_arrow
         self.streaming = streaming
+        # Last LowCardinality dictionary of each column and its converted form, reused while blocks repeat it
+        self.lc_dictionaries = {}
         self._update_query()
 
     @property
@@ -192,7 +197,8 @@ class QueryContext(BaseQueryContext):
                      as_pandas: bool = False,
                      streaming: bool = False,
                      external_data: Optional[ExternalData] = None,
-                     transport_settings: Optional[Dict[str, str]] = None) -> 'QueryContext':
+                     transport_settings: Optional[Dict[str, str]] = None,
+                     as_arrow: bool = False) -> 'QueryContext':
         """
         Creates Query context copy with parameters overridden/updated as appropriate.
         """
@@ -214,7 +220,8 @@ class QueryContext(BaseQueryContext):
                             streaming,
                             self.apply_server_tz,
                             self.external_data if external_data is None else external_data,
-                            self.transport_settings if transport_settings is None else transport_settings)
+                            self.transport_settings if transport_settings is None else transport_settings,
+                            as_arrow)
 
     def _update_query(self):
         self.final_query, self.bind_params = bind_query(self.query, self.parameters, self.server_tz)
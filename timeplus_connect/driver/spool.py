@@ -0,0 +1,369 @@
+import json
+import logging
+import os
+import re
+import struct
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Iterable, Iterator, List, NamedTuple, Set, Tuple, Union
+
+from timeplus_connect.driver.exceptions import OperationalError, DatabaseError
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = '.seg'
+REJECTED_DIR = 'rejected'
+_MAGIC = b'TPS1'
+_ENTRY_HEAD = struct.Struct('<4sIQI')  # magic, header length, payload length, payload crc32
+_INCOMPLETE = b'\0\0\0\0'
+
+# Timeplus server error codes for failures that may succeed if the insert is sent again later
+RETRYABLE_ERROR_CODES = {159, 160, 164, 202, 203, 209, 210, 236, 241, 242, 252, 319, 394, 425, 999}
+_ERROR_CODE_RE = re.compile(r'(?:error code |Code: )(\d+)')
+_STATUS_RE = re.compile(r'response code (\d+)')
+
+
+class SpoolEntry(NamedTuple):
+    """
+    A complete insert request body (already Native encoded and compressed) and the metadata needed to resend it.
+    When writing an entry the payload may also be an iterable of body chunks, so that large inserts are streamed to
+    the spool instead of being held in memory
+    """
+    table: str
+    compression: Optional[str]
+    settings: Dict[str, Any]  # Includes the database of the insert, if any
+    transport_settings: Dict[str, str]
+    payload: Union[bytes, Iterable[bytes]]
+
+
+class ReplayStats(NamedTuple):
+    segments: int
+    inserts: int
+    rejected: int
+    complete: bool  # False if replay stopped because the server is still unavailable
+
+
+# pylint: disable=too-many-instance-attributes
+class InsertSpool:
+    """
+    Durable local spool of insert requests that failed because the Timeplus server was unavailable.  Entries are
+    appended to segment files in the spool directory.  The active segment is sealed when it reaches segment_size or
+    when a replay starts, and sealed segments are deleted once every entry has been replayed.  Each spooled insert
+    carries a deduplication token setting (if the server supports it) so that replaying an insert that was actually
+    received by the server before the failure does not duplicate the data
+    """
+
+    def __init__(self,
+                 directory: str,
+                 segment_size: int = 64 * 1024 * 1024,
+                 fsync: bool = True,
+                 dedup_setting: Optional[str] = 'insert_deduplication_token'):
+        """
+        :param directory: Spool directory, created if it does not exist
+        :param segment_size: Size in bytes after which the active segment is sealed and a new one is started
+        :param fsync: Flush each spooled entry to stable storage before the insert call returns
+        :param dedup_setting: Name of the server setting used to send a unique token with each spooled insert,
+          or None to disable deduplication tokens
+        """
+        self.directory = directory
+        self.segment_size = segment_size
+        self.fsync = fsync
+        self.dedup_setting = dedup_setting
+        os.makedirs(os.path.join(directory, REJECTED_DIR), exist_ok=True)
+        self._lock = threading.Lock()
+        self._active = None
+        self._active_path = None
+        self._active_size = 0
+        existing = self._segment_numbers()
+        self._next_segment = existing[-1] + 1 if existing else 0
+
+    def _segment_numbers(self) -> List[int]:
+        numbers = []
+        for name in os.listdir(self.directory):
+            if name.endswith(SEGMENT_SUFFIX):
+                try:
+                    numbers.append(int(name[:-len(SEGMENT_SUFFIX)]))
+                except ValueError:
+                    pass
+        return sorted(numbers)
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f'{number:020d}{SEGMENT_SUFFIX}')
+
+    def write(self, entry: SpoolEntry):
+        """
+        Append an insert request to the active segment.  If writing a streamed payload fails the partial entry is
+        removed and the exception is raised
+        """
+        header = json.dumps({'table': entry.table,
+                             'compression': entry.compression,
+                             'settings': entry.settings,
+                             'transport_settings': entry.transport_settings,
+                             'created': time.time()}).encode()
+        payload = entry.payload
+        if isinstance(payload, (bytes, bytearray)):
+            payload = (payload,)
+        with self._lock:
+            if self._active is None:
+                self._active_path = self._segment_path(self._next_segment)
+                self._next_segment += 1
+                self._active = open(self._active_path, 'wb')  # pylint: disable=consider-using-with
+                self._active_size = 0
+            active = self._active
+            start = active.tell()
+            # The entry is marked incomplete until the payload length and checksum are known, so that a crash
+            # while streaming the payload ends the segment at this entry
+            active.write(_ENTRY_HEAD.pack(_INCOMPLETE, len(header), 0, 0))
+            active.write(header)
+            payload_len = crc = 0
+            try:
+                for chunk in payload:
+                    active.write(chunk)
+                    payload_len += len(chunk)
+                    crc = zlib.crc32(chunk, crc)
+            except BaseException:
+                active.seek(start)
+                active.truncate()
+                raise
+            end = active.tell()
+            active.seek(start)
+            active.write(_ENTRY_HEAD.pack(_MAGIC, len(header), payload_len, crc))
+            active.seek(end)
+            active.flush()
+            if self.fsync:
+                os.fsync(active.fileno())
+            self._active_size = end
+            if self._active_size >= self.segment_size:
+                self._seal()
+        logger.warning('Spooled insert into %s (%d bytes) to %s', entry.table, payload_len, self.directory)
+
+    def _seal(self):
+        if self._active:
+            self._active.close()
+            self._active = None
+
+    def sealed_segments(self) -> List[str]:
+        """
+        Seal the active segment and return the paths of all segments waiting for replay, oldest first
+        """
+        with self._lock:
+            self._seal()
+            return [self._segment_path(number) for number in self._segment_numbers()]
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._segment_numbers())
+
+    @staticmethod
+    def read_segment(path: str) -> Iterator[SpoolEntry]:
+        """
+        Read the entries of a segment file.  A truncated or corrupt entry (from a crash during a write) ends the
+        segment
+        """
+        with open(path, 'rb') as segment:
+            while True:
+                head = segment.read(_ENTRY_HEAD.size)
+                if not head:
+                    return
+                if len(head) < _ENTRY_HEAD.size:
+                    logger.warning('Truncated entry in spool segment %s', path)
+                    return
+                magic, header_len, payload_len, crc = _ENTRY_HEAD.unpack(head)
+                header = segment.read(header_len)
+                payload = segment.read(payload_len)
+                if magic != _MAGIC or len(header) < header_len or len(payload) < payload_len or \
+                        zlib.crc32(payload) != crc:
+                    logger.warning('Corrupt or truncated entry in spool segment %s', path)
+                    return
+                meta = json.loads(header)
+                yield SpoolEntry(meta['table'], meta['compression'], meta['settings'], meta['transport_settings'],
+                                 payload)
+
+    def reject(self, entry: SpoolEntry):
+        """
+        Move an entry the server refused to the rejected directory for manual inspection
+        """
+        path = os.path.join(self.directory, REJECTED_DIR, f'{uuid.uuid4()}{SEGMENT_SUFFIX}')
+        with open(path, 'wb') as rejected:
+            _write_entry(rejected, entry)
+
+    def retain(self, path: str, done: Set[int]):
+        """
+        Rewrite a sealed segment without the entries that were already replayed or rejected, so that the next replay
+        resumes with the remaining entries.  The new segment replaces the old one only after it is completely written
+        :param path: Path of the sealed segment
+        :param done: Indexes (in segment order) of the entries to drop
+        """
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'wb') as segment:
+            for ix, entry in enumerate(self.read_segment(path)):
+                if ix not in done:
+                    _write_entry(segment, entry)
+            segment.flush()
+            if self.fsync:
+                os.fsync(segment.fileno())
+        os.replace(temp_path, path)
+
+    def close(self):
+        with self._lock:
+            self._seal()
+
+
+def _write_entry(output, entry: SpoolEntry):
+    header = json.dumps({'table': entry.table,
+                         'compression': entry.compression,
+                         'settings': entry.settings,
+                         'transport_settings': entry.transport_settings}).encode()
+    output.write(_ENTRY_HEAD.pack(_MAGIC, len(header), len(entry.payload), zlib.crc32(entry.payload)))
+    output.write(header)
+    output.write(entry.payload)
+
+
+def retryable(ex: DatabaseError) -> bool:
+    """
+    Whether a failed replay of a spooled insert should be attempted again later.  Only errors that show the server
+    will never accept the insert (a client error status or a Timeplus error code that is not transient) are not
+    retryable, so that an unrecognized error never discards spooled data
+    :param ex: The exception raised by the replayed insert
+    :return: False if the entry should be rejected
+    """
+    if isinstance(ex, OperationalError):
+        return True
+    message = str(ex)
+    match = _ERROR_CODE_RE.search(message)
+    if match:
+        return int(match.group(1)) in RETRYABLE_ERROR_CODES
+    match = _STATUS_RE.search(message)
+    if match:
+        status = int(match.group(1))
+        return status >= 500 or status in (408, 429)
+    return True
+
+
+def replay_entry(client, entry: SpoolEntry):
+    client.raw_insert(None,
+                      insert_block=entry.payload,
+                      settings=entry.settings,
+                      compression=entry.compression,
+                      transport_settings=entry.transport_settings)
+
+
+class SpoolReplayer:
+    """
+    Streams spooled inserts back to the server with raw_insert.  Since the entries are already encoded and compressed
+    replay is limited only by I/O, and up to `concurrency` inserts from a segment are sent in parallel.  The client
+    should not use a session, since session queries cannot run concurrently.  Spooled inserts are sent to the
+    database of the client that spooled them
+    """
+
+    def __init__(self, spool: InsertSpool, client, concurrency: int = 4, interval: float = 10.0):
+        """
+        :param spool: The InsertSpool to replay
+        :param client: Client used for the health check and the replayed inserts
+        :param concurrency: Maximum number of concurrent replayed inserts
+        :param interval: Seconds between replay attempts when running in the background
+        """
+        self.spool = spool
+        self.client = client
+        self.concurrency = max(1, concurrency)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def healthy(self) -> bool:
+        try:
+            self.client.command('SELECT 1')
+            return True
+        except OperationalError:
+            return False
+
+    def replay(self) -> ReplayStats:
+        """
+        Replay all sealed segments in order, stopping at the first insert that fails because the server is unavailable
+        or with another retryable error
+        :return: ReplayStats for this replay
+        """
+        segments = inserts = rejected = 0
+        if not self.spool.pending:
+            return ReplayStats(0, 0, 0, True)
+        if not self.healthy():
+            return ReplayStats(0, 0, 0, False)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='tp_spool_replay') as executor:
+            for path in self.spool.sealed_segments():
+                sent, refused, complete = self._replay_segment(path, executor)
+                inserts += sent
+                rejected += refused
+                if not complete:
+                    return ReplayStats(segments, inserts, rejected, False)
+                os.remove(path)
+                segments += 1
+        return ReplayStats(segments, inserts, rejected, True)
+
+    def _replay_segment(self, path: str, executor: ThreadPoolExecutor) -> Tuple[int, int, bool]:
+        sent = refused = 0
+        complete = True
+        in_flight = []
+        done = set()
+
+        def collect(entry_future):
+            nonlocal sent, refused, complete
+            ix, entry, future = entry_future
+            try:
+                future.result()
+                sent += 1
+                done.add(ix)
+            except DatabaseError as ex:
+                if retryable(ex):
+                    logger.warning('Spooled insert into %s failed, keeping it for the next replay: %s', entry.table, ex)
+                    complete = False
+                    return
+                # The server will never accept this insert, so keep it aside instead of blocking the spool
+                logger.error('Spooled insert into %s rejected: %s', entry.table, ex)
+                self.spool.reject(entry)
+                refused += 1
+                done.add(ix)
+            except Exception:  # pylint: disable=broad-except
+                logger.warning('Unexpected error replaying spooled insert into %s', entry.table, exc_info=True)
+                complete = False
+
+        for ix, entry in enumerate(InsertSpool.read_segment(path)):
+            in_flight.append((ix, entry, executor.submit(replay_entry, self.client, entry)))
+            if len(in_flight) >= self.concurrency:
+                collect(in_flight.pop(0))
+                if not complete:
+                    break
+        for entry_future in in_flight:
+            collect(entry_future)
+        if not complete and done:
+            # Drop the inserts the server accepted or rejected so they are not sent (or rejected) again
+            self.spool.retain(path, done)
+        return sent, refused, complete
+
+    def start(self):
+        """
+        Start replaying in a background thread every `interval` seconds while the spool has pending segments
+        """
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='tp_spool_replayer', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                stats = self.replay()
+                if stats.inserts or stats.rejected:
+                    logger.info('Replayed %d spooled inserts (%d rejected), complete: %s',
+                                stats.inserts, stats.rejected, stats.complete)
+            except Exception:  # pylint: disable=broad-except
+                logger.warning('Spool replay failed', exc_info=True)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
@@ -1,120 +1,529 @@
+import asyncio
+import copy
 import logging
-from typing import Union
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import AsyncIterator, Deque, List, Optional, Sequence, Set, Tuple, Union
 
+from timeplus_connect import common
 from timeplus_connect.datatypes import registry
-from timeplus_connect.driver.common import write_leb128
+from timeplus_connect.datatypes.base import TimeplusType
+from timeplus_connect.driver import ctypes, procdecode
+from timeplus_connect.driver.common import write_leb128, StoppableQueue
 from timeplus_connect.driver.exceptions import StreamCompleteException, StreamFailureError
-from timeplus_connect.driver.insert import InsertContext
+from timeplus_connect.driver.insert import InsertContext, InsertBlock
 from timeplus_connect.driver.npquery import NumpyResult
+from timeplus_connect.driver.arrowquery import ArrowResult
+from timeplus_connect.driver.options import arrow, check_arrow
 from timeplus_connect.driver.query import QueryResult, QueryContext
 from timeplus_connect.driver.types import ByteSource
-from timeplus_connect.driver.compression import get_compressor
+from timeplus_connect.driver.compression import Compressor, get_compressor
 
 _EMPTY_CTX = QueryContext()
 
 logger = logging.getLogger(__name__)
 
+_decode_lock = threading.Lock()
+_decode_pool: Optional[Tuple[int, ThreadPoolExecutor]] = None
+
+
+_encode_lock = threading.Lock()
+_encode_pool: Optional[Tuple[int, ThreadPoolExecutor]] = None
+
+# A pool replaced after a thread setting change is not shut down, since queries and inserts in other threads may
+# still be submitting to it.  Its idle worker threads exit once the last of those users releases the pool
+
+
+def _encode_executor() -> Optional[Tuple[int, ThreadPoolExecutor]]:
+    """
+    :return: The number of encode threads and the shared encode pool, or None if inserts are encoded inline
+    """
+    global _encode_pool  # pylint: disable=global-statement
+    threads = common.get_setting('insert_threads')
+    if threads < 1:
+        return None
+    with _encode_lock:
+        if _encode_pool is None or _encode_pool[0] != threads:
+            _encode_pool = threads, ThreadPoolExecutor(max_workers=threads, thread_name_prefix='tp_encode')
+        return _encode_pool
+
+
+def _decode_executor() -> Optional[ThreadPoolExecutor]:
+    global _decode_pool  # pylint: disable=global-statement
+    threads = common.get_setting('decode_threads')
+    if threads < 2:
+        return None
+    with _decode_lock:
+        if _decode_pool is None or _decode_pool[0] != threads:
+            _decode_pool = threads, ThreadPoolExecutor(max_workers=threads, thread_name_prefix='tp_decode')
+        return _decode_pool[1]
+
+
+class _RawColumnSource:
+    """
+    Minimal ResponseBuffer source for the raw bytes of a single column or block
+    """
+    __slots__ = ('gen',)
+
+    def __init__(self, data: bytes):
+        self.gen = iter((data,))
+
+    def close(self):
+        pass
+
+
+def _decode_raw_column(col_type: TimeplusType, data: bytes, num_rows: int, context: QueryContext) -> Sequence:
+    source = ctypes.RespBuffCls(_RawColumnSource(data))  # pylint: disable=not-callable
+    return col_type.read_column(source, num_rows, context)
+
+
+# pylint: disable=too-many-branches,too-many-statements,too-many-locals
+def read_native_block(source: ByteSource,
+                      context: QueryContext,
+                      names: List[str],
+                      col_types: List[TimeplusType],
+                      executor: Optional[ThreadPoolExecutor] = None,
+                      processes: Optional[ProcessPoolExecutor] = None,
+                      local_columns: Optional[Set[int]] = None) -> Optional[List[Sequence]]:
+    """
+    Reads and decodes a single Native format block.  The names and types of the columns are appended to the
+    names and col_types lists when reading the first block of a response
+    :param executor: Optional thread pool used to decode columns concurrently
+    :param processes: Optional process pool used to decode columns that create Python objects into fixed width
+      numpy columns
+    :param local_columns: Numbers of the columns that did not decode to fixed width numpy columns in a worker
+      process.  These are decoded in this process for the rest of the response
+    :return: The block as a list of columns, or None if the source is exhausted before the block starts
+    """
+    first = not col_types
+    result_block = []
+    pending = []  # Block index, future, and the column number of process columns
+    try:
+        if context.block_info:
+            source.read_bytes(8)
+        num_cols = source.read_leb128()
+    except StreamCompleteException:
+        return None
+    if local_columns is None:
+        local_columns = set()
+    num_rows = source.read_leb128()
+    try:
+        for col_num in range(num_cols):
+            name = source.read_leb128_str()
+            type_name = source.read_leb128_str()
+            if first:
+                names.append(name)
+                col_type = registry.get_from_name(type_name)
+                col_types.append(col_type)
+            else:
+                col_type = col_types[col_num]
+            if num_rows == 0:
+                result_block.append(tuple())
+            elif processes and col_type.scannable and col_type.object_decode and col_num not in local_columns:
+                # Object creation holds the GIL, so these columns are decoded in worker processes
+                raw = bytearray()
+                col_type.scan_column(source, num_rows, raw)
+                col_context = copy.copy(context)
+                col_context.start_column(name)
+                if len(raw) < procdecode.MIN_PROCESS_BYTES:
+                    # The round trip to a worker process costs more than decoding a small column here
+                    result_block.append(_decode_raw_column(col_type, raw, num_rows, col_context))
+                    continue
+                future = processes.submit(procdecode.decode_column, col_type, bytes(raw), num_rows, col_context)
+                pending.append((len(result_block), future, col_num))
+                result_block.append(None)
+            elif executor and col_type.scannable:
+                # Copy the raw column bytes out of the stream and decode them on the thread pool with
+                # a column specific copy of the context, since start_column updates context state
+                raw = bytearray()
+                col_type.scan_column(source, num_rows, raw)
+                col_context = copy.copy(context)
+                col_context.start_column(name)
+                future = executor.submit(_decode_raw_column, col_type, raw, num_rows, col_context)
+                pending.append((len(result_block), future, None))
+                result_block.append(None)
+            else:
+                context.start_column(name)
+                column = col_type.read_column(source, num_rows, context)
+                result_block.append(column)
+        for ix, future, col_num in pending:
+            if col_num is None:
+                result_block[ix] = future.result()
+                continue
+            column, fixed = future.result()
+            if not fixed:
+                local_columns.add(col_num)
+            result_block[ix] = procdecode.resolve_column(column)
+    finally:
+        # Shared memory segments of columns that were not resolved (after any error) must still be removed
+        for ix, future, col_num in pending:
+            if col_num is not None and result_block[ix] is None:
+                procdecode.discard_column(future)
+    return result_block
+
+
+def read_arrow_block(source: ByteSource,
+                     context: QueryContext,
+                     names: List[str],
+                     col_types: List[TimeplusType]):
+    """
+    Reads a single Native format block and decodes it directly into a PyArrow RecordBatch.  The names and types of
+    the columns are appended to the names and col_types lists when reading the first block of a response
+    :return: The block as a RecordBatch, or None if the source is exhausted before the block starts
+    """
+    first = not col_types
+    columns = []
+    try:
+        if context.block_info:
+            source.read_bytes(8)
+        num_cols = source.read_leb128()
+    except StreamCompleteException:
+        return None
+    num_rows = source.read_leb128()
+    for col_num in range(num_cols):
+        name = source.read_leb128_str()
+        type_name = source.read_leb128_str()
+        if first:
+            names.append(name)
+            col_type = registry.get_from_name(type_name)
+            col_types.append(col_type)
+        else:
+            col_type = col_types[col_num]
+        context.start_column(name)
+        if num_rows == 0:
+            # Empty blocks have no column data, but the prefix is still needed to build an empty array
+            prefix = bytearray()
+            col_type.write_column_prefix(prefix)
+            column = col_type.read_arrow_column(ctypes.RespBuffCls(_RawColumnSource(bytes(prefix))), 0, context)
+        else:
+            column = col_type.read_arrow_column(source, num_rows, context)
+        columns.append(column)
+    return arrow.RecordBatch.from_arrays(columns, names=names)
+
+
+class _BlockScan:
+    """
+    Progress of the incremental scan of a pending Native block
+    """
+    __slots__ = 'offset', 'column', 'shape', 'scannable', 'length'
+
+    def __init__(self):
+        self.offset = 0  # End of the block header or of the last completely scanned column
+        self.column = 0  # Next column to scan
+        self.shape: Optional[Tuple[int, int]] = None  # Column and row count of the pending block, once scanned
+        self.scannable = True
+        self.length = 0  # Length of the pending block once it has been completely scanned
+
+
+# pylint: disable=too-many-instance-attributes
+class AsyncBlockReader:
+    """
+    Decodes Native format blocks from an asynchronous stream of response chunks.  The decoders themselves are
+    synchronous, so received chunks are accumulated until a complete block is available.  Completeness is checked
+    with a scan of the block that resumes after the last completely received column, so each block is scanned and
+    decoded only once.  Blocks with columns that cannot be scanned are checked with a decoding attempt that is retried
+    after more data arrives.  The amount of new data required for the next attempt is doubled after each incomplete
+    scan or decoding attempt to bound the repeated work
+    """
+    _MIN_ATTEMPT = 1 << 16
+
+    def __init__(self,
+                 chunks: AsyncIterator[bytes],
+                 context: QueryContext = _EMPTY_CTX,
+                 executor: Optional[Executor] = None):
+        """
+        :param chunks: Async iterator of decompressed response chunks
+        :param context: QueryContext for the query
+        :param executor: If set, blocks are scanned and decoded on this executor instead of the event loop thread
+        """
+        self.chunks = chunks
+        self.context = context
+        self.executor = executor
+        self.names: List[str] = []
+        self.col_types: List[TimeplusType] = []
+        self._pending = bytearray()
+        self._needed = self._MIN_ATTEMPT
+        self._done = False
+        self._decode_pool = _decode_executor()
+        self._scan = _BlockScan()
+
+    async def next_block(self) -> Optional[List[Sequence]]:
+        """
+        :return: The next decoded block as a list of columns, or None at the end of the stream
+        """
+        while True:
+            if self._pending and (self._done or len(self._pending) - self._scan.offset >= self._needed):
+                if self.executor:
+                    block = await asyncio.get_running_loop().run_in_executor(self.executor, self._try_block)
+                else:
+                    block = self._try_block()
+                if block is not None:
+                    return block
+                if self._done:
+                    raise StreamFailureError(extract_error_message(bytes(self._pending)))
+                self._needed = max(self._MIN_ATTEMPT, (len(self._pending) - self._scan.offset) * 2)
+            if self._done:
+                return None
+            async for chunk in self.chunks:
+                self._pending += chunk
+                break
+            else:
+                self._done = True
+
+    # pylint: disable=not-callable
+    def _scan_block(self):
+        """
+        Continue scanning the pending block after the last completely scanned column, recording the end of each
+        column so that later scans do not repeat it.  Sets the block length when the complete block has been scanned
+        """
+        offset = self._scan.offset
+        source = ctypes.RespBuffCls(_RawColumnSource(bytes(self._pending[offset:])))
+        try:
+            if self._scan.shape is None:
+                if self.context.block_info:
+                    source.read_bytes(8)
+                num_cols = source.read_leb128()
+                num_rows = source.read_leb128()
+                self._scan.shape = num_cols, num_rows
+                self._scan.offset = offset + source.buf_loc
+            num_cols, num_rows = self._scan.shape
+            scratch = bytearray()
+            while self._scan.column < num_cols:
+                source.read_leb128_str()
+                col_type = registry.get_from_name(source.read_leb128_str())
+                if num_rows:
+                    if not col_type.scannable:
+                        self._scan.scannable = False
+                        return
+                    col_type.scan_column(source, num_rows, scratch)
+                    scratch.clear()
+                self._scan.column += 1
+                self._scan.offset = offset + source.buf_loc
+        except StreamCompleteException:
+            return
+        self._scan.length = self._scan.offset
+
+    def _try_block(self) -> Optional[List[Sequence]]:
+        first = not self.col_types
+        if self._scan.scannable and not self._scan.length:
+            self._scan_block()
+            if self._scan.scannable and not self._scan.length:
+                return None
+        if self._scan.length:
+            # The complete block is buffered, so it is copied and decoded exactly once
+            data = bytes(self._pending[:self._scan.length])
+        else:
+            data = bytes(self._pending)
+        try:
+            source = ctypes.RespBuffCls(_RawColumnSource(data))
+            block = read_native_block(source, self.context, self.names, self.col_types, self._decode_pool)
+        except StreamCompleteException:
+            if first:
+                self.names.clear()
+                self.col_types.clear()
+            return None
+        del self._pending[:self._scan.length or source.buf_loc]
+        self._needed = self._MIN_ATTEMPT
+        self._scan = _BlockScan()
+        return block
+
 
 class NativeTransform:
     # pylint: disable=too-many-locals
     @staticmethod
-    def parse_response(source: ByteSource, context: QueryContext = _EMPTY_CTX) -> Union[NumpyResult, QueryResult]:
+    def parse_response(source: ByteSource,
+                       context: QueryContext = _EMPTY_CTX) -> Union[NumpyResult, QueryResult, ArrowResult]:
         names = []
         col_types = []
-        block_num = 0
+        if context.as_arrow:
+            check_arrow()
+            executor = processes = None
+        else:
+            executor = _decode_executor()
+            # Worker processes only help for fixed width numpy columns, so they are not used for Python results
+            processes = procdecode.decode_process_pool() if context.use_numpy else None
+        local_columns = set()
 
         def get_block():
-            nonlocal block_num
-            result_block = []
             try:
-                try:
-                    if context.block_info:
-                        source.read_bytes(8)
-                    num_cols = source.read_leb128()
-                except StreamCompleteException:
-                    return None
-                num_rows = source.read_leb128()
-                for col_num in range(num_cols):
-                    name = source.read_leb128_str()
-                    type_name = source.read_leb128_str()
-                    if block_num == 0:
-                        names.append(name)
-                        col_type = registry.get_from_name(type_name)
-                        col_types.append(col_type)
-                    else:
-                        col_type = col_types[col_num]
-                    if num_rows == 0:
-                        result_block.append(tuple())
-                    else:
-                        context.start_column(name)
-                        column = col_type.read_column(source, num_rows, context)
-                        result_block.append(column)
+                if context.as_arrow:
+                    return read_arrow_block(source, context, names, col_types)
+                return read_native_block(source, context, names, col_types, executor, processes, local_columns)
             except Exception as ex:
                 source.close()
+                context.lc_dictionaries.clear()
                 if isinstance(ex, StreamCompleteException):
                     # We ran out of data before it was expected, this could be ClickHouse reporting an error
                     # in the response
                     if source.last_message:
                         raise StreamFailureError(extract_error_message(source.last_message)) from None
                 raise
-            block_num += 1
-            return result_block
 
         first_block = get_block()
         if first_block is None:
+            context.lc_dictionaries.clear()
+            if context.as_arrow:
+                return ArrowResult()
             return NumpyResult() if context.use_numpy else QueryResult([])
 
         def gen():
-            yield first_block
-            while True:
-                next_block = get_block()
-                if next_block is None:
-                    return
-                yield next_block
+            # The cached LowCardinality dictionaries are released when the result is fully read or closed
+            try:
+                yield first_block
+                while True:
+                    next_block = get_block()
+                    if next_block is None:
+                        return
+                    yield next_block
+            finally:
+                context.lc_dictionaries.clear()
 
+        if context.as_arrow:
+            def batches():
+                for batch in gen():
+                    if batch.num_rows:
+                        yield batch
+
+            return ArrowResult(batches(), tuple(names), tuple(col_types), first_block.schema, source)
         if context.use_numpy:
             res_types = [col.dtype if hasattr(col, 'dtype') else 'O' for col in first_block]
             return NumpyResult(gen(), tuple(names), tuple(col_types), res_types, source)
         return QueryResult(None, gen(), tuple(names), tuple(col_types), context.column_oriented, source)
 
     @staticmethod
-    def build_insert(context: InsertContext):
-        compressor = get_compressor(context.compression)
+    def build_insert(context: InsertContext, compressor: Optional[Compressor] = None, flush: Optional[bool] = None):
+        """
+        :param context: InsertContext with the data to serialize
+        :param compressor: Optional compressor, possibly shared across several calls
+        :param flush: Flush the compressor after the last block.  Defaults to True only if compressor is not set, so
+          the caller of a shared compressor is responsible for flushing it after the last call
+        :return: Generator of (possibly compressed) Native format insert chunks
+        """
+        if flush is None:
+            flush = compressor is None
+        if compressor is None:
+            compressor = get_compressor(context.compression)
 
         def chunk_gen():
             for block in context.next_block():
-                output = bytearray()
-                output += block.prefix
-                write_leb128(block.column_count, output)
-                write_leb128(block.row_count, output)
-                for col_name, col_type, data in zip(block.column_names, block.column_types, block.column_data):
-                    col_enc = col_name.encode()
-                    write_leb128(len(col_enc), output)
-                    output += col_enc
-                    col_enc = col_type.insert_name.encode()
-                    write_leb128(len(col_enc), output)
-                    output += col_enc
-                    context.start_column(col_name)
-                    try:
-                        col_type.write_column(data, output, context)
-                    except Exception as ex:  # pylint: disable=broad-except
-                        # This is hideous, but some low level serializations can fail while streaming
-                        # the insert if the user has included bad data in the column.  We need to ensure that the
-                        # insert fails (using garbage data) to avoid a partial insert, and use the context to
-                        # propagate the correct exception to the user
-                        logger.error('Error serializing column `%s` into data type `%s`',
-                                     col_name, col_type.name, exc_info=True)
-                        context.insert_exception = ex
-                        yield 'INTERNAL EXCEPTION WHILE SERIALIZING'.encode()
-                        return
+                try:
+                    output = _encode_block(block, context)
+                except Exception as ex:  # pylint: disable=broad-except
+                    # This is hideous, but some low level serializations can fail while streaming
+                    # the insert if the user has included bad data in the column.  We need to ensure that the
+                    # insert fails (using garbage data) to avoid a partial insert, and use the context to
+                    # propagate the correct exception to the user
+                    context.insert_exception = ex
+                    yield _SERIALIZE_ERROR
+                    return
                 yield compressor.compress_block(output)
-            footer = compressor.flush()
-            if footer:
-                yield footer
+            if flush:
+                footer = compressor.flush()
+                if footer:
+                    yield footer
 
+        encode_pool = _encode_executor()
+        if encode_pool and context.row_count - context.current_row > context.block_row_count:
+            return _InsertPipeline(context, compressor, flush, *encode_pool).chunks()
         return chunk_gen()
 
 
+_SERIALIZE_ERROR = 'INTERNAL EXCEPTION WHILE SERIALIZING'.encode()
+
+
+def _encode_block(block: InsertBlock, context: InsertContext) -> bytearray:
+    output = bytearray()
+    output += block.prefix
+    write_leb128(block.column_count, output)
+    write_leb128(block.row_count, output)
+    for col_name, col_type, data in zip(block.column_names, block.column_types, block.column_data):
+        col_enc = col_name.encode()
+        write_leb128(len(col_enc), output)
+        output += col_enc
+        col_enc = col_type.insert_name.encode()
+        write_leb128(len(col_enc), output)
+        output += col_enc
+        context.start_column(col_name)
+        try:
+            col_type.write_column(data, output, context)
+        except Exception:
+            logger.error('Error serializing column `%s` into data type `%s`',
+                         col_name, col_type.name, exc_info=True)
+            raise
+    return output
+
+
+class _InsertPipeline:
+    """
+    Encodes the blocks of an insert concurrently on the encode pool, while a background thread compresses the encoded
+    blocks in order and hands them to the consumer (normally the HTTP request body iterator) through a bounded
+    queue.  Encoding, compression and sending the request therefore overlap, and the number of encoded and compressed
+    blocks held in memory is limited to about twice the number of encode threads
+    """
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(self,
+                 context: InsertContext,
+                 compressor: Compressor,
+                 flush: bool,
+                 workers: int,
+                 executor: ThreadPoolExecutor):
+        self.context = context
+        self.compressor = compressor
+        self.flush = flush
+        self.executor = executor
+        self.depth = workers + 1
+        self.queue = StoppableQueue(self.depth)
+
+    def chunks(self):
+        worker = threading.Thread(target=self._produce, name='tp_insert_pipeline', daemon=True)
+        worker.start()
+        try:
+            yield from self.queue.items()
+        finally:
+            self.queue.stop()
+            worker.join()
+
+    def _produce(self):
+        context = self.context
+        pending: Deque[Future] = deque()
+        try:
+            blocks = context.next_block()
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < self.depth:
+                    block = next(blocks, None)
+                    if block is None:
+                        exhausted = True
+                    else:
+                        # Each block gets a shallow copy of the context, since column formats are tracked per context
+                        pending.append(self.executor.submit(_encode_block, block, copy.copy(context)))
+                if not pending:
+                    break
+                future = pending.popleft()
+                try:
+                    output = future.result()
+                except Exception as ex:  # pylint: disable=broad-except
+                    # Same as the serial insert, send garbage so the server fails the insert
+                    context.insert_exception = ex
+                    self.queue.put(_SERIALIZE_ERROR)
+                    self.queue.put(None)
+                    return
+                if not self.queue.put(self.compressor.compress_block(output)):
+                    return
+            if self.flush:
+                footer = self.compressor.flush()
+                if footer and not self.queue.put(footer):
+                    return
+            self.queue.put(None)
+        except Exception as ex:  # pylint: disable=broad-except
+            self.queue.put(ex)
+        finally:
+            for future in pending:
+                future.cancel()
+
+
 def extract_error_message(message: bytes) -> str:
     if len(message) > 1024:
         message = message[-1024:]
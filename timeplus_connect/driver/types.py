@@ -1,6 +1,10 @@
 from abc import ABC, abstractmethod
 from typing import Sequence, Any
 
+# Reads smaller than this fraction of the response chunk are copied instead of returned as views, so that a small
+# column does not keep a much larger chunk in memory
+VIEW_CHUNK_FRACTION = 4
+
 Matrix = Sequence[Sequence[Any]]
 
 
@@ -29,10 +33,29 @@ class ByteSource(Closable):
     def read_bytes(self, sz: int) -> bytes:
         pass
 
+    @abstractmethod
+    def read_view(self, sz: int):
+        """
+        Read sz bytes without copying them if possible.  The result is a read only buffer that may reference the
+        underlying response chunk.  A view keeps the entire chunk (up to the http_buffer_size setting) in memory for
+        as long as the view or any array built on it exists, so only reads of at least 1/VIEW_CHUNK_FRACTION of the
+        chunk are returned as views and smaller reads are copied
+        """
+
     @abstractmethod
     def read_str_col(self, num_rows: int, encoding: str, nullable: bool = False, null_obj: Any = None):
         pass
 
+    @abstractmethod
+    def read_str_col_raw(self, num_rows: int) -> bytes:
+        pass
+
+    @abstractmethod
+    def read_str_col_offsets(self, num_rows: int):
+        """
+        Read a String column as an int64 array of value offsets (starting with 0) and the concatenated value bytes
+        """
+
     @abstractmethod
     def read_bytes_col(self, sz: int, num_rows: int):
         pass
@@ -1,9 +1,12 @@
 import os
-from datetime import datetime
-from typing import Tuple
+from datetime import datetime, tzinfo
+from functools import lru_cache
+from typing import Tuple, Optional, Sequence
 
 import pytz
 
+from timeplus_connect.driver.options import np
+
 tzlocal = None
 try:
     import tzlocal  # Maybe we can use the tzlocal module to get a safe timezone
@@ -39,3 +42,48 @@ except pytz.UnknownTimeZoneError:
     local_tz = datetime.now().astimezone().tzinfo
 
 local_tz, local_tz_dst_safe = normalize_timezone(local_tz)
+
+
+@lru_cache(maxsize=64)
+def utc_offsets(tz_info: tzinfo) -> Optional[Tuple['np.ndarray', 'np.ndarray', Sequence[tzinfo]]]:
+    """
+    Transition table of a pytz timezone, used to convert epoch timestamps to local times with numpy.  Requires numpy
+    :param tz_info: The timezone
+    :return: The UTC epoch seconds of each transition (the first is the earliest possible time), the UTC offset
+      in seconds starting at each transition, and the pytz tzinfo instance for each transition.  None if tz_info is
+      not a pytz timezone
+    """
+    transitions = getattr(tz_info, '_utc_transition_times', None)
+    if transitions:
+        # pylint: disable=protected-access
+        offsets = [int(info[0].total_seconds()) for info in tz_info._transition_info]
+        tz_infos = [tz_info._tzinfos[info] for info in tz_info._transition_info]
+        starts = np.array(transitions, dtype='datetime64[s]').view('<i8')
+    elif isinstance(tz_info, pytz.BaseTzInfo):
+        offsets = [int(tz_info.utcoffset(None).total_seconds())]
+        tz_infos = [tz_info]
+        starts = np.array([np.iinfo('<i8').min], dtype='<i8')
+    else:
+        return None
+    return starts, np.array(offsets, dtype='<i8'), tz_infos
+
+
+def local_ticks(ticks: 'np.ndarray', ticks_per_second: int,
+                tz_info: tzinfo) -> Optional[Tuple['np.ndarray', 'np.ndarray', Sequence[tzinfo]]]:
+    """
+    Vectorized conversion of UTC epoch ticks to local wall clock ticks, matching pytz fromutc.  Requires numpy
+    :param ticks: Numpy int64 array of UTC epoch ticks
+    :param ticks_per_second: Ticks per second (1 for seconds, 1000000 for microseconds)
+    :param tz_info: The pytz timezone
+    :return: The local ticks, the index of the active transition for each value, and the tzinfo instance of each
+      transition.  None if tz_info is not a pytz timezone
+    """
+    table = utc_offsets(tz_info)
+    if table is None:
+        return None
+    starts, offsets, tz_infos = table
+    if len(starts) == 1:
+        return ticks + offsets[0] * ticks_per_second, np.zeros(len(ticks), dtype=np.intp), tz_infos
+    seconds = ticks // ticks_per_second if ticks_per_second > 1 else ticks
+    index = np.searchsorted(starts, seconds, side='right') - 1
+    return ticks + offsets[index] * ticks_per_second, index, tz_infos
@@ -1,6 +1,7 @@
 cdef class ResponseBuffer:
+    cdef readonly unsigned long long buf_loc
     cdef:
-        unsigned long long buf_loc, buf_sz, slice_sz
+        unsigned long long buf_sz, slice_sz
         signed long long slice_start
         object gen, source
         char* buffer
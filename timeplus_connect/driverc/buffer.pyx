@@ -9,10 +9,11 @@ from cpython.unicode cimport PyUnicode_Decode
 from cpython.tuple cimport PyTuple_New, PyTuple_SET_ITEM
 from cpython.bytes cimport PyBytes_FromStringAndSize
 from cpython.buffer cimport PyObject_GetBuffer, PyBuffer_Release, PyBUF_ANY_CONTIGUOUS, PyBUF_SIMPLE
-from cpython.mem cimport PyMem_Free, PyMem_Malloc
+from cpython.mem cimport PyMem_Free, PyMem_Malloc, PyMem_Realloc
 from libc.string cimport memcpy
 
 from timeplus_connect.driver.exceptions import StreamCompleteException
+from timeplus_connect.driver.types import VIEW_CHUNK_FRACTION
 
 cdef union ull_wrapper:
     char* source
@@ -23,6 +24,7 @@ cdef char * utf8 = 'utf8'
 cdef dict array_templates = {}
 cdef bint must_swap = sys.byteorder == 'big'
 cdef array.array swapper = array.array('Q', [0])
+cdef unsigned long long view_chunk_fraction = VIEW_CHUNK_FRACTION
 
 for c in 'bBuhHiIlLqQfd':
     array_templates[c] = array.array(c, [])
@@ -48,6 +50,9 @@ cdef class ResponseBuffer:
         cdef char* ptr
         e = self.buf_sz
 
+        if sz == 0:
+            # Empty reads (such as the data of a zero row column) must not return the NULL error value
+            return self.slice
         if self.buf_loc + sz <= e:
             # We still have "sz" unread bytes available in the buffer, return the currently loc and advance it
             temp = self.buf_loc
@@ -234,6 +239,17 @@ cdef class ResponseBuffer:
         cdef char* b = self.read_bytes_c(sz)
         return b[:sz]
 
+    def read_view(self, unsigned long long sz):
+        cdef unsigned long long start
+        cdef char * b
+        if self.buffer != NULL and self.buf_loc + sz <= self.buf_sz and sz * view_chunk_fraction >= self.buf_sz:
+            # Zero copy view into the current chunk, which remains referenced by the view
+            start = self.buf_loc
+            self.buf_loc += sz
+            return memoryview(<object>self.buff_source.obj)[start:start + sz]
+        b = self.read_bytes_c(sz)
+        return b[:sz]
+
     def read_str_col(self,
                      unsigned long long num_rows,
                      encoding: Optional[str],
@@ -247,6 +263,97 @@ cdef class ResponseBuffer:
             return self._read_nullable_str_col(num_rows, enc, null_object)
         return self._read_str_col(num_rows, enc)
 
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def read_str_col_raw(self, unsigned long long num_rows) -> bytes:
+        # Copies the undecoded LEB128 length prefixes and string bytes of a String column
+        cdef unsigned long long x, sz, shift, loc = 0, cap = num_rows * 16 + 64
+        cdef unsigned char b
+        cdef char * output = <char *> PyMem_Malloc(cap)
+        cdef char * temp
+        if output == NULL:
+            raise MemoryError
+        try:
+            for x in range(num_rows):
+                if loc + 10 > cap:
+                    cap <<= 1
+                    temp = <char *> PyMem_Realloc(output, cap)
+                    if temp == NULL:
+                        raise MemoryError
+                    output = temp
+                sz = 0
+                shift = 0
+                while 1:
+                    if self.buf_loc < self.buf_sz:
+                        b = self.buffer[self.buf_loc]
+                        self.buf_loc += 1
+                    else:
+                        b = self._read_byte_load()
+                    output[loc] = <char> b
+                    loc += 1
+                    sz += ((b & 0x7f) << shift)
+                    if (b & 0x80) == 0:
+                        break
+                    shift += 7
+                if sz == 0:
+                    continue
+                if loc + sz > cap:
+                    while loc + sz > cap:
+                        cap <<= 1
+                    temp = <char *> PyMem_Realloc(output, cap)
+                    if temp == NULL:
+                        raise MemoryError
+                    output = temp
+                memcpy(output + loc, self.read_bytes_c(sz), sz)
+                loc += sz
+            return PyBytes_FromStringAndSize(output, loc)
+        finally:
+            PyMem_Free(output)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def read_str_col_offsets(self, unsigned long long num_rows):
+        # Reads a String column as an Arrow style int64 offsets array (with a leading 0) and the concatenated values
+        cdef array.array offsets = array.clone(array_templates['q'], num_rows + 1, 0)
+        cdef long long * offset_ptr = offsets.data.as_longlongs
+        cdef unsigned long long x, sz, shift, loc = 0, cap = num_rows * 16 + 64
+        cdef unsigned char b
+        cdef char * output = <char *> PyMem_Malloc(cap)
+        cdef char * temp
+        if output == NULL:
+            raise MemoryError
+        try:
+            offset_ptr[0] = 0
+            for x in range(num_rows):
+                sz = 0
+                shift = 0
+                while 1:
+                    if self.buf_loc < self.buf_sz:
+                        b = self.buffer[self.buf_loc]
+                        self.buf_loc += 1
+                    else:
+                        b = self._read_byte_load()
+                    sz += ((b & 0x7f) << shift)
+                    if (b & 0x80) == 0:
+                        break
+                    shift += 7
+                if sz:
+                    if loc + sz > cap:
+                        while loc + sz > cap:
+                            cap <<= 1
+                        temp = <char *> PyMem_Realloc(output, cap)
+                        if temp == NULL:
+                            raise MemoryError
+                        output = temp
+                    memcpy(output + loc, self.read_bytes_c(sz), sz)
+                    loc += sz
+                offset_ptr[x + 1] = loc
+            if must_swap:
+                offsets.byteswap()
+            return offsets, PyBytes_FromStringAndSize(output, loc)
+        finally:
+            PyMem_Free(output)
+
     @cython.boundscheck(False)
     @cython.wraparound(False)
     def read_array(self, t: str, unsigned long long num_rows) -> Iterable[Any]:
@@ -17,6 +17,8 @@ from cython.view cimport array as cvarray
 from ipaddress import IPv4Address
 from uuid import UUID, SafeUUID
 from libc.string cimport memcpy
+from libc.stdint cimport int64_t, uint64_t
+from cpython.long cimport PyLong_FromLongLong, PyLong_FromUnsignedLongLong
 from datetime import tzinfo
 
 from timeplus_connect.driver.errors import NONE_IN_NULLABLE_COLUMN
@@ -190,6 +192,37 @@ def read_uuid_col(ResponseBuffer buffer, unsigned long long num_rows):
     return column
 
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def read_bigint_col(ResponseBuffer buffer, unsigned long long num_rows, unsigned long long sz, bint signed):
+    cdef unsigned long long x, limb, limbs = sz >> 3
+    cdef char * loc = buffer.read_bytes_c(sz * num_rows)
+    cdef uint64_t low, high, ext
+    cdef bint fits
+    cdef object column = PyTuple_New(num_rows), v
+    ifb = int.from_bytes
+    for x in range(num_rows):
+        memcpy(<void *>&low, <void *>loc, 8)
+        # Values that fit in 64 bits (the common case) have high limbs that are only sign extension
+        ext = 0xFFFFFFFFFFFFFFFF if signed and low >> 63 else 0
+        fits = True
+        for limb in range(1, limbs):
+            memcpy(<void *>&high, <void *>(loc + (limb << 3)), 8)
+            if high != ext:
+                fits = False
+                break
+        if not fits:
+            v = ifb(loc[:sz], 'little', signed=signed)
+        elif signed:
+            v = PyLong_FromLongLong(<int64_t>low)
+        else:
+            v = PyLong_FromUnsignedLongLong(low)
+        PyTuple_SET_ITEM(column, x, v)
+        Py_INCREF(v)
+        loc += sz
+    return column
+
+
 @cython.boundscheck(False)
 @cython.wraparound(False)
 def read_nullable_array(ResponseBuffer buffer, array_type: str, unsigned long long num_rows, object null_obj):
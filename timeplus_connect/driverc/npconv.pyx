@@ -8,6 +8,8 @@ from .buffer cimport ResponseBuffer
 @cython.wraparound(False)
 def read_numpy_array(ResponseBuffer buffer, np_type: str, unsigned long long num_rows):
     dtype = np.dtype(np_type)
-    cdef sz = dtype.itemsize * num_rows
-    cdef char * source = buffer.read_bytes_c(dtype.itemsize * num_rows)
-    return np.frombuffer(source[:sz], dtype, num_rows)
+    column = np.frombuffer(buffer.read_view(dtype.itemsize * num_rows), dtype, num_rows)
+    if not column.flags.aligned:
+        # A view into the middle of a response chunk may not be aligned for the dtype
+        return column.copy()
+    return column